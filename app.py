@@ -1,22 +1,48 @@
-import seaborn as sns
-import matplotlib.pyplot as plt
 import pandas as pd
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
 import os
+import downloads
+import figure_cache
+import memory
+import profiling
+import queries
+import reshape
+import search
+import service
+import table
+import typeahead
+import warmup
+import watcher
+from lazy_imports import lazy_import
+from loader import CSV_PATH, pin
+
+# Bibliotecas de gráficos só são importadas quando uma página desenha um gráfico
+px = lazy_import('plotly.express')
+go = lazy_import('plotly.graph_objects')
+plt = lazy_import('matplotlib.pyplot')
+sns = lazy_import('seaborn')
+
+# Gráficos enviados ao navegador entram no profiling como etapa render-figure
+plotly_chart = profiling.hook('render-figure', 'plotly_chart')(st.plotly_chart)
 
 st.set_page_config(page_title='Análise de Vendas de Games', layout='wide')
 
-csv_file = 'vgsales.csv'
+csv_file = CSV_PATH
 if not os.path.exists(csv_file):
     st.error(f"Arquivo {csv_file} não encontrado. Certifique-se de que o arquivo está no diretório correto.")
     st.stop()
 
 
-df = pd.read_csv(csv_file)
-# Garante que a coluna 'Year' seja tratada como inteiros, lidando com valores nulos
-df['Year'] = pd.to_numeric(df['Year'], errors='coerce').astype('Int64')
+# Etapas deste rerun medidas pelo profiling.py quando o painel de depuração da sessão
+# (ou VGSALES_PROFILE=1) está ligado
+profiling.start_rerun(st.session_state.get('debug_profiling') or profiling.env_enabled())
+
+# Dataset tipado e em cache no processo; quando o CSV muda, o watcher monta a nova versão
+# em segundo plano e a troca. Cada rerun fixa a versão em que começou
+watcher.start(csv_file)
+with profiling.phase('load', 'pin'):
+    df = pin(csv_file)
+memory.start_sampler(csv_file)
 column_names = df.columns
 pd.set_option('display.max_rows', None)
 pd.set_option('display.max_columns', None)
@@ -136,7 +162,9 @@ def inf_arv():
         'Título das colunas',
         'Número de linhas e colunas',
         'Tipos de dados contidos no arquivo analisado',
-        'Lançamentos por ano'
+        'Lançamentos por ano',
+        'Perfil de memória',
+        'Latência das consultas'
     ], key='inf_option')
     
     if op == 'Título das colunas':
@@ -170,7 +198,7 @@ def inf_arv():
         
         if view_mode == 'Tabela Interativa':
             # Tabela interativa com Plotly
-            table = go.Figure(data=[go.Table(
+            fig_table = go.Figure(data=[go.Table(
                 header=dict(
                     values=['Índice', 'Nome da Coluna', 'Descrição'],
                     fill_color='#4CAF50',
@@ -184,18 +212,18 @@ def inf_arv():
                     align='left'
                 )
             )])
-            table.update_layout(
+            fig_table.update_layout(
                 title_text='Lista de Colunas do Dataset',
                 title_x=0.4,
                 margin=dict(t=50, b=50),
                 paper_bgcolor='rgba(0,0,0,0)',
                 autosize=True
             )
-            st.plotly_chart(table, use_container_width=True)
+            plotly_chart(fig_table, use_container_width=True)
         
         else:
             # Visualização em cartões
-            for _, row in columns_df.iterrows():
+            for row in reshape.records(columns_df):
                 st.markdown(f"""
                     <div class="metric-card tooltip">
                         <h3>{row['Índice']}. {row['Nome da Coluna']}</h3>
@@ -241,7 +269,7 @@ def inf_arv():
                 height=200,
                 margin=dict(t=50, b=0, l=0, r=0)
             )
-            st.plotly_chart(fig_rows, use_container_width=True)
+            plotly_chart(fig_rows, use_container_width=True)
         
         # Número de colunas
         with col2:
@@ -269,7 +297,7 @@ def inf_arv():
                 height=200,
                 margin=dict(t=50, b=0, l=0, r=0)
             )
-            st.plotly_chart(fig_cols, use_container_width=True)
+            plotly_chart(fig_cols, use_container_width=True)
         
         with col3:
             total_cells = df.shape[0] * df.shape[1]
@@ -294,7 +322,60 @@ def inf_arv():
             memory_usage = df.memory_usage(deep=True).sum() / (1024 ** 2)  # MB
             st.write(f"**Uso de Memória:** {memory_usage:.2f} MB")
             st.write(f"**Tamanho Médio por Linha:** {(memory_usage * 1024 ** 2 / df.shape[0]):.2f} bytes")
+            st.write("**Memória por coluna** (antes: tipos inferidos pelo pandas, estimado por amostra):")
+            table.render_table(memory.column_profile(csv_file), key='memory_columns_table', formats={'Redução (%)': '%.1f'})
     
+    elif op == 'Perfil de memória':
+        st.subheader('Perfil de Memória')
+        st.markdown('Quanto cada versão do dataset custa a este processo: colunas, estruturas em cache e RSS.')
+        columns_profile = memory.column_profile(csv_file)
+        before, after = columns_profile['Antes (bytes)'].sum(), columns_profile['Depois (bytes)'].sum()
+        col1, col2, col3 = st.columns(3)
+        col1.metric('Dataset sem otimização', f'{before / 1024 ** 2:,.1f} MB')
+        col2.metric('Dataset com os tipos do loader', f'{after / 1024 ** 2:,.1f} MB', f'{after / before - 1:.0%}', delta_color='inverse')
+        rss = memory.rss_bytes()
+        col3.metric('RSS do processo', f'{rss / 1024 ** 2:,.1f} MB' if rss is not None else 'Indisponível')
+
+        st.write('**Bytes por coluna:**')
+        table.render_table(columns_profile, key='memory_profile_columns_table', formats={'Redução (%)': '%.1f'})
+
+        st.write('**Estruturas em cache (versão atual):**')
+        caches = memory.cache_sizes(csv_file)
+        caches['MB'] = caches['Bytes'] / 1024 ** 2
+        table.render_table(caches, key='memory_profile_caches_table', formats={'MB': '%.2f'})
+
+        history = memory.rss_history()
+        if not history.empty:
+            history['RSS (MB)'] = history['RSS (bytes)'] / 1024 ** 2
+            fig = px.line(
+                history,
+                x='Momento',
+                y='RSS (MB)',
+                color='Versão',
+                title='RSS do processo ao longo do tempo',
+                markers=True
+            )
+            fig.update_layout(height=400, xaxis_title='Momento', yaxis_title='RSS (MB)')
+            plotly_chart(fig, use_container_width=True)
+            st.write('**Custo por versão do dataset:**')
+            table.render_table(memory.version_costs(history), key='memory_profile_versions_table')
+        else:
+            st.info('Sem amostras de RSS neste sistema.')
+
+    elif op == 'Latência das consultas':
+        st.subheader('Latência das Consultas')
+        st.markdown('Consultas idênticas pedidas ao mesmo tempo por várias sessões são calculadas uma vez só; '
+                    '"Agrupados" conta os pedidos que aproveitaram um cálculo em andamento.')
+        latency = service.stats()
+        if latency.empty:
+            st.info('Nenhuma consulta passou pelo serviço desde que o app iniciou.')
+        else:
+            col1, col2 = st.columns(2)
+            col1.metric('Pedidos', f"{latency['Pedidos'].sum():,}")
+            col2.metric('Cálculos evitados', f"{latency['Agrupados'].sum():,}")
+            formats = {col: '%.1f' for col in latency.columns if col.endswith('(ms)')}
+            table.render_table(latency, key='query_latency_table', formats=formats)
+
     elif op == 'Tipos de dados contidos no arquivo analisado':
         st.subheader('Tipos de Dados')
         st.markdown('Detalhes sobre os tipos de dados e valores não nulos em cada coluna.')
@@ -303,41 +384,20 @@ def inf_arv():
             'Tipo de Dado': [str(dtype) for dtype in df.dtypes],
             'Valores Não Nulos': [df[col].notnull().sum() for col in df.columns]
         })
-        styled_dtypes = dtypes_df.style.set_properties(**{
-            'background-color': '#4F1C51',
-            'color': 'white',
-            'text-align': 'center',
-            'border-color': '#d3d3d3',
-            'border-style': 'solid',
-            'border-width': '1px'
-        }).set_table_styles([
-            {'selector': 'th', 'props': [('background-color', '#2196F3'), ('color', 'white'), ('font-weight', 'bold')]}
-        ]).highlight_max(subset=['Valores Não Nulos'], color='#4F1C51')
-        st.dataframe(styled_dtypes, use_container_width=True)
+        table.render_table(dtypes_df, key='dtypes_table')
     
     elif op == 'Lançamentos por ano':
         st.subheader('Lançamentos por Ano')
         st.markdown('Filtre os jogos lançados em um ano específico e veja os detalhes.')
         ano = st.sidebar.slider('Selecione o ano para filtrar:', min_value=1980, max_value=2020, value=1980, step=1, key='inf_year')
-        if st.sidebar.button('Filtrar', key='inf_filter_year'):
-            jogo_filter = df[df['Year'] == ano]
+        if table.button('Filtrar', key='inf_filter_year', params=(ano,)):
+            jogo_filter = queries.games_by_year(ano)
             if not jogo_filter.empty:
                 st.write(f'**Jogos lançados em {ano}**')
-                styled_filter = jogo_filter[['Name', 'Rank', 'Year', 'Publisher', 'Genre']].style.set_properties(**{
-                    'background-color': '#4F1C51',
-                    'color': 'white',
-                    'text-align': 'left',
-                    'border-color': '#d3d3d3',
-                    'border-style': 'solid',
-                    'border-width': '1px'
-                }).set_table_styles([
-                    {'selector': 'th', 'props': [('background-color', '#FF5722'), ('color', 'white'), ('font-weight', 'bold')]}
-                ])
-                st.dataframe(styled_filter, use_container_width=True)
+                table.render_table(jogo_filter[['Name', 'Rank', 'Year', 'Publisher', 'Genre']], key='inf_filter_year_table')
                 total_sales = jogo_filter['Global_Sales'].sum()
                 st.metric(label="Total de Vendas Globais", value=f"{total_sales:.2f} milhões")
-                releases_per_year = df['Year'].value_counts().sort_index()
-                avg_releases = releases_per_year.mean()
+                avg_releases = queries.releases_per_year_mean()
                 plot_data = pd.DataFrame({
                     'Ano': [str(ano), 'Média Anual'],
                     'Número de Lançamentos': [len(jogo_filter), avg_releases]
@@ -359,7 +419,7 @@ def inf_arv():
                     showlegend=True,
                     height=400
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                plotly_chart(fig, use_container_width=True)
             else:
                 st.warning(f'Nenhum jogo encontrado para o ano {ano}.')
 
@@ -378,42 +438,25 @@ def filtro_vendas():
 
     if op == 'Filtrar jogos por ano':
         ano = st.sidebar.slider('Selecione o ano:', min_value=1980, max_value=2020, value=1980, step=1, key='vendas_year')
-        if st.sidebar.button('Filtrar', key='vendas_filter_year'):
-            jogo_filter = df[df['Year'] == ano]
+        if table.button('Filtrar', key='vendas_filter_year', params=(ano,)):
+            jogo_filter = queries.games_by_year(ano)
             if not jogo_filter.empty:
                 st.write(f'**Jogos lançados em {ano}:**')
-                styled_filter = jogo_filter[['Name', 'Rank', 'Year', 'Publisher', 'Genre']].style.set_properties(**{
-                    'background-color': '#4F1C51',
-                    'color': 'white',
-                    'text-align': 'left',
-                    'border-color': '#d3d3d3',
-                    'border-style': 'solid',
-                    'border-width': '1px'
-                }).set_table_styles([
-                    {'selector': 'th', 'props': [('background-color', '#FF5722'), ('color', 'white'), ('font-weight', 'bold')]}
-                ])
-                st.dataframe(styled_filter, use_container_width=True)
+                table.render_table(jogo_filter[['Name', 'Rank', 'Year', 'Publisher', 'Genre']], key='vendas_filter_year_table')
                 st.write(f'**Total de vendas globais:** {jogo_filter['Global_Sales'].sum():.2f} milhões')
             else:
                 st.warning(f'Nenhum jogo encontrado para o ano {ano}.')
     
     elif op == 'Filtrar jogos por empresa':
-        empresa = st.sidebar.selectbox('Selecione a empresa:', sorted(df['Publisher'].dropna().unique()), key='vendas_company')
-        if st.sidebar.button('Filtrar', key='vendas_filter_company'):
-            jogo_filter = df[df['Publisher'] == empresa]
+        prefixo = st.sidebar.text_input('Digite o início do nome da empresa:', key='vendas_company_prefix')
+        empresa = st.sidebar.selectbox('Selecione a empresa:', typeahead.suggest('Publisher', prefixo), key='vendas_company')
+        if empresa is None:
+            st.sidebar.warning(f'Nenhuma empresa começa com "{prefixo}".')
+        elif table.button('Filtrar', key='vendas_filter_company', params=(empresa,)):
+            jogo_filter = queries.games_by_publisher(empresa, ['Name', 'Publisher'])
             if not jogo_filter.empty:
                 st.write(f'**Jogos lançados por {empresa}:**')
-                styled_filter = jogo_filter[['Name', 'Publisher']].style.set_properties(**{
-                    'background-color': '#4F1C51',
-                    'color': 'white',
-                    'text-align': 'left',
-                    'border-color': '#d3d3d3',
-                    'border-style': 'solid',
-                    'border-width': '1px'
-                }).set_table_styles([
-                    {'selector': 'th', 'props': [('background-color', '#4CAF50'), ('color', 'white'), ('font-weight', 'bold')]}
-                ])
-                st.dataframe(styled_filter, use_container_width=True)
+                table.render_table(jogo_filter[['Name', 'Publisher']], key='vendas_filter_company_table')
             else:
                 st.warning(f'Nenhuma empresa encontrada com o nome {empresa}.')
     
@@ -427,49 +470,35 @@ def filtro_vendas():
             step=0.1,
             key='vendas_sales'
         )
-        regioes = ['JP_Sales', 'EU_Sales', 'NA_Sales', 'Other_Sales']
-        filtro = df[df[regioes].gt(valor_venda).any(axis=1)]
+        regioes = queries.REGIONS
+        filtro = queries.games_above_sales(valor_venda, regioes, ['Name', 'Publisher'] + regioes)
         if not filtro.empty:
             st.write(f'**Jogos com vendas acima de {valor_venda} milhões em pelo menos uma região:**')
-            styled_filter = filtro[['Name', 'Publisher'] + regioes].style.set_properties(**{
-                'background-color': '#4F1C51',
-                'color': 'white',
-                'text-align': 'left',
-                'border-color': '#d3d3d3',
-                'border-style': 'solid',
-                'border-width': '1px'
-            }).set_table_styles([
-                {'selector': 'th', 'props': [('background-color', '#2196F3'), ('color', 'white'), ('font-weight', 'bold')]}
-            ]).format({col: '{:.2f}' for col in regioes})
-            st.dataframe(styled_filter, use_container_width=True)
+            table.render_table(filtro[['Name', 'Publisher'] + regioes], key='vendas_sales_table', formats={col: '%.2f' for col in regioes})
         else:
             st.warning(f'Nenhum jogo encontrado com vendas acima de {valor_venda} milhões.')
     
     elif op == 'Filtrar por continente':
         continente = st.sidebar.selectbox('Selecione o continente:', ['EU_Sales', 'NA_Sales', 'JP_Sales', 'Other_Sales'], key='vendas_continent')
-        empresa = st.sidebar.selectbox('Selecione a empresa:', sorted(df['Publisher'].dropna().unique()), key='vendas_continent_company')
+        prefixo = st.sidebar.text_input('Digite o início do nome da empresa:', key='vendas_continent_company_prefix')
+        empresa = st.sidebar.selectbox('Selecione a empresa:', typeahead.suggest('Publisher', prefixo), key='vendas_continent_company')
+        if empresa is None:
+            st.sidebar.warning(f'Nenhuma empresa começa com "{prefixo}".')
         filtrar_vendas = st.sidebar.checkbox('Filtrar por valor de vendas?', key='vendas_continent_checkbox')
         if filtrar_vendas:
             valor_venda = st.sidebar.number_input('Digite o valor mínimo de vendas (em milhões):', min_value=0.0, step=0.1, key='vendas_continent_sales')
-        if st.sidebar.button('Filtrar', key='vendas_filter_continent'):
-            filtro = df[df['Publisher'] == empresa]
+        if empresa is not None and table.button(
+            'Filtrar', key='vendas_filter_continent',
+            params=(continente, empresa, valor_venda if filtrar_vendas else None)
+        ):
             if filtrar_vendas:
-                filtro = filtro[filtro[continente] > valor_venda]
+                filtro = queries.games_by_publisher(empresa, ['Name', 'Publisher', continente], continente, valor_venda)
                 st.write(f'**Vendas de {empresa} em {continente} acima de {valor_venda} milhões:**')
             else:
+                filtro = queries.games_by_publisher(empresa, ['Name', 'Publisher', continente])
                 st.write(f'**Vendas de {empresa} em {continente}:**')
             if not filtro.empty:
-                styled_filter = filtro[['Name', 'Publisher', continente]].style.set_properties(**{
-                    'background-color': '#4F1C51',
-                    'color': 'white',
-                    'text-align': 'left',
-                    'border-color': '#d3d3d3',
-                    'border-style': 'solid',
-                    'border-width': '1px'
-                }).set_table_styles([
-                    {'selector': 'th', 'props': [('background-color', '#FF5722'), ('color', 'white'), ('font-weight', 'bold')]}
-                ])
-                st.dataframe(styled_filter, use_container_width=True)
+                table.render_table(filtro[['Name', 'Publisher', continente]], key='vendas_filter_continent_table', formats={continente: '%.2f'})
             else:
                 st.warning(f'Nenhum jogo encontrado para {empresa} em {continente}.')
     
@@ -477,26 +506,15 @@ def filtro_vendas():
         filtrar = st.sidebar.checkbox('Filtrar por valor de vendas?', key='vendas_global_checkbox')
         if filtrar:
             valor = st.sidebar.number_input('Digite o valor mínimo de vendas globais (em milhões):', min_value=0.0, step=0.1, key='vendas_global_sales')
-            if st.sidebar.button('Filtrar', key='vendas_filter_global'):
-                filtro = df[df['Global_Sales'] > valor]
+            if table.button('Filtrar', key='vendas_filter_global', params=(valor,)):
+                filtro = queries.games_above_global_sales(valor, ['Name', 'Publisher', 'Global_Sales'])
                 if not filtro.empty:
                     st.write(f'**Vendas globais acima de {valor} milhões:**')
-                    styled_filter = filtro[['Name', 'Publisher', 'Global_Sales']].style.set_properties(**{
-                        'background-color': '#4F1C51',
-                        'color': 'white',
-                        'text-align': 'left',
-                        'border-color': '#d3d3d3',
-                        'border-style': 'solid',
-                        'border-width': '1px'
-                    }).set_table_styles([
-                        {'selector': 'th', 'props': [('background-color', '#4CAF50'), ('color', 'white'), ('font-weight', 'bold')]}
-                    ]).format({'Global_Sales': '{:.2f}'})
-                    st.dataframe(styled_filter, use_container_width=True)
+                    table.render_table(filtro[['Name', 'Publisher', 'Global_Sales']], key='vendas_filter_global_table', formats={'Global_Sales': '%.2f'})
                 else:
                     st.warning(f'Nenhum jogo encontrado com vendas globais acima de {valor} milhões.')
         else:
-            total_vendas = df['Global_Sales'].sum()
-            avg_sales_per_game = df['Global_Sales'].mean()
+            total_vendas = queries.total_sales('Global_Sales')
             st.markdown(f"""
                 <div class="metric-card">
                     <h3>🌍 Total de Vendas Globais</h3>
@@ -510,23 +528,13 @@ def filtro_vendas():
         if filtrar_qtd:
             qtd = st.sidebar.slider('Selecione a quantidade de jogos:', min_value=1, max_value=50, value=10, step=1, key='vendas_top_sales_qty')
             if st.sidebar.button('Filtrar', key='vendas_filter_top_sales'):
-                big_vendas = df.sort_values(by='Global_Sales', ascending=False).head(qtd)
+                big_vendas = service.query('top_games', 'Global_Sales', qtd, ['Name', 'Publisher', 'Global_Sales'])
                 st.write(f'**Top {qtd} jogos mais vendidos:**')
-                styled_vendas = big_vendas[['Name', 'Publisher', 'Global_Sales']].style.set_properties(**{
-                    'background-color': '#4F1C51',
-                    'color': 'white',
-                    'text-align': 'left',
-                    'border-color': '#d3d3d3',
-                    'border-style': 'solid',
-                    'border-width': '1px'
-                }).set_table_styles([
-                    {'selector': 'th', 'props': [('background-color', '#2196F3'), ('color', 'white'), ('font-weight', 'bold')]}
-                ]).format({'Global_Sales': '{:.2f}'})
-                st.dataframe(styled_vendas, use_container_width=True)
+                table.render_table(big_vendas[['Name', 'Publisher', 'Global_Sales']], key='vendas_filter_top_sales_table', formats={'Global_Sales': '%.2f'})
                 fig = px.bar(big_vendas, x='Name', y='Global_Sales', title='Top Jogos por Vendas Globais')
-                st.plotly_chart(fig, use_container_width=True)
+                plotly_chart(fig, use_container_width=True)
         else:
-            big_venda = df.loc[df['Global_Sales'].idxmax()]
+            big_venda = queries.best_seller('Global_Sales')
             st.markdown(f"""
                 <div class="metric-card">
                     <h3>🏆 Jogo Mais Vendido</h3>
@@ -537,22 +545,14 @@ def filtro_vendas():
             """, unsafe_allow_html=True)
     
     if op == 'Filtrar por nome do jogo':
-        jogo = st.sidebar.selectbox('Selecione o nome do jogo:', sorted(df['Name'].dropna().unique()), key='vendas_game_name')
-        if st.sidebar.button('Filtrar', key='vendas_filter_game_name'):
-            jogo_filter = df[df['Name'] == jogo].groupby('Name').agg({
-                'Rank': 'min',
-                'Publisher': 'first',
-                'Global_Sales': 'sum',
-                'NA_Sales': 'sum',
-                'EU_Sales': 'sum',
-                'JP_Sales': 'sum',
-                'Other_Sales': 'sum',
-                'Year': 'first',
-                'Genre': 'first',
-                'Platform': 'first'
-            }).reset_index()
-            if not jogo_filter.empty:
-                linha = jogo_filter.iloc[0]
+        # Só as primeiras sugestões para o prefixo digitado vão para o navegador
+        prefixo = st.sidebar.text_input('Digite o início do nome do jogo:', key='vendas_game_prefix')
+        jogo = st.sidebar.selectbox('Selecione o nome do jogo:', typeahead.suggest('Name', prefixo), key='vendas_game_name')
+        if jogo is None:
+            st.sidebar.warning(f'Nenhum jogo começa com "{prefixo}".')
+        elif st.sidebar.button('Filtrar', key='vendas_filter_game_name'):
+            linha = queries.game_summary(jogo)
+            if linha is not None:
                 st.markdown(f"""
                     <div class="game-card">
                         <h2>{linha['Name']}</h2>
@@ -585,7 +585,7 @@ def filtro_vendas():
     elif op == 'Ver métricas':
         genres = st.sidebar.multiselect(
             'Selecione os gêneros:', 
-            sorted(df['Genre'].dropna().unique()),
+            typeahead.unique_values('Genre'),
             key='vendas_metrics_genres'
         )
         plot_type = st.sidebar.selectbox(
@@ -595,42 +595,22 @@ def filtro_vendas():
         )
         if st.sidebar.button('Gerar métricas', key='vendas_metrics_button'):
             if genres:
-                filtered_df = df[df['Genre'].isin(genres)]
-                sales_data = filtered_df.groupby('Genre').agg({
-                    'Global_Sales': 'sum',
-                    'NA_Sales': 'sum',
-                    'EU_Sales': 'sum',
-                    'JP_Sales': 'sum',
-                    'Other_Sales': 'sum'
-                }).reset_index()
-                plot_data = []
-                for _, row in sales_data.iterrows():
-                    for region in ['Global_Sales', 'NA_Sales', 'EU_Sales', 'JP_Sales', 'Other_Sales']:
-                        plot_data.append({
-                            'Gênero': row['Genre'],
-                            'Região': region.replace('_Sales', ''),
-                            'Vendas (milhões)': row[region]
-                        })
-                plot_df = pd.DataFrame(plot_data)
+                sales_data = queries.genre_sales(genres)
+                regions = ['Global_Sales', 'NA_Sales', 'EU_Sales', 'JP_Sales', 'Other_Sales']
+                plot_df = reshape.to_long(
+                    sales_data, 'Genre', regions,
+                    var_name='Região', value_name='Vendas (milhões)',
+                    labels=[region.replace('_Sales', '') for region in regions]
+                ).rename(columns={'Genre': 'Gênero'})
                 st.write('**Resumo de vendas por gênero:**')
-                styled_sales = sales_data.rename(columns={
+                table.render_table(sales_data.rename(columns={
                     'Genre': 'Gênero',
                     'Global_Sales': 'Global',
                     'NA_Sales': 'NA',
                     'EU_Sales': 'EU',
                     'JP_Sales': 'JP',
                     'Other_Sales': 'Outros'
-                }).style.set_properties(**{
-                    'background-color': '#4F1C51',
-                    'color': 'white',
-                    'text-align': 'left',
-                    'border-color': '#d3d3d3',
-                    'border-style': 'solid',
-                    'border-width': '1px'
-                }).set_table_styles([
-                    {'selector': 'th', 'props': [('background-color', '#4CAF50'), ('color', 'white'), ('font-weight', 'bold')]}
-                ]).format({col: '{:.2f}' for col in ['Global', 'NA', 'EU', 'JP', 'Outros']})
-                st.dataframe(styled_sales, use_container_width=True)
+                }), key='vendas_metrics_button_table', formats={col: '%.2f' for col in ['Global', 'NA', 'EU', 'JP', 'Outros']})
                 if plot_type == 'Barplot':
                     fig = px.bar(
                         plot_df,
@@ -680,7 +660,7 @@ def filtro_vendas():
                     yaxis_title='Vendas (milhões)',
                     height=500
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                plotly_chart(fig, use_container_width=True)
             else:
                 st.info('Por favor, selecione pelo menos um gênero.')
 
@@ -694,23 +674,11 @@ def listar_games():
     if op == 'Todos os jogos':
         st.subheader('Lista de Todos os Jogos')
         st.markdown('Selecione um jogo para ver detalhes e visualizar gráficos de vendas.')
-        styled_df = df[['Name']].style.set_properties(**{
-            'background-color': '#4F1C51',
-            'color': 'white',
-            'text-align': 'left',
-            'border-color': '#d3d3d3',
-            'border-style': 'solid',
-            'border-width': '1px',
-            'font-size': '14px'
-        }).set_table_styles([
-            {'selector': 'th', 'props': [('background-color', '#4CAF50'), ('color', 'white'), ('font-weight', 'bold')]}
-        ])
-        selected = st.dataframe(
-            styled_df,
-            use_container_width=True,
+        visible, selected = table.render_table(
+            df[['Name']],
+            key='listar_game_select',
             on_select="rerun",
             selection_mode="single-row",
-            key='listar_game_select',
             height=400
         )
         plot_type = st.sidebar.selectbox(
@@ -719,8 +687,9 @@ def listar_games():
             key='plot_type_select'
         )
         if selected['selection']['rows']:
-            selected_index = selected['selection']['rows'][0]
-            selected_game = df.iloc[selected_index]
+            # a seleção é relativa à página visível da tabela
+            selected_index = visible.index[selected['selection']['rows'][0]]
+            selected_game = df.loc[selected_index]
             st.markdown(f"""
                 <div class="game-card">
                     <h2>{selected_game["Name"]}</h2>
@@ -820,24 +789,14 @@ def listar_games():
             fig.update_traces(
                 hovertemplate='%{x}<br>Vendas: %{y:.2f} milhões'
             )
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, use_container_width=True)
 
     elif op == 'Quantidade de jogos em específico':
         qtd = st.sidebar.slider('Selecione a quantidade de jogos:', min_value=1, max_value=50, value=10, step=1, key='listar_qty')
         if st.sidebar.button('Filtrar', key='listar_filter_qty_games'):
-            jogos = df[['Name']].head(qtd)
+            jogos = queries.first_games(qtd)
             st.write(f'**Primeiros {qtd} jogos:**')
-            styled_jogos = jogos.style.set_properties(**{
-                'background-color': '#4F1C51',
-                'color': 'white',
-                'text-align': 'left',
-                'border-color': '#d3d3d3',
-                'border-style': 'solid',
-                'border-width': '1px'
-            }).set_table_styles([
-                {'selector': 'th', 'props': [('background-color', '#2196F3'), ('color', 'white'), ('font-weight', 'bold')]}
-            ])
-            st.dataframe(styled_jogos, use_container_width=True)
+            table.render_table(jogos, key='listar_filter_qty_games_table')
 
 def ocorrencias():
     st.header('Análise de Ocorrências')
@@ -852,50 +811,44 @@ def ocorrencias():
         st.markdown('Selecione os gêneros para visualizar a contagem de jogos.')
         genres = st.sidebar.multiselect(
             'Selecione os gêneros:',
-            sorted(df['Genre'].dropna().unique()),
+            typeahead.unique_values('Genre'),
             key='ocorrencias_genre_select'
         )
         if st.sidebar.button('Filtrar', key='ocorrencias_genre_button'):
             if genres:
-                filtered_df = df[df['Genre'].isin(genres)]
-                genre_counts = filtered_df['Genre'].value_counts()
-                st.write('**Contagem de jogos por gênero selecionado:**')
-                styled_genres = genre_counts.reset_index().rename(columns={'index': 'Gênero', 'Genre': 'Quantidade'}).style.set_properties(**{
-                    'background-color': '#4F1C51',
-                    'color': 'white',
-                    'text-align': 'left',
-                    'border-color': '#d3d3d3',
-                    'border-style': 'solid',
-                    'border-width': '1px'
-                }).set_table_styles([
-                    {'selector': 'th', 'props': [('background-color', '#4CAF50'), ('color', 'white'), ('font-weight', 'bold')]}
-                ])
-                st.dataframe(styled_genres, use_container_width=True)
-                plot_data = pd.DataFrame({
-                    'Gênero': genre_counts.index,
-                    'Quantidade': genre_counts.values
-                })
-                fig = px.bar(
-                    plot_data,
-                    x='Quantidade',
-                    y='Gênero',
-                    orientation='h',
-                    title='Contagem de Jogos por Gênero',
-                    labels={'Quantidade': 'Número de Jogos', 'Gênero': 'Gênero'},
-                    text='Quantidade',
-                    color_discrete_sequence=['#4CAF50']
-                )
-                fig.update_traces(texttemplate='%{text:.0f}', textposition='auto')
-                fig.update_layout(
-                    xaxis_title='Número de Jogos',
-                    yaxis_title='Gênero',
-                    height=max(400, len(genre_counts) * 30),
-                    showlegend=False,
-                    font=dict(size=12),
-                    hovermode='y unified'
+                def build_figure(genre_counts):
+                    plot_data = pd.DataFrame({
+                        'Gênero': genre_counts.index,
+                        'Quantidade': genre_counts.values
+                    })
+                    fig = px.bar(
+                        plot_data,
+                        x='Quantidade',
+                        y='Gênero',
+                        orientation='h',
+                        title='Contagem de Jogos por Gênero',
+                        labels={'Quantidade': 'Número de Jogos', 'Gênero': 'Gênero'},
+                        text='Quantidade',
+                        color_discrete_sequence=['#4CAF50']
+                    )
+                    fig.update_traces(texttemplate='%{text:.0f}', textposition='auto')
+                    fig.update_layout(
+                        xaxis_title='Número de Jogos',
+                        yaxis_title='Gênero',
+                        height=max(400, len(genre_counts) * 30),
+                        showlegend=False,
+                        font=dict(size=12),
+                        hovermode='y unified'
+                    )
+                    fig.update_traces(hovertemplate='%{y}<br>Jogos: %{x}')
+                    return fig
+                # num acerto do cache a contagem também não é refeita
+                genre_counts, fig = figure_cache.cached_view(
+                    'ocorrencias_genero', (genres,), lambda: queries.counts('Genre', genres), build_figure
                 )
-                fig.update_traces(hovertemplate='%{y}<br>Jogos: %{x}')
-                st.plotly_chart(fig, use_container_width=True)
+                st.write('**Contagem de jogos por gênero selecionado:**')
+                table.render_table(genre_counts.reset_index().rename(columns={'index': 'Gênero', 'Genre': 'Quantidade'}), key='ocorrencias_genre_button_table')
+                plotly_chart(fig, use_container_width=True)
             else:
                 st.info('Por favor, selecione pelo menos um gênero.')
     
@@ -903,29 +856,11 @@ def ocorrencias():
         st.markdown('Selecione as plataformas para visualizar a contagem de jogos.')
         platforms = st.sidebar.multiselect(
             'Selecione as plataformas:',
-            sorted(df['Platform'].dropna().unique()),
+            typeahead.unique_values('Platform'),
             key='ocorrencias_platform_select'
         )
         if st.sidebar.button('Filtrar', key='ocorrencias_platform_button'):
-            if platforms:
-                filtered_df = df[df['Platform'].isin(platforms)]
-                platform_counts = filtered_df['Platform'].value_counts()
-            else:
-                filtered_df = df
-                platform_counts = df['Platform'].value_counts()
-            if not platform_counts.empty:
-                st.write('**Contagem de jogos por plataforma selecionada:**')
-                styled_platforms = platform_counts.reset_index().rename(columns={'index': 'Plataforma', 'Platform': 'Quantidade'}).style.set_properties(**{
-                    'background-color': '#4F1C51',
-                    'color': 'white',
-                    'text-align': 'left',
-                    'border-color': '#d3d3d3',
-                    'border-style': 'solid',
-                    'border-width': '1px'
-                }).set_table_styles([
-                    {'selector': 'th', 'props': [('background-color', '#2196F3'), ('color', 'white'), ('font-weight', 'bold')]}
-                ])
-                st.dataframe(styled_platforms, use_container_width=True)
+            def build_figure(platform_counts):
                 plot_data = pd.DataFrame({
                     'Plataforma': platform_counts.index,
                     'Quantidade': platform_counts.values
@@ -950,7 +885,14 @@ def ocorrencias():
                     hovermode='y unified'
                 )
                 fig.update_traces(hovertemplate='%{y}<br>Jogos: %{x}')
-                st.plotly_chart(fig, use_container_width=True)
+                return fig
+            platform_counts, fig = figure_cache.cached_view(
+                'ocorrencias_plataforma', (platforms,), lambda: queries.counts('Platform', platforms), build_figure
+            )
+            if not platform_counts.empty:
+                st.write('**Contagem de jogos por plataforma selecionada:**')
+                table.render_table(platform_counts.reset_index().rename(columns={'index': 'Plataforma', 'Platform': 'Quantidade'}), key='ocorrencias_platform_button_table')
+                plotly_chart(fig, use_container_width=True)
             else:
                 st.warning('Nenhuma plataforma encontrada com os filtros selecionados.')
         else:
@@ -966,21 +908,7 @@ def ocorrencias():
             step=10,
             key='ocorrencias_publisher_count'
         )
-        publisher_counts = df['Publisher'].value_counts()
-        filtered_publishers = publisher_counts[publisher_counts <= max_count].head(10)
-        if not filtered_publishers.empty:
-            st.write(f'**Contagem de jogos por empresa (máximo {max_count} jogos, top 10):**')
-            styled_publishers = filtered_publishers.reset_index().rename(columns={'index': 'Empresa', 'Publisher': 'Quantidade'}).style.set_properties(**{
-                'background-color': '#4F1C51',
-                'color': 'white',
-                'text-align': 'left',
-                'border-color': '#d3d3d3',
-                'border-style': 'solid',
-                'border-width': '1px'
-            }).set_table_styles([
-                {'selector': 'th', 'props': [('background-color', '#FF5722'), ('color', 'white'), ('font-weight', 'bold')]}
-            ])
-            st.dataframe(styled_publishers, use_container_width=True)
+        def build_figure(filtered_publishers):
             plot_data = pd.DataFrame({
                 'Empresa': filtered_publishers.index,
                 'Quantidade': filtered_publishers.values
@@ -1005,37 +933,35 @@ def ocorrencias():
                 hovermode='y unified'
             )
             fig.update_traces(hovertemplate='%{y}<br>Jogos: %{x}')
-            st.plotly_chart(fig, use_container_width=True)
+            return fig
+        filtered_publishers, fig = figure_cache.cached_view(
+            'ocorrencias_empresa', (max_count,), lambda: queries.publisher_counts(max_count, 10), build_figure
+        )
+        if not filtered_publishers.empty:
+            st.write(f'**Contagem de jogos por empresa (máximo {max_count} jogos, top 10):**')
+            table.render_table(filtered_publishers.reset_index().rename(columns={'index': 'Empresa', 'Publisher': 'Quantidade'}), key='ocorrencias_publisher_count_table')
+            plotly_chart(fig, use_container_width=True)
         else:
             st.warning(f'Nenhuma empresa encontrada com até {max_count} jogos. Tente aumentar o valor.')
     
     elif op == 'Distribuição de lançamentos por ano':
         year_range = st.sidebar.slider('Selecione o intervalo de anos:', min_value=1980, max_value=2020, value=(1980, 2020), step=1, key='ocorrencias_year_range')
         if st.sidebar.button('Analisar', key='ocorrencias_year'):
-            year_counts = df[(df['Year'] >= year_range[0]) & (df['Year'] <= year_range[1])]['Year'].value_counts().sort_index()
+            year_counts = service.query('year_counts', *year_range)
             if not year_counts.empty:
                 st.write(f'**Distribuição de lançamentos por ano ({year_range[0]} a {year_range[1]}):**')
-                styled_years = year_counts.reset_index().rename(columns={'index': 'Ano', 'Year': 'Quantidade'}).style.set_properties(**{
-                    'background-color': '#4F1C51',
-                    'color': 'white',
-                    'text-align': 'left',
-                    'border-color': '#d3d3d3',
-                    'border-style': 'solid',
-                    'border-width': '1px'
-                }).set_table_styles([
-                    {'selector': 'th', 'props': [('background-color', '#4CAF50'), ('color', 'white'), ('font-weight', 'bold')]}
-                ])
-                st.dataframe(styled_years, use_container_width=True)
-                plt.figure(figsize=(10, 6))
-                sns.lineplot(x=year_counts.index, y=year_counts.values)
-                plt.title('Distribuição de Lançamentos por Ano')
-                plt.xlabel('Ano')
-                plt.ylabel('Quantidade de Jogos')
-                plt.grid(True)
-                plt.tight_layout()
-                plt.savefig('year_distribution.png')
-                st.image('year_distribution.png')
-                plt.close()
+                table.render_table(year_counts.reset_index().rename(columns={'index': 'Ano', 'Year': 'Quantidade'}), key='ocorrencias_year_table')
+                with profiling.phase('render-figure', 'matplotlib'):
+                    plt.figure(figsize=(10, 6))
+                    sns.lineplot(x=year_counts.index, y=year_counts.values)
+                    plt.title('Distribuição de Lançamentos por Ano')
+                    plt.xlabel('Ano')
+                    plt.ylabel('Quantidade de Jogos')
+                    plt.grid(True)
+                    plt.tight_layout()
+                    plt.savefig('year_distribution.png')
+                    st.image('year_distribution.png')
+                    plt.close()
             else:
                 st.warning(f'Nenhum jogo encontrado entre {year_range[0]} e {year_range[1]}.')
 
@@ -1066,15 +992,13 @@ def metricas_avancadas():
             ['Pie Chart', 'Donut Chart', 'Bar Chart'],
             key='metrics_chart_type'
         )
-        filtered_df = df[(df['Year'] >= year_range[0]) & (df['Year'] <= year_range[1])]
-        total_games = filtered_df['Name'].nunique()
-        total_games_all = df['Name'].nunique()
-        oldest_year = int(filtered_df['Year'].min()) if pd.notnull(filtered_df['Year'].min()) else "Desconhecido"
-        recent_year = int(filtered_df['Year'].max()) if pd.notnull(filtered_df['Year'].max()) else "Desconhecido"
-        avg_sales = filtered_df['Global_Sales'].mean()
-        avg_sales_all = df['Global_Sales'].mean()
-        publisher, count = (filtered_df['Publisher'].value_counts().idxmax(), 
-                        filtered_df['Publisher'].value_counts().max()) if not filtered_df['Publisher'].value_counts().empty else ("N/A", 0)
+        metrics = warmup.summary('general_metrics', *year_range)
+        total_games = metrics.total_games
+        oldest_year = metrics.oldest_year if metrics.oldest_year is not None else "Desconhecido"
+        recent_year = metrics.recent_year if metrics.recent_year is not None else "Desconhecido"
+        avg_sales = metrics.avg_sales
+        publisher_counts = metrics.top_publishers
+        publisher, count = metrics.top_publisher
         col1, col2 = st.columns(2)
         with col1:
             st.markdown(f"""
@@ -1091,8 +1015,8 @@ def metricas_avancadas():
                 </div>
             """, unsafe_allow_html=True)
             
-            max_avg_sales = df.groupby(df['Year'] // 10 * 10)['Global_Sales'].mean().max()
-            progress = min(avg_sales / max_avg_sales, 1.0) if max_avg_sales > 0 else 0
+            max_avg_sales = metrics.max_decade_avg_sales
+            progress = min(float(avg_sales / max_avg_sales), 1.0) if max_avg_sales > 0 else 0
             st.progress(progress)
             st.caption(f"Comparação com a média máxima por década: {avg_sales:.2f}/{max_avg_sales:.2f} milhões")
         with col2:
@@ -1122,60 +1046,53 @@ def metricas_avancadas():
             ]
         }
         summary_df = pd.DataFrame(summary_data)
-        styled_summary = summary_df.style.set_properties(**{
-            'background-color': '#4F1C51',
-            'color': 'white',
-            'text-align': 'left',
-            'border-color': '#d3d3d3',
-            'border-style': 'solid',
-            'border-width': '1px'
-        }).set_table_styles([
-            {'selector': 'th', 'props': [('background-color', '#4CAF50'), ('color', 'white'), ('font-weight', 'bold')]}
-        ])
-        st.dataframe(styled_summary, use_container_width=True)
-        if not filtered_df.empty:
-            publisher_counts = filtered_df['Publisher'].value_counts().head(5)
-            publisher_df = pd.DataFrame({
-                'Editora': publisher_counts.index,
-                'Quantidade': publisher_counts.values
-            })
-            if chart_type == 'Pie Chart':
-                fig = px.pie(
-                    publisher_df,
-                    names='Editora',
-                    values='Quantidade',
-                    title='Distribuição dos Top 5 Editores',
-                    color_discrete_sequence=['#4CAF50', '#2196F3', '#FF5722', '#FFC107', '#9C27B0']
-                )
-                fig.update_traces(textinfo='percent+label', textposition='inside')
-            elif chart_type == 'Donut Chart':
-                fig = px.pie(
-                    publisher_df,
-                    names='Editora',
-                    values='Quantidade',
-                    title='Distribuição dos Top 5 Editores',
-                    hole=0.4,
-                    color_discrete_sequence=['#4CAF50', '#2196F3', '#FF5722', '#FFC107', '#9C27B0']
-                )
-                fig.update_traces(textinfo='percent+label', textposition='inside')
-            else:
-                fig = px.bar(
-                    publisher_df,
-                    x='Editora',
-                    y='Quantidade',
-                    title='Distribuição dos Top 5 Editores',
-                    color='Editora',
-                    color_discrete_sequence=['#4CAF50', '#2196F3', '#FF5722', '#FFC107', '#9C27B0'],
-                    text='Quantidade'
+        table.render_table(summary_df, key='metrics_summary_table')
+        if not publisher_counts.empty:
+            publisher_counts = publisher_counts.head(5)
+            def build_figure():
+                publisher_df = pd.DataFrame({
+                    'Editora': publisher_counts.index,
+                    'Quantidade': publisher_counts.values
+                })
+                if chart_type == 'Pie Chart':
+                    fig = px.pie(
+                        publisher_df,
+                        names='Editora',
+                        values='Quantidade',
+                        title='Distribuição dos Top 5 Editores',
+                        color_discrete_sequence=['#4CAF50', '#2196F3', '#FF5722', '#FFC107', '#9C27B0']
+                    )
+                    fig.update_traces(textinfo='percent+label', textposition='inside')
+                elif chart_type == 'Donut Chart':
+                    fig = px.pie(
+                        publisher_df,
+                        names='Editora',
+                        values='Quantidade',
+                        title='Distribuição dos Top 5 Editores',
+                        hole=0.4,
+                        color_discrete_sequence=['#4CAF50', '#2196F3', '#FF5722', '#FFC107', '#9C27B0']
+                    )
+                    fig.update_traces(textinfo='percent+label', textposition='inside')
+                else:
+                    fig = px.bar(
+                        publisher_df,
+                        x='Editora',
+                        y='Quantidade',
+                        title='Distribuição dos Top 5 Editores',
+                        color='Editora',
+                        color_discrete_sequence=['#4CAF50', '#2196F3', '#FF5722', '#FFC107', '#9C27B0'],
+                        text='Quantidade'
+                    )
+                    fig.update_traces(texttemplate='%{text:.0f}', textposition='auto')
+                fig.update_layout(
+                    height=400,
+                    showlegend=True,
+                    xaxis_title='Editora',
+                    yaxis_title='Quantidade de Jogos'
                 )
-                fig.update_traces(texttemplate='%{text:.0f}', textposition='auto')
-            fig.update_layout(
-                height=400,
-                showlegend=True,
-                xaxis_title='Editora',
-                yaxis_title='Quantidade de Jogos'
-            )
-            st.plotly_chart(fig, use_container_width=True)
+                return fig
+            fig = figure_cache.cached_figure('metricas_gerais', (year_range, chart_type), build_figure)
+            plotly_chart(fig, use_container_width=True)
         else:
             st.warning("Nenhum dado disponível para o intervalo selecionado.")
     
@@ -1197,41 +1114,21 @@ def metricas_avancadas():
         )
         platforms = st.sidebar.multiselect(
             'Filtrar por plataforma:',
-            sorted(df['Platform'].dropna().unique()),
+            typeahead.unique_values('Platform'),
             key='top_platform_filter'
         )
         genres = st.sidebar.multiselect(
             'Filtrar por gênero:',
-            sorted(df['Genre'].dropna().unique()),
+            typeahead.unique_values('Genre'),
             key='top_genre_filter'
         )
         publishers = st.sidebar.multiselect(
             'Filtrar por editora:',
-            sorted(df['Publisher'].dropna().unique()),
+            typeahead.unique_values('Publisher'),
             key='top_publisher_filter'
         )
         if st.sidebar.button('Filtrar', key='top_filter_button'):
-            filtered_df = df.copy()
-            if platforms:
-                filtered_df = filtered_df[filtered_df['Platform'].isin(platforms)]
-            if genres:
-                filtered_df = filtered_df[filtered_df['Genre'].isin(genres)]
-            if publishers:
-                filtered_df = filtered_df[filtered_df['Publisher'].isin(publishers)]
-            if not filtered_df.empty:
-                top_games = filtered_df.sort_values(by=sales_type, ascending=False).head(n_games)
-                st.write(f'**Top {n_games} jogos por {sales_type.replace("_Sales", "")}**')
-                styled_top = top_games[['Name', 'Platform', 'Year', sales_type]].style.set_properties(**{
-                    'background-color': '#4F1C51',
-                    'color': 'white',
-                    'text-align': 'left',
-                    'border-color': '#d3d3d3',
-                    'border-style': 'solid',
-                    'border-width': '1px'
-                }).set_table_styles([
-                    {'selector': 'th', 'props': [('background-color', '#FF5722'), ('color', 'white'), ('font-weight', 'bold')]}
-                ]).format({sales_type: '{:.2f}'})
-                st.dataframe(styled_top, use_container_width=True)
+            def build_figure(top_games):
                 fig = px.bar(
                     top_games,
                     y='Name',
@@ -1249,7 +1146,20 @@ def metricas_avancadas():
                     height=max(400, n_games * 50),
                     showlegend=False
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                return fig
+            top_games, fig = figure_cache.cached_view(
+                'metricas_top_jogos', (sales_type, n_games, platforms, genres, publishers),
+                lambda: service.query(
+                    'top_games',
+                    sales_type, n_games, ['Name', 'Platform', 'Year', sales_type],
+                    platforms=platforms, genres=genres, publishers=publishers
+                ),
+                build_figure
+            )
+            if not top_games.empty:
+                st.write(f'**Top {n_games} jogos por {sales_type.replace("_Sales", "")}**')
+                table.render_table(top_games[['Name', 'Platform', 'Year', sales_type]], key='top_filter_button_table', formats={sales_type: '%.2f'})
+                plotly_chart(fig, use_container_width=True)
             else:
                 st.warning('Nenhum jogo encontrado com os filtros selecionados.')
     
@@ -1264,31 +1174,23 @@ def metricas_avancadas():
         )
         if st.sidebar.button('Analisar', key='region_button'):
             if regions:
-                sales_data = df[regions].sum().reset_index()
-                sales_data.columns = ['Região', 'Vendas (milhões)']
-                sales_data['Região'] = sales_data['Região'].str.replace('_Sales', '')
-                st.write('**Total de vendas por região selecionada:**')
-                styled_sales = sales_data.style.set_properties(**{
-                    'background-color': '#4F1C51',
-                    'color': 'white',
-                    'text-align': 'left',
-                    'border-color': '#d3d3d3',
-                    'border-style': 'solid',
-                    'border-width': '1px'
-                }).set_table_styles([
-                    {'selector': 'th', 'props': [('background-color', '#4CAF50'), ('color', 'white'), ('font-weight', 'bold')]}
-                ]).format({'Vendas (milhões)': '{:.2f}'})
-                st.dataframe(styled_sales, use_container_width=True)
-                fig = px.pie(
-                    sales_data,
-                    names='Região',
-                    values='Vendas (milhões)',
-                    title='Distribuição de Vendas por Região',
-                    color_discrete_sequence=['#4CAF50', '#2196F3', '#FF5722', '#FFC107', '#9C27B0']
+                def build_figure(sales_data):
+                    fig = px.pie(
+                        sales_data,
+                        names='Região',
+                        values='Vendas (milhões)',
+                        title='Distribuição de Vendas por Região',
+                        color_discrete_sequence=['#4CAF50', '#2196F3', '#FF5722', '#FFC107', '#9C27B0']
+                    )
+                    fig.update_traces(textinfo='percent+label', textposition='inside')
+                    fig.update_layout(height=400)
+                    return fig
+                sales_data, fig = figure_cache.cached_view(
+                    'metricas_regioes', (regions,), lambda: warmup.summary('region_totals', regions), build_figure
                 )
-                fig.update_traces(textinfo='percent+label', textposition='inside')
-                fig.update_layout(height=400)
-                st.plotly_chart(fig, use_container_width=True)
+                st.write('**Total de vendas por região selecionada:**')
+                table.render_table(sales_data, key='region_button_table', formats={'Vendas (milhões)': '%.2f'})
+                plotly_chart(fig, use_container_width=True)
             else:
                 st.info('Por favor, selecione pelo menos uma região.')
     
@@ -1301,70 +1203,59 @@ def metricas_avancadas():
         )
         if st.sidebar.button('Analisar', key='genre_button'):
             if metric == 'Número de Jogos':
-                genre_counts = df['Genre'].value_counts().reset_index()
-                genre_counts.columns = ['Gênero', 'Quantidade']
+                def compute():
+                    genre_counts = warmup.summary('counts', 'Genre').reset_index()
+                    genre_counts.columns = ['Gênero', 'Quantidade']
+                    return genre_counts
+                def build_figure(genre_counts):
+                    fig = px.bar(
+                        genre_counts,
+                        x='Quantidade',
+                        y='Gênero',
+                        orientation='h',
+                        title='Popularidade de Gêneros por Número de Jogos',
+                        labels={'Quantidade': 'Número de Jogos', 'Gênero': 'Gênero'},
+                        text='Quantidade',
+                        color_discrete_sequence=['#2196F3']
+                    )
+                    fig.update_traces(texttemplate='%{text:.0f}', textposition='auto')
+                    fig.update_layout(
+                        xaxis_title='Número de Jogos',
+                        yaxis_title='Gênero',
+                        height=max(400, len(genre_counts) * 30),
+                        showlegend=False
+                    )
+                    return fig
+                genre_counts, fig = figure_cache.cached_view('metricas_generos_contagem', (), compute, build_figure)
                 st.write('**Número de jogos por gênero:**')
-                styled_genres = genre_counts.style.set_properties(**{
-                    'background-color': '#4F1C51',
-                    'color': 'white',
-                    'text-align': 'left',
-                    'border-color': '#d3d3d3',
-                    'border-style': 'solid',
-                    'border-width': '1px'
-                }).set_table_styles([
-                    {'selector': 'th', 'props': [('background-color', '#2196F3'), ('color', 'white'), ('font-weight', 'bold')]}
-                ])
-                st.dataframe(styled_genres, use_container_width=True)
-                fig = px.bar(
-                    genre_counts,
-                    x='Quantidade',
-                    y='Gênero',
-                    orientation='h',
-                    title='Popularidade de Gêneros por Número de Jogos',
-                    labels={'Quantidade': 'Número de Jogos', 'Gênero': 'Gênero'},
-                    text='Quantidade',
-                    color_discrete_sequence=['#2196F3']
-                )
-                fig.update_traces(texttemplate='%{text:.0f}', textposition='auto')
-                fig.update_layout(
-                    xaxis_title='Número de Jogos',
-                    yaxis_title='Gênero',
-                    height=max(400, len(genre_counts) * 30),
-                    showlegend=False
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                table.render_table(genre_counts, key='genre_button_table')
+                plotly_chart(fig, use_container_width=True)
             else:
-                genre_sales = df.groupby('Genre')['Global_Sales'].sum().reset_index()
-                st.write('**Vendas globais por gênero:**')
-                styled_sales = genre_sales.style.set_properties(**{
-                    'background-color': '#4F1C51',
-                    'color': 'white',
-                    'text-align': 'left',
-                    'border-color': '#d3d3d3',
-                    'border-style': 'solid',
-                    'border-width': '1px'
-                }).set_table_styles([
-                    {'selector': 'th', 'props': [('background-color', '#FF5722'), ('color', 'white'), ('font-weight', 'bold')]}
-                ]).format({'Global_Sales': '{:.2f}'})
-                st.dataframe(styled_sales, use_container_width=True)
-                fig = px.bar(
-                    genre_sales,
-                    x='Global_Sales',
-                    y='Genre',
-                    orientation='h',
-                    title='Popularidade de Gêneros por Vendas Globais',
-                    labels={'Global_Sales': 'Vendas (milhões)', 'Genre': 'Gênero'},
-                    text='Global_Sales',
-                    color_discrete_sequence=['#FF5722']
-                )
-                fig.update_traces(texttemplate='%{text:.2f}', textposition='auto')
-                fig.update_layout(
-                    xaxis_title='Vendas (milhões)',
-                    yaxis_title='Gênero',
-                    height=max(400, len(genre_sales) * 30),
-                    showlegend=False
+                def build_figure(genre_sales):
+                    fig = px.bar(
+                        genre_sales,
+                        x='Global_Sales',
+                        y='Genre',
+                        orientation='h',
+                        title='Popularidade de Gêneros por Vendas Globais',
+                        labels={'Global_Sales': 'Vendas (milhões)', 'Genre': 'Gênero'},
+                        text='Global_Sales',
+                        color_discrete_sequence=['#FF5722']
+                    )
+                    fig.update_traces(texttemplate='%{text:.2f}', textposition='auto')
+                    fig.update_layout(
+                        xaxis_title='Vendas (milhões)',
+                        yaxis_title='Gênero',
+                        height=max(400, len(genre_sales) * 30),
+                        showlegend=False
+                    )
+                    return fig
+                genre_sales, fig = figure_cache.cached_view(
+                    'metricas_generos_vendas', (), lambda: warmup.summary('genre_sales')[['Genre', 'Global_Sales']], build_figure
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                st.write('**Vendas globais por gênero:**')
+                table.render_table(genre_sales, key='genre_button_sales_table', formats={'Global_Sales': '%.2f'})
+                plotly_chart(fig, use_container_width=True)
     
     elif op == 'Tendências Temporais':
         st.subheader('Tendências Temporais')
@@ -1382,105 +1273,102 @@ def metricas_avancadas():
             key='temporal_year_range'
         )
         if st.sidebar.button('Analisar', key='temporal_button'):
-            filtered_df = df[(df['Year'] >= year_range[0]) & (df['Year'] <= year_range[1])]
             if metric == 'Número de Lançamentos':
-                year_counts = filtered_df['Year'].value_counts().sort_index().reset_index()
-                year_counts.columns = ['Ano', 'Quantidade']
+                def compute():
+                    year_counts = warmup.summary('year_counts', *year_range).reset_index()
+                    year_counts.columns = ['Ano', 'Quantidade']
+                    return year_counts
+                def build_figure(year_counts):
+                    fig = px.line(
+                        year_counts,
+                        x='Ano',
+                        y='Quantidade',
+                        title=f'Número de Lançamentos por Ano ({year_range[0]} a {year_range[1]})',
+                        labels={'Quantidade': 'Número de Lançamentos', 'Ano': 'Ano'},
+                        markers=True,
+                        color_discrete_sequence=['#4CAF50']
+                    )
+                    fig.update_layout(
+                        xaxis_title='Ano',
+                        yaxis_title='Número de Lançamentos',
+                        height=400
+                    )
+                    return fig
+                year_counts, fig = figure_cache.cached_view('metricas_tendencias_contagem', (year_range,), compute, build_figure)
                 st.write(f'**Número de lançamentos por ano ({year_range[0]} a {year_range[1]}):**')
-                styled_years = year_counts.style.set_properties(**{
-                    'background-color': '#4F1C51',
-                    'color': 'white',
-                    'text-align': 'left',
-                    'border-color': '#d3d3d3',
-                    'border-style': 'solid',
-                    'border-width': '1px'
-                }).set_table_styles([
-                    {'selector': 'th', 'props': [('background-color', '#4CAF50'), ('color', 'white'), ('font-weight', 'bold')]}
-                ])
-                st.dataframe(styled_years, use_container_width=True)
-                fig = px.line(
-                    year_counts,
-                    x='Ano',
-                    y='Quantidade',
-                    title=f'Número de Lançamentos por Ano ({year_range[0]} a {year_range[1]})',
-                    labels={'Quantidade': 'Número de Lançamentos', 'Ano': 'Ano'},
-                    markers=True,
-                    color_discrete_sequence=['#4CAF50']
-                )
-                fig.update_layout(
-                    xaxis_title='Ano',
-                    yaxis_title='Número de Lançamentos',
-                    height=400
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                table.render_table(year_counts, key='temporal_button_table')
+                plotly_chart(fig, use_container_width=True)
             else:
-                year_sales = filtered_df.groupby('Year')['Global_Sales'].sum().reset_index()
-                st.write(f'**Vendas globais por ano ({year_range[0]} a {year_range[1]}):**')
-                styled_sales = year_sales.style.set_properties(**{
-                    'background-color': '#4F1C51',
-                    'color': 'white',
-                    'text-align': 'left',
-                    'border-color': '#d3d3d3',
-                    'border-style': 'solid',
-                    'border-width': '1px'
-                }).set_table_styles([
-                    {'selector': 'th', 'props': [('background-color', '#2196F3'), ('color', 'white'), ('font-weight', 'bold')]}
-                ]).format({'Global_Sales': '{:.2f}'})
-                st.dataframe(styled_sales, use_container_width=True)
-                fig = px.line(
-                    year_sales,
-                    x='Year',
-                    y='Global_Sales',
-                    title=f'Vendas Globais por Ano ({year_range[0]} a {year_range[1]})',
-                    labels={'Global_Sales': 'Vendas (milhões)', 'Year': 'Ano'},
-                    markers=True,
-                    color_discrete_sequence=['#2196F3']
-                )
-                fig.update_layout(
-                    xaxis_title='Ano',
-                    yaxis_title='Vendas (milhões)',
-                    height=400
+                def build_figure(year_sales):
+                    fig = px.line(
+                        year_sales,
+                        x='Year',
+                        y='Global_Sales',
+                        title=f'Vendas Globais por Ano ({year_range[0]} a {year_range[1]})',
+                        labels={'Global_Sales': 'Vendas (milhões)', 'Year': 'Ano'},
+                        markers=True,
+                        color_discrete_sequence=['#2196F3']
+                    )
+                    fig.update_layout(
+                        xaxis_title='Ano',
+                        yaxis_title='Vendas (milhões)',
+                        height=400
+                    )
+                    return fig
+                year_sales, fig = figure_cache.cached_view(
+                    'metricas_tendencias_vendas', (year_range,), lambda: warmup.summary('year_sales', *year_range).reset_index(), build_figure
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                st.write(f'**Vendas globais por ano ({year_range[0]} a {year_range[1]}):**')
+                table.render_table(year_sales, key='temporal_button_sales_table', formats={'Global_Sales': '%.2f'})
+                plotly_chart(fig, use_container_width=True)
     
     elif op == 'Busca de Jogos':
         st.subheader('Busca de Jogos')
         st.markdown('Procure jogos específicos e veja seus detalhes.')
         search_term = st.sidebar.text_input('Digite o nome do jogo (ou parte dele):', key='search_term')
         if st.sidebar.button('Buscar', key='search_button'):
-            if search_term:
-                filtered_df = df[df['Name'].str.contains(search_term, case=False, na=False)]
-                if not filtered_df.empty:
-                    st.write(f'**Resultados da busca por "{search_term}":**')
-                    styled_results = filtered_df[['Name', 'Platform', 'Year', 'Genre', 'Publisher']].style.set_properties(**{
-                        'background-color': '#4F1C51',
-                        'color': 'white',
-                        'text-align': 'left',
-                        'border-color': '#d3d3d3',
-                        'border-style': 'solid',
-                        'border-width': '1px'
-                    }).set_table_styles([
-                        {'selector': 'th', 'props': [('background-color', '#FF5722'), ('color', 'white'), ('font-weight', 'bold')]}
-                    ])
-                    st.dataframe(styled_results, use_container_width=True)
-                    for _, row in filtered_df.iterrows():
-                        with st.expander(f"Detalhes: {row['Name']}"):
-                            st.write(f"**Rank:** {row['Rank']}")
-                            st.write(f"**Plataforma:** {row['Platform']}")
-                            st.write(f"**Ano:** {int(row['Year']) if pd.notnull(row['Year']) else 'Desconhecido'}")
-                            st.write(f"**Gênero:** {row['Genre']}")
-                            st.write(f"**Editora:** {row['Publisher']}")
-                            st.write(f"**Vendas Globais:** {row['Global_Sales']:.2f} milhões")
-                            st.write(f"**Vendas NA:** {row['NA_Sales']:.2f} milhões")
-                            st.write(f"**Vendas EU:** {row['EU_Sales']:.2f} milhões")
-                            st.write(f"**Vendas JP:** {row['JP_Sales']:.2f} milhões")
-                            st.write(f"**Vendas Outros:** {row['Other_Sales']:.2f} milhões")
-                else:
-                    st.warning(f'Nenhum jogo encontrado com o termo "{search_term}".')
+            # guarda o termo buscado para que a troca de página não perca os resultados
+            st.session_state['search_query'] = search_term
+            st.session_state['search_page'] = 1
+        query = st.session_state.get('search_query')
+        if query:
+            page = st.session_state.get('search_page', 1)
+            total, results = queries.search_games(query, page=page - 1)
+            if total:
+                pages = -(-total // search.PAGE_SIZE)
+                st.sidebar.number_input(f'Página de resultados (1 a {pages}):', min_value=1, max_value=pages, step=1, key='search_page')
+                st.write(f'**Resultados da busca por "{query}":** {total:,} jogos encontrados (página {page} de {pages})')
+                table.render_table(results[['Name', 'Platform', 'Year', 'Genre', 'Publisher']], key='search_results_table')
+                # detalhes só para os jogos da página atual
+                for row in reshape.records(results):
+                    with st.expander(f"Detalhes: {row['Name']}"):
+                        st.write(f"**Rank:** {row['Rank']}")
+                        st.write(f"**Plataforma:** {row['Platform']}")
+                        st.write(f"**Ano:** {int(row['Year']) if pd.notnull(row['Year']) else 'Desconhecido'}")
+                        st.write(f"**Gênero:** {row['Genre']}")
+                        st.write(f"**Editora:** {row['Publisher']}")
+                        st.write(f"**Vendas Globais:** {row['Global_Sales']:.2f} milhões")
+                        st.write(f"**Vendas NA:** {row['NA_Sales']:.2f} milhões")
+                        st.write(f"**Vendas EU:** {row['EU_Sales']:.2f} milhões")
+                        st.write(f"**Vendas JP:** {row['JP_Sales']:.2f} milhões")
+                        st.write(f"**Vendas Outros:** {row['Other_Sales']:.2f} milhões")
             else:
-                st.info('Por favor, insira um termo de busca.')
+                st.warning(f'Nenhum jogo encontrado com o termo "{query}".')
+        elif query is not None:
+            st.info('Por favor, insira um termo de busca.')
+
+# Seletor de opção de cada menu (para o profiling saber a página do rerun)
+SUBMENUS = {
+    'Informações sobre o arquivo': 'inf_option',
+    'Vendas': 'vendas_option',
+    'Listar jogos': 'listar_option',
+    'Ocorrências': 'ocorrencias_option',
+    'Métricas Avançadas': 'metricas_option',
+}
 
 # Executa a função correspondente à opção selecionada
+table.clear_current_view()
+table.expire_buttons()
 if op == 'Informações sobre o arquivo':
     inf_arv()
 elif op == 'Vendas':
@@ -1491,13 +1379,51 @@ elif op == 'Ocorrências':
     ocorrencias()
 elif op == 'Métricas Avançadas':
     metricas_avancadas()
+profiling.set_page(op, st.session_state.get(SUBMENUS[op]))
+profiling_rerun = profiling.end_rerun()
 
 # botao de download
-with open(csv_file, "rb") as file:
+# Os bytes só são preparados quando o usuário pede a exportação, e o arquivo
+# completo vem de um cache por versão do dataset em vez de ser lido a cada rerun
+if st.sidebar.checkbox('Exportar dados', key='download_toggle'):
+    view = table.current_view()
+    origens = ['Arquivo completo', 'Tabela exibida'] if view is not None else ['Arquivo completo']
+    origem = st.sidebar.radio('Dados para exportar:', origens, key='download_source')
+    formato = st.sidebar.selectbox('Formato:', downloads.available_formats(), key='download_format')
+    extensao, mime = downloads.FORMATS[formato]
+    if origem == 'Tabela exibida':
+        view_key, view_df = view
+        data = downloads.export_bytes(view_df, formato)
+        file_name = f'{view_key}{extensao}'
+    else:
+        data = downloads.dataset_bytes(formato, csv_file)
+        file_name = f'vgsales{extensao}'
     st.sidebar.download_button(
-        label="Baixar arquivo CSV analisado",
-        data=file,
-        file_name="vgsales.csv",
-        mime="text/csv",
+        label="Baixar arquivo",
+        data=data,
+        file_name=file_name,
+        mime=mime,
         key="download_csv"
-    )
\ No newline at end of file
+    )
+
+# Painel de depuração (opt-in, por sessão): tempo e alocações de cada etapa deste rerun
+debug = st.sidebar.checkbox('Depuração: tempos por etapa', key='debug_profiling')
+tracing = debug and st.sidebar.checkbox('Medir bytes alocados (tracemalloc, deixa o app mais lento)', key='debug_tracemalloc')
+# o tracemalloc é do processo: conta quantas sessões o pediram (o dono some com a sessão)
+profiling.trace_allocations(tracing, st.session_state.setdefault('debug_tracemalloc_owner', profiling.TraceOwner()))
+if debug:
+    if profiling_rerun is not None:
+        st.sidebar.caption(f"{profiling_rerun['page']} / {profiling_rerun['option']}: {profiling_rerun['total_ms']:,.1f} ms")
+        breakdown = profiling.rerun_breakdown(profiling_rerun)
+        breakdown.columns = ['Etapa', 'Chamadas', 'ms', 'Blocos (saldo)', 'Bytes (saldo)']
+        st.sidebar.dataframe(breakdown, hide_index=True, use_container_width=True,
+                             column_config={'ms': st.column_config.NumberColumn(format='%.1f')})
+    with st.sidebar.expander('Histórico (todas as sessões)'):
+        st.dataframe(profiling.phase_summary(), hide_index=True, use_container_width=True)
+    st.sidebar.download_button(
+        label='Baixar medições (JSON)',
+        data=profiling.dump(),
+        file_name='profiling.json',
+        mime='application/json',
+        key='debug_profiling_dump'
+    )
@@ -1,8 +1,25 @@
 import pandas as pd
 import io
-
-df = pd.read_csv('vgsales.csv') #abrindo e lendo o arquivo
-column_names = df.columns
+import os
+import sys
+
+# permite importar o loader e as consultas que ficam na raiz do projeto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import reshape
+import streaming
+from loader import DTYPES, load_dataset
+
+# python analise.py --streaming: lê o arquivo em blocos em vez de carregar tudo na memória
+# (para catálogos maiores que a RAM); as consultas são as mesmas, com os mesmos nomes
+STREAMING = '--streaming' in sys.argv[1:]
+if STREAMING:
+    from queries import streaming as queries
+    df = None
+    column_names = list(DTYPES)
+else:
+    import queries
+    df = load_dataset() #abrindo e lendo o arquivo (snapshot colunar quando disponível)
+    column_names = df.columns
 pd.set_option('display.max_rows', None)  # mostra todas as linhas (tira os ... que o pandas resume)
 pd.set_option('display.max_columns', None)  # mostra todas as colunas (tira os ... que o pandas resume)
 pd.set_option('display.expand_frame_repr', False) # deve mostrar todos os cabecalhos (tira os ... que o pandas resume)
@@ -23,9 +40,14 @@ def info_arv():
             for i, col in enumerate(column_names, start= 1):
                 print(f'{i}. {col}')
         elif op == 2:
-            print(f'\nNúmero de linhas: {df.shape[0]} | Número de colunas: {df.shape[1]}\n')
+            linhas = queries.column_info()[0] if STREAMING else df.shape[0]
+            print(f'\nNúmero de linhas: {linhas} | Número de colunas: {len(column_names)}\n')
 
         elif op == 3:
+            if STREAMING:
+                linhas, info = queries.column_info()
+                print(f'\n{linhas} linhas\n{info.to_string(index=False)}\n')
+                return
             # deixando o print mais bonitinho
             buffer = io.StringIO()
             df.info(buf=buffer)
@@ -43,25 +65,25 @@ def filtro_vendas():
             if op == 1:
                 print('\nDigite o ano pelo qual deseja filtrar:')
                 filtro = int(input('- '))
-                jogo_filter = df[df['Year'] == filtro]
+                jogo_filter = queries.games_by_year(filtro)
                 print(f'\nJogos lançados em: {filtro}')
                 print(f'{jogo_filter[['Name', 'Rank', 'Year', 'Publisher', 'Genre']]}\n')
-                print(f'\nCom um total de vendas de: {df[df['Year'] == filtro]['Global_Sales'].sum()}')
+                print(f'\nCom um total de vendas de: {jogo_filter['Global_Sales'].sum()}')
 
             # por empresa
             elif op == 2:
                 name = input('\nDigite o nome da empresa: ')
-                jogo_filter = df[df['Publisher'] == name]
+                jogo_filter = queries.games_by_publisher(name, ['Name', 'Publisher'])
                 print(f'Jogos lançados por: {name}')
                 print(f'{jogo_filter[['Name', 'Publisher']]}')
 
             #por valor de venda
             elif op == 3:
                 valor_venda = float(input('\nDigite o valor da venda para poder filtrar: '))
-                regioes = ['JP_Sales', 'EU_Sales', 'NA_Sales', 'Other_Sales']
-                filter = df[df[regioes].gt(valor_venda).any(axis=1)]
+                regioes = queries.REGIONS
+                filter = queries.games_above_sales(valor_venda, regioes, ['Name', 'Publisher'] + regioes)
 
-                for _, linha in filter.iterrows():
+                for linha in reshape.records(filter):
                     print(f'Jogo: {linha['Name']}\nEmpresa: {linha['Publisher']}\nNº de vendas:')
                     for coluna in regioes:
                         print(f'{coluna} : {linha[coluna]} milhões\n')
@@ -76,12 +98,12 @@ def filtro_vendas():
                     if decision == 'S'.lower():
                         valor_venda = float(input('\nDigite o valor da venda para poder filtrar: '))
                         empresa = input('Digite o nome da empresa pela qual deseja filtrar: ')
-                        filter_vendas = df[(df['Publisher'] == empresa) & (df['EU_Sales'] > valor_venda)]
+                        filter_vendas = queries.games_by_publisher(empresa, ['Name', 'Publisher', 'EU_Sales'], 'EU_Sales', valor_venda)
                         print(f'\nVendas da empresa: {empresa} na Europa com valores acima de: {valor_venda} milhões')
                         print(filter_vendas[['Name', 'Publisher' ,'EU_Sales']])
                     elif decision == 'N'.lower():
                         empresa = input('Digite o nome da empresa pela qual deseja filtrar: ')
-                        filter_vendas = df[df['Publisher'] == empresa]
+                        filter_vendas = queries.games_by_publisher(empresa)
                         print(f'\nVendas da empresa: {empresa} na Europa')
                         print(filter_vendas[['Name', 'Publisher' ,'EU_Sales']])
 
@@ -91,12 +113,12 @@ def filtro_vendas():
                     if decision == 'S'.lower():
                         valor_venda = float(input('\nDigite o valor da venda para poder filtrar: '))
                         empresa = input('Digite o nome da empresa pela qual deseja filtrar: ')
-                        filter_vendas = df[(df['Publisher'] == empresa) & (df['NA_Sales'] > valor_venda)]
+                        filter_vendas = queries.games_by_publisher(empresa, ['Name', 'Publisher', 'NA_Sales'], 'NA_Sales', valor_venda)
                         print(f'\nVendas da empresa: {empresa} na América do norte com valores acima de: {valor_venda} milhões')
                         print(filter_vendas[['Name', 'Publisher' ,'NA_Sales']])
                     elif decision == 'N'.lower():
                         empresa = input('Digite o nome da empresa pela qual deseja filtrar: ')
-                        filter_vendas = df[df['Publisher'] == empresa]
+                        filter_vendas = queries.games_by_publisher(empresa)
                         print(f'\nVendas da empresa: {empresa} na América do norte')
                         print(filter_vendas[['Name', 'Publisher' ,'NA_Sales']])
                 
@@ -108,7 +130,7 @@ def filtro_vendas():
                         valor_venda = float(input('\nDigite o valor da venda para poder filtrar: '))
                         empresa = input('Digite o nome da empresa pela qual deseja filtrar: ')
                         
-                        filter_vendas = df[(df['Publisher'] == empresa) & (df['JP_Sales'] > valor_venda)]
+                        filter_vendas = queries.games_by_publisher(empresa, ['Name', 'Publisher', 'JP_Sales'], 'JP_Sales', valor_venda)
                         
                         print(f'\nVendas da empresa: {empresa} no Japão com valores acima de: {valor_venda} milhões')
                         print(filter_vendas[['Name', 'Publisher', 'JP_Sales']])
@@ -116,7 +138,7 @@ def filtro_vendas():
                     elif decision.lower() == 'n'.lower():
                         empresa = input('Digite o nome da empresa pela qual deseja filtrar: ')
                         
-                        filter_vendas = df[df['Publisher'] == empresa]
+                        filter_vendas = queries.games_by_publisher(empresa)
                         
                         print(f'\nTodas as vendas da empresa: {empresa} no Japão')
                         print(filter_vendas[['Name', 'Publisher', 'JP_Sales']])
@@ -128,12 +150,12 @@ def filtro_vendas():
                     if decision == 'S'.lower():
                         valor_venda = float(input('\nDigite o valor da venda para poder filtrar: '))
                         empresa = input('Digite o nome da empresa pela qual deseja filtrar: ')
-                        filter_vendas = df[(df['Publisher'] == empresa) & (df['Other_Sales'] > valor_venda)]
+                        filter_vendas = queries.games_by_publisher(empresa, ['Name', 'Publisher', 'Other_Sales'], 'Other_Sales', valor_venda)
                         print(f'\nVendas da empresa: {empresa} em Outras vendas com valores acima de: {valor_venda} milhões')
                         print(filter_vendas[['Name', 'Publisher' ,'Other_Sales']])
                     elif decision == 'N'.lower():
                         empresa = input('Digite o nome da empresa pela qual deseja filtrar: ')
-                        filter_vendas = df[df['Publisher'] == empresa]
+                        filter_vendas = queries.games_by_publisher(empresa)
                         print(f'\nVendas da empresa: {empresa} em outras vendas')
                         print(filter_vendas[['Name', 'Publisher' ,'Other_Sales']])
 
@@ -144,13 +166,13 @@ def filtro_vendas():
                 if decisao == 'S'.lower():
                     print('\nDigite o valor pelo qual deseja filtrar as vendas globais:')
                     filtro = float(input('- '))
-                    filter_vendas = df[(df['Global_Sales'] > filtro)]
+                    filter_vendas = queries.games_above_global_sales(filtro, ['Name', 'Publisher', 'Global_Sales'])
                     print(f'\nVendas globais com valores acima de: {filtro} milhões')
                     print(filter_vendas[['Name', 'Publisher' ,'Global_Sales']])
                     
 
                 elif decisao == 'N'.lower():
-                    total_vendas = df['Global_Sales'].sum()
+                    total_vendas = queries.total_sales('Global_Sales')
                     print('\nA venda global em forma total é de:')
                     print(f'-> Global Sales: {total_vendas}\n')
 
@@ -160,11 +182,11 @@ def filtro_vendas():
                 op = input('S/N - ')
                 if op == 'S'.lower():
                     qtd = int(input('Digite a quantidade que deseja ver: '))
-                    big_vendas = df.sort_values(by='Global_Sales', ascending=False).head(qtd)
+                    big_vendas = queries.top_games('Global_Sales', qtd, ['Name', 'Publisher', 'Global_Sales'])
                     for i, row in enumerate(big_vendas.itertuples(), start=1):
                         print(f'\n{i}º {row.Name} | Empresa: {row.Publisher} | Número de vendas: {row.Global_Sales:.2f} milhões\n')
                 if op == 'N'.lower():
-                    big_venda = df.loc[df['Global_Sales'].idxmax()]
+                    big_venda = queries.best_seller('Global_Sales')
                     print(f'Segue o jogo mais vendido:\nNome: {big_venda['Name']} | Empresa: {big_venda['Publisher']} | Número de vendas: {big_venda['Global_Sales']:.2f} milhões')
 
             # # global sales (quest 15)
@@ -193,23 +215,28 @@ def listar_games():
         op = int(input('- '))
 
         if op == 1:
-            n = df['Name']
-            print(n)
+            if STREAMING:
+                # um bloco por vez, sem montar a coluna inteira
+                for bloco in streaming.iter_chunks(columns=['Name']):
+                    print(bloco['Name'].to_string())
+            else:
+                n = df['Name']
+                print(n)
         elif op == 2:
             filtro = int(input('Digite a quantidade de jogos que deseja listar: '))
-            n = df['Name'].head(filtro)
+            n = queries.first_games(filtro)['Name']
             print(f'{n}\n')
         # fazer os outros ainda
 
 
 #-------- filtrar por genero op 4 ------------------------------------
 def filtr_genero():
-        generos = sorted(df['Genre'].unique())
+        generos = sorted(queries.counts('Genre').index)
         print('\nGêneros disponiveis:')
         for genero in generos:
             print(f'- {genero}')
         filtro = input('\nDigite o gênero que deseja buscar (favor, digitar igual está na tabela): ')
-        filter_games = df[df['Genre'] == filtro]
+        filter_games = queries.games_by_genre(filtro, ['Genre', 'Name', 'Publisher'])
         print(f'\nJogos do gênero: {filtro}:')
         print(filter_games[['Genre','Name', 'Publisher' ]])
 
@@ -229,14 +256,13 @@ def filtr_ocorren():
 
             if op == 'S'.lower():
                 n = int(input('Deseja ver quantas editoras que mais aparecem no documento: '))
-                m_freq = df['Publisher'].value_counts().head(n) 
-                qtd = df['Publisher'].value_counts().max()
+                m_freq = queries.publisher_counts(n=n)
                 for i, (Publisher, qtd) in enumerate(m_freq.items(), start=1):
                     print(f'{i}º {Publisher} | Apareceu: {qtd} vezes')
 
             elif op == 'N'.lower():
-                m_freq = df['Publisher'].value_counts().idxmax() #o id max retorna o indice de maior valor -> quem mais apareceu
-                qtd = df['Publisher'].value_counts().max()
+                contagem = queries.publisher_counts(n=1) # já vem ordenado: o primeiro é quem mais apareceu
+                m_freq, qtd = contagem.index[0], contagem.iloc[0]
                 print(f'A editora/ empresa que mais aparece é: {m_freq} | Apareceu: {qtd} vezes')
 
         elif op == 2:
@@ -256,13 +282,13 @@ def filtr_ocorren():
                     }
 
                     for coluna, nome in continente.items():
-                        filter = df[df[coluna] > n][['Name', coluna]]
+                        filter = queries.games_above_sales(n, [coluna], ['Name', coluna])
                         print(f'\nJogos com vendas acima de: {n} em {nome}\n')
 
                         if filter.empty:
                             print('Nenhum jogo encontrado')
                         else:
-                            for i, row in filter.iterrows():
+                            for row in reshape.records(filter):
                                 print(f'- {row['Name']} | {coluna}: {row[coluna]}')
 
                 elif op == 2: # sem filtro de valor                    
@@ -273,7 +299,7 @@ def filtr_ocorren():
                         'Other_Sales' : 'Outros países'
                     }
                     for coluna, nome in continente.items():
-                        vendas = df.loc[df[coluna].idxmax()] # pega a linha com maior venda 
+                        vendas = queries.best_seller(coluna) # pega a linha com maior venda 
                         print(f'\nJogo com maiore número de vendas em: {nome}')
                         print(f'- {vendas['Name']} | {coluna} : {vendas[coluna]}')
 
@@ -287,7 +313,7 @@ def filtr_ocorren():
                             'Vendas globais' : 'Global_Sales'
                         }
                 for nome, col in continente.items():
-                    top_venda = df.loc[df[col].idxmax()]
+                    top_venda = queries.best_seller(col)
                     print(f'\n{nome}\nJogo mais vendido: {top_venda['Name']} | Empresa: {top_venda['Publisher']} | Nº de vendas em escala global: {top_venda[col]} milhões')
 
         elif op == 3:
@@ -0,0 +1,220 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import pandas as pd
+
+import bitmap
+import database
+import downloads
+import loader
+import parallel
+import queries
+import synthetic
+import topk
+import typeahead
+from lazy_imports import lazy_import
+from loader import CSV_PATH, load_dataset
+
+px = lazy_import('plotly.express')
+
+# Benchmarks das operações do dashboard em várias escalas: python benchmark.py [--save]
+# Compara cada execução com o baseline salvo e falha quando alguma operação regride
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BENCH_DIR = os.path.join(ROOT, 'benchmarks')
+DATA_DIR = os.path.join(BENCH_DIR, 'data')
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+
+# Escala -> número de linhas (None = o vgsales.csv original, ~16k linhas)
+# As outras escalas são geradas pelo synthetic.py, sempre com a mesma semente
+SCALES = {'16k': None, '1M': 1_000_000, '10M': 10_000_000}
+REPEAT = 5
+# Regressão: mediana acima de THRESHOLD x baseline e pelo menos MIN_DELTA_MS mais lenta
+THRESHOLD = 1.5
+MIN_DELTA_MS = 2.0
+
+
+def dataset_for(scale):
+    rows = SCALES[scale]
+    if rows is None:
+        return CSV_PATH
+    target = os.path.join(DATA_DIR, f'vgsales_{scale}.csv')
+    if not os.path.exists(target):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        print(f'  gerando {rows:,} linhas em {target}')
+        synthetic.generate(rows, target)
+    return target
+
+
+def _cold_load(path):
+    loader.clear_cache(path)
+    return load_dataset(path)
+
+
+def _top_figure(path):
+    top = queries.top_games('Global_Sales', 10, ['Name', 'Global_Sales'], path=path)
+    return px.bar(top, x='Name', y='Global_Sales').to_json()
+
+
+# Preparação: roda uma vez por escala (estruturas derivadas e banco SQLite)
+SETUP = {
+    'ler CSV': loader.read_csv,
+    'ler snapshot (Feather)': loader.read_snapshot,
+    # o caminho do app: com o arquivo de colunas compartilhadas da versão, só o mapeia
+    'carregar (colunas compartilhadas)': _cold_load,
+    'ingestão SQLite': database.ingest,
+    'montar cubo': lambda path: queries.counts('Genre', path=path),
+    'montar índice de busca': lambda path: queries.search_games('a', path=path),
+    'montar typeahead': lambda path: typeahead.unique_values('Publisher', path),
+    'montar top-K': topk.get_index,
+    'montar bitmaps': bitmap.get_index,
+}
+
+# Operações das páginas, medidas com as estruturas já prontas
+OPERATIONS = {
+    'jogos por ano': lambda path: queries.games_by_year(2008, path=path),
+    'jogos por gênero': lambda path: queries.games_by_genre('Puzzle', path=path),
+    'jogos por empresa': lambda path: queries.games_by_publisher('Nintendo', ['Name', 'Publisher'], path=path),
+    'jogos por empresa e região': lambda path: queries.games_by_publisher(
+        'Nintendo', ['Name', 'Publisher', 'JP_Sales'], 'JP_Sales', 1.0, path=path),
+    'vendas acima do valor (regiões)': lambda path: queries.games_above_sales(
+        1.0, columns=['Name', 'Publisher'] + queries.REGIONS, path=path),
+    'vendas globais acima do valor': lambda path: queries.games_above_global_sales(
+        5.0, ['Name', 'Publisher', 'Global_Sales'], path=path),
+    'top 10 vendas': lambda path: queries.top_games('Global_Sales', 10, path=path),
+    'top 10 com filtros': lambda path: queries.top_games(
+        'NA_Sales', 10, platforms=['PS2', 'Wii', 'X360'], genres=['Action', 'Sports'], path=path),
+    'mais vendido': lambda path: queries.best_seller('Global_Sales', path),
+    'resumo do jogo': lambda path: queries.game_summary('Tetris', path),
+    'contagem por gênero': lambda path: queries.counts('Genre', path=path),
+    'contagem por empresa': lambda path: queries.publisher_counts(100, 10, path),
+    'lançamentos por ano': lambda path: queries.year_counts(1980, 2020, path),
+    'vendas por gênero': lambda path: queries.genre_sales(['Action', 'Sports'], path),
+    'vendas por região': lambda path: queries.region_totals(loader.SALES_COLUMNS, path),
+    'métricas gerais': lambda path: queries.general_metrics(1980, 2020, path),
+    'busca (trigramas)': lambda path: queries.search_games('mario', path=path),
+    'busca (prefixo curto)': lambda path: queries.search_games('ma', path=path),
+    'typeahead': lambda path: typeahead.suggest('Publisher', 'el', path=path),
+    'página da tabela': lambda path: load_dataset(path).iloc[5000:5050],
+    'exportar resultado (CSV)': lambda path: downloads.export_bytes(
+        queries.games_by_year(2008, path=path), 'CSV'),
+    'gráfico top 10': _top_figure,
+    # sem o cubo: agregação completa, por partições no pool de processos (parallel.WORKERS)
+    'roll-up paralelo (gênero x ano)': lambda path: parallel.rollup(['Genre', 'Year'], path=path),
+    'média por década (paralelo)': lambda path: parallel.decade_averages(path=path),
+}
+
+
+def _timed(func, path):
+    start = time.perf_counter()
+    result = func(path)
+    return (time.perf_counter() - start) * 1000, result
+
+
+def _rows(result):
+    if isinstance(result, (pd.DataFrame, pd.Series)):
+        return len(result)
+    if isinstance(result, tuple) and result and isinstance(result[0], int):
+        return result[0]  # (total, página) da busca
+    return None
+
+
+def run_scale(scale, repeat=REPEAT):
+    path = dataset_for(scale)
+    load_dataset(path)  # garante o snapshot e as colunas compartilhadas, para medir a carga a partir deles
+    results = {}
+    for name, func in SETUP.items():
+        ms, _ = _timed(func, path)
+        results[name] = {'median_ms': ms, 'min_ms': ms, 'runs': 1}
+        print(f'  {name:<34} {ms:10.1f} ms')
+    for name, func in OPERATIONS.items():
+        _, result = _timed(func, path)  # aquecimento (imports, conexões)
+        times = [_timed(func, path)[0] for _ in range(repeat)]
+        results[name] = {
+            'median_ms': statistics.median(times),
+            'min_ms': min(times),
+            'runs': repeat,
+            'rows': _rows(result),
+        }
+        print(f'  {name:<34} {results[name]["median_ms"]:10.2f} ms')
+    loader.clear_cache(path)
+    return results
+
+
+def load_baseline(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    # Mescla com as escalas já salvas: rodar só 16k não apaga o baseline de 10M
+    baseline = load_baseline(path)
+    baseline.setdefault('scales', {}).update(results)
+    baseline['environment'] = {
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'workers': parallel.WORKERS,
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(baseline, file, indent=2, ensure_ascii=False)
+
+
+def regressions(results, baseline, threshold=THRESHOLD, min_delta_ms=MIN_DELTA_MS):
+    errors = []
+    for scale, operations in results.items():
+        saved = baseline.get('scales', {}).get(scale, {})
+        for name, current in operations.items():
+            if name not in saved:
+                continue
+            before, now = saved[name]['median_ms'], current['median_ms']
+            if now > before * threshold and now - before > min_delta_ms:
+                # baseline de 0 ms (relógio sem resolução): sem razão a mostrar
+                ratio = f', {now / before:.1f}x' if before > 0 else ''
+                errors.append(f'[{scale}] {name}: {now:.1f} ms (baseline {before:.1f} ms{ratio})')
+    return errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks das operações do dashboard')
+    parser.add_argument('--scales', nargs='+', choices=list(SCALES), default=list(SCALES))
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    parser.add_argument('--save', action='store_true', help='grava o resultado como novo baseline')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--output', help='grava o resultado desta execução em JSON')
+    parser.add_argument('--workers', type=int, default=parallel.WORKERS, help='processos das agregações paralelas')
+    args = parser.parse_args(argv)
+    parallel.WORKERS = args.workers
+
+    results = {}
+    for scale in args.scales:
+        print(f'Escala {scale}')
+        results[scale] = run_scale(scale, args.repeat)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump({'scales': results}, file, indent=2, ensure_ascii=False)
+    if args.save:
+        save_baseline(results, args.baseline)
+        print(f'Baseline salvo em {args.baseline}')
+        return 0
+    baseline = load_baseline(args.baseline)
+    if not baseline:
+        print('Sem baseline para comparar; rode com --save para criar um.')
+        return 0
+    errors = regressions(results, baseline, args.threshold)
+    for error in errors:
+        print(f'  REGRESSÃO: {error}')
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
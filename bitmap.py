@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+from loader import CSV_PATH, derived, load_dataset
+
+# Índices bitmap das colunas categóricas: para cada valor, as linhas em que ele aparece
+# Valores frequentes guardam bits empacotados (1 bit por linha); valores raros guardam só
+# a lista ordenada de linhas, que ocupa menos (como os contêineres do Roaring)
+COLUMNS = ['Platform', 'Genre', 'Publisher', 'Year']
+# Abaixo de 1 linha a cada 32 a lista de int32 é menor que o bitmap
+SPARSE_RATIO = 32
+# Quantidade de bits 1 em cada byte, para contar linhas sem desempacotar
+POPCOUNT = np.array([bin(byte).count('1') for byte in range(256)], dtype=np.uint8)
+
+
+def pack(mask):
+    return np.packbits(mask, bitorder='little')
+
+
+def _rows_to_bits(rows, size):
+    mask = np.zeros(size, dtype=bool)
+    mask[rows] = True
+    return pack(mask)
+
+
+def build_index(df):
+    size = len(df)
+    columns = {}
+    for col in COLUMNS:
+        codes, values = pd.factorize(df[col])
+        order = np.argsort(codes, kind='stable').astype(np.int32)
+        counts = np.bincount(codes[codes >= 0], minlength=len(values))
+        start = int((codes < 0).sum())  # valores ausentes ficam no início da ordem e não entram
+        containers = {}
+        for value, count in zip(values, counts):
+            rows = order[start:start + count]
+            start += count
+            containers[value] = rows if count * SPARSE_RATIO < size else _rows_to_bits(rows, size)
+        columns[col] = containers
+    return {'size': size, 'columns': columns}
+
+
+def get_index(path=CSV_PATH):
+    return derived('bitmap', build_index, path)
+
+
+def _is_bits(container):
+    return container.dtype == np.uint8
+
+
+def _union(index, col, values):
+    # OR entre os valores de uma coluna; valores desconhecidos não casam com nenhuma linha
+    size = index['size']
+    containers = index['columns'][col]
+    bits = np.zeros((size + 7) // 8, dtype=np.uint8)
+    sparse = []
+    for value in values:
+        container = containers.get(value)
+        if container is None:
+            continue
+        if _is_bits(container):
+            np.bitwise_or(bits, container, out=bits)
+        else:
+            sparse.append(container)
+    if sparse:
+        rows = np.concatenate(sparse)
+        np.bitwise_or.at(bits, rows >> 3, (1 << (rows & 7)).astype(np.uint8))
+    return bits
+
+
+def _year_values(index, bounds):
+    start, end = bounds
+    return [year for year in index['columns']['Year'] if start <= year <= end]
+
+
+def select(filters, path=CSV_PATH):
+    # filters: {coluna: lista de valores} ou {'Year': (início, fim)}
+    # AND entre as colunas, OR entre os valores; None quando não há filtro
+    index = get_index(path)
+    result = None
+    for col, values in filters.items():
+        if not values:
+            continue
+        if isinstance(values, tuple):
+            values = _year_values(index, values)
+        bits = _union(index, col, values)
+        result = bits if result is None else np.bitwise_and(result, bits, out=result)
+    return result
+
+
+def count(bits):
+    return int(POPCOUNT[bits].sum(dtype=np.int64))
+
+
+def contains(bits, rows):
+    # Testa as linhas dadas sem desempacotar o bitmap inteiro
+    return ((bits[rows >> 3] >> (rows & 7).astype(np.uint8)) & 1).astype(bool)
+
+
+def rows(bits, size):
+    return np.flatnonzero(np.unpackbits(bits, count=size, bitorder='little'))
+
+
+def filter_frame(filters, columns=None, path=CSV_PATH):
+    # Só as linhas selecionadas são materializadas
+    df = load_dataset(path)
+    bits = select(filters, path)
+    result = df if bits is None else df.iloc[rows(bits, len(df))]
+    return (result[list(columns)] if columns is not None else result).reset_index(drop=True)
@@ -0,0 +1,460 @@
+import ast
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from contextlib import contextmanager
+
+# Verificações de desempenho e de equivalência do projeto: python checks.py
+ROOT = os.path.dirname(os.path.abspath(__file__))
+APP = os.path.join(ROOT, 'app.py')
+DATASET = os.path.join(ROOT, 'vgsales.csv')
+
+# Orçamento de tempo de import do app.py (soma dos imports de topo, em ms)
+IMPORT_BUDGET_MS = 2000
+# Bibliotecas que só devem ser carregadas quando uma página precisar delas
+# (plotly.graph_objects fica de fora: o próprio streamlit já o importa)
+LAZY_MODULES = ['matplotlib.pyplot', 'seaborn', 'plotly.express']
+
+
+def app_imports(path=APP):
+    # Imports feitos no nível de módulo do app.py (os que rodam na inicialização)
+    tree = ast.parse(open(path, encoding='utf-8').read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            modules.append(node.module)
+    return modules
+
+
+def _importtime(code):
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True, cwd=ROOT, check=True
+    )
+    return result.stderr.splitlines()
+
+
+def import_times(modules):
+    # Roda os imports em um processo novo com -X importtime e devolve
+    # (tempo acumulado em ms de cada import de topo, módulos carregados),
+    # descontando o que o interpretador já importa ao iniciar
+    startup = {line.split('|')[-1].strip() for line in _importtime('pass')}
+    times, loaded = {}, set()
+    for line in _importtime('\n'.join(f'import {module}' for module in modules)):
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        loaded.add(name.strip())
+        if not name.startswith('  ') and name.strip() not in startup:
+            times[name.strip()] = int(cumulative) / 1000
+    return times, loaded
+
+
+def check_import_budget(budget_ms=IMPORT_BUDGET_MS):
+    times, loaded = import_times(app_imports())
+    total = sum(times.values())
+    for name, ms in sorted(times.items(), key=lambda item: -item[1])[:10]:
+        print(f'  {name:<30} {ms:8.1f} ms')
+    print(f'  {"total":<30} {total:8.1f} ms (orçamento {budget_ms} ms)')
+    errors = [f'{module} é carregado na inicialização' for module in LAZY_MODULES if module in loaded]
+    if total > budget_ms:
+        errors.append(f'imports do app.py levam {total:.0f} ms, acima do orçamento de {budget_ms} ms')
+    return errors
+
+
+# Métodos que percorrem o DataFrame linha a linha no interpretador; telas e consultas
+# usam operações vetorizadas (reshape.py) no lugar
+ROW_LOOPS = ['iterrows']
+
+
+def project_files(root=ROOT):
+    for folder, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if not d.startswith(('.', '__'))]
+        for name in sorted(files):
+            if name.endswith('.py'):
+                yield os.path.join(folder, name)
+
+
+def row_loops(path):
+    # Chamadas como df.iterrows() no arquivo, como (linha, método)
+    tree = ast.parse(open(path, encoding='utf-8').read())
+    return [
+        (node.lineno, node.func.attr) for node in ast.walk(tree)
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr in ROW_LOOPS
+    ]
+
+
+def check_row_loops():
+    errors = []
+    for path in project_files():
+        for line, method in row_loops(path):
+            errors.append(f'{os.path.relpath(path, ROOT)}:{line} usa {method}()')
+    print(f'  {len(errors)} laços linha a linha encontrados')
+    return errors
+
+
+# Equivalência: cada caminho otimizado (delta incremental, streaming, partições, arquivo
+# de colunas, bitmaps, top-K) tem de devolver o mesmo resultado do caminho em memória.
+# Rodam sobre uma cópia do vgsales.csv em uma pasta temporária
+
+
+@contextmanager
+def scratch_dataset(source=DATASET):
+    # Cópia do dataset (e dos arquivos gerados ao lado dela: .feather, .db, .columns)
+    import loader
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'vgsales.csv')
+        shutil.copyfile(source, path)
+        try:
+            yield path
+        finally:
+            loader.clear_cache(path)
+
+
+def _normalized(frame, keys=()):
+    # Sem diferença de ordem de linhas, de índice ou de tipo categórico x texto
+    import pandas as pd
+    if isinstance(frame, pd.Series):
+        frame = frame.to_frame()
+    frame = frame.reset_index(drop=not any(frame.index.names))
+    frame = frame.astype({col: object for col in frame.columns if not pd.api.types.is_numeric_dtype(frame[col])})
+    keys = list(keys) or list(frame.columns)
+    return frame.sort_values(keys, kind='stable', na_position='first').reset_index(drop=True)
+
+
+def frame_errors(name, actual, expected, keys=()):
+    # Lista vazia se os dois resultados têm as mesmas linhas (vendas com tolerância de float32)
+    import pandas as pd
+    try:
+        pd.testing.assert_frame_equal(
+            _normalized(actual, keys), _normalized(expected, keys), check_dtype=False, check_names=False, atol=1e-6
+        )
+    except AssertionError as error:
+        return [f'{name}: {str(error).splitlines()[0]} ({len(actual)} x {len(expected)} linhas)']
+    return []
+
+
+def check_incremental():
+    # Delta com uma atualização e uma inserção: o cubo mesclado é igual ao cubo refeito do
+    # CSV gravado; um delta com Rank repetido é rejeitado sem tocar no CSV nem no banco
+    import numpy as np
+    import pandas as pd
+
+    import cube
+    import database
+    import incremental
+    import loader
+    errors = []
+    with scratch_dataset() as path:
+        df = loader.load_dataset(path)
+        cube.get_cube(path)
+        database.connect(path)
+        delta = df.iloc[[0, 1]].copy()
+        delta['Global_Sales'] = delta['Global_Sales'] + 1
+        delta.loc[delta.index[1], ['Rank', 'Name', 'Platform']] = [int(df['Rank'].max()) + 1, 'Check Game', 'PS4']
+        delta_path = os.path.join(os.path.dirname(path), 'delta.csv')
+        delta.to_csv(delta_path, index=False)
+        incremental.apply_delta(delta_path, path)
+        merged = cube.get_cube(path)
+        rebuilt = cube.build_cube(loader.read_csv(path))
+        for key in rebuilt:
+            if key:
+                errors += frame_errors(f'cubo {key}', merged[key], rebuilt[key], key)
+            elif np.abs(np.asarray(merged[key], dtype=float) - np.asarray(rebuilt[key], dtype=float)).max() > 1e-6:
+                errors.append('cubo (): totais diferentes')
+        count = database.query(f'SELECT COUNT(*) n FROM {database.TABLE}', path=path)['n'].iloc[0]
+        if count != len(loader.load_dataset(path)):
+            errors.append(f'banco com {count} linhas, dataset com {len(loader.load_dataset(path))}')
+
+        signature = loader.file_signature(path)
+        collision = df.iloc[[2]].copy()
+        collision['Name'] = 'Rank Collision'
+        collision.to_csv(delta_path, index=False)
+        try:
+            incremental.apply_delta(delta_path, path)
+            errors.append('delta com Rank repetido foi aceito')
+        except ValueError:
+            pass
+        if loader.file_signature(path) != signature:
+            errors.append('delta rejeitado alterou o CSV')
+        try:
+            database.query(f'SELECT COUNT(*) n FROM {database.TABLE}', path=path)
+        except (pd.errors.DatabaseError, database.sqlite3.Error) as error:
+            errors.append(f'banco inutilizável depois do delta rejeitado: {error}')
+    print(f'  {len(errors)} diferenças')
+    return errors
+
+
+def result_errors(name, actual, expected):
+    # Compara resultados de consultas: DataFrame/Series (sem ordem de linhas) ou número
+    import pandas as pd
+    if isinstance(expected, pd.Series) and not isinstance(expected.index, pd.RangeIndex) and expected.dtype == object:
+        # uma linha (ex.: best_seller, game_summary) como Series de colunas
+        actual, expected = actual.to_frame().T, expected.to_frame().T
+    if isinstance(expected, (pd.DataFrame, pd.Series)):
+        return frame_errors(name, actual, expected)
+    if abs(float(actual) - float(expected)) > 1e-6:
+        return [f'{name}: {actual} x {expected}']
+    return []
+
+
+# Consultas comparadas entre caminhos: (função de queries, argumentos)
+EQUIVALENCE_QUERIES = [
+    ('games_by_year', (2008,)),
+    ('games_by_genre', ('Puzzle',)),
+    ('games_by_publisher', ('Nintendo',)),
+    ('games_by_publisher', ('Nintendo', ['Name', 'Publisher', 'EU_Sales'], 'EU_Sales', 0.1)),
+    ('games_above_sales', (0.1,)),
+    ('games_above_global_sales', (0.1,)),
+    ('top_games', ('Global_Sales', 10)),
+    ('top_games', ('NA_Sales', 10, ['Name', 'Platform', 'NA_Sales'], ['PS2', 'Wii'], ['Action', 'Sports'])),
+    ('best_seller', ('Global_Sales',)),
+    ('game_summary', ('Tetris',)),
+    ('counts', ('Genre',)),
+    ('publisher_counts', (100,)),
+    ('genre_sales', ()),
+    ('year_counts', (1980, 2020)),
+    ('year_sales', (1990, 2005)),
+    ('total_sales', ()),
+    ('releases_per_year_mean', ()),
+]
+# Blocos pequenos para o streaming juntar vários parciais mesmo no dataset de 16k linhas
+STREAMING_CHUNK_ROWS = 3000
+
+
+def check_streaming():
+    import queries
+    import queries.streaming
+    import streaming
+    errors = []
+    chunk_rows, streaming.CHUNK_ROWS = streaming.CHUNK_ROWS, STREAMING_CHUNK_ROWS
+    try:
+        with scratch_dataset() as path:
+            for name, args in EQUIVALENCE_QUERIES:
+                expected = getattr(queries, name)(*args, path=path)
+                actual = getattr(queries.streaming, name)(*args, path=path)
+                errors += result_errors(f'{name}{args!r}', actual, expected)
+            errors += result_errors('region_totals', queries.streaming.region_totals(['NA_Sales', 'JP_Sales'], path),
+                                    queries.region_totals(['NA_Sales', 'JP_Sales'], path))
+    finally:
+        streaming.CHUNK_ROWS = chunk_rows
+    print(f'  {len(EQUIVALENCE_QUERIES) + 1} consultas comparadas, {len(errors)} diferenças')
+    return errors
+
+
+def _mask(df, filters):
+    # Referência em pandas para os filtros do bitmap/cubo: {coluna: valores} ou {coluna: (mínimo, máximo)}
+    import numpy as np
+    mask = np.ones(len(df), dtype=bool)
+    for col, values in filters.items():
+        if values:
+            selected = df[col].between(*values) if isinstance(values, tuple) else df[col].isin(values)
+            mask &= selected.to_numpy(dtype=bool, na_value=False)
+    return mask
+
+
+# Filtros comparados entre bitmap/top-K/partições e o pandas
+INDEX_FILTERS = [
+    {'Year': [2008]},
+    {'Genre': ['Puzzle', 'Action'], 'Platform': ['PS2', 'Wii', 'X360']},
+    {'Publisher': ['Nintendo'], 'Year': (1990, 2005)},
+    {'Platform': ['GB'], 'Genre': ['Sports']},
+]
+
+
+def check_indexes():
+    # Bitmaps e top-K contra máscaras e ordenação do pandas sobre o mesmo DataFrame
+    import bitmap
+    import loader
+    import topk
+    errors = []
+    with scratch_dataset() as path:
+        df = loader.load_dataset(path)
+        for filters in INDEX_FILTERS:
+            expected = df[_mask(df, filters)].reset_index(drop=True)
+            errors += frame_errors(f'bitmap {filters}', bitmap.filter_frame(filters, path=path), expected)
+        for column in ['Global_Sales', 'JP_Sales']:
+            for filters in [{}] + [f for f in INDEX_FILTERS if set(f) <= {'Platform', 'Genre', 'Publisher'}]:
+                # mesma regra de desempate do top-K: maior venda primeiro, depois a ordem do arquivo
+                expected = df[_mask(df, filters)].sort_values(column, ascending=False, kind='stable').head(10)
+                actual = topk.top_games(column, 10, None, filters.get('Platform'), filters.get('Genre'), filters.get('Publisher'), path)
+                errors += frame_errors(f'top-K {column} {filters}', actual, expected)
+    print(f'  {len(errors)} diferenças')
+    return errors
+
+
+def check_parallel():
+    # Agregação por partições no pool de processos contra o cubo e o pandas; o limite de
+    # linhas é zerado para que o dataset pequeno também passe pelo pool
+    import cube
+    import loader
+    import parallel
+    import queries
+    errors = []
+    min_rows, parallel.MIN_PARALLEL_ROWS = parallel.MIN_PARALLEL_ROWS, 0
+    try:
+        with scratch_dataset() as path:
+            df = loader.load_dataset(path)
+            for workers in (1, 3):
+                errors += frame_errors(f'rollup Genre x Year ({workers})', parallel.rollup(['Genre', 'Year'], path=path, workers=workers),
+                                       cube.rollup(['Genre', 'Year'], path=path))
+                for filters in INDEX_FILTERS:
+                    dims = [col for col in ['Genre', 'Platform'] if col not in filters] or ['Year']
+                    errors += frame_errors(f'rollup {dims} {filters} ({workers})', parallel.rollup(dims, filters, path, workers=workers),
+                                           cube.rollup(dims, filters, path))
+                errors += frame_errors(f'counts Platform ({workers})', parallel.counts('Platform', path, workers),
+                                       queries.counts('Platform', path=path))
+                expected = df.groupby(df['Year'] // 10 * 10)['Global_Sales'].mean().rename(None)
+                errors += frame_errors(f'média por década ({workers})', parallel.decade_averages(path=path, workers=workers), expected)
+                errors += frame_errors(f'top_games ({workers})', parallel.top_games('Global_Sales', 10, ['Name', 'Global_Sales'], path, workers),
+                                       queries.top_games('Global_Sales', 10, ['Name', 'Global_Sales'], path=path))
+    finally:
+        parallel.MIN_PARALLEL_ROWS = min_rows
+        parallel.shutdown()
+    print(f'  {len(errors)} diferenças')
+    return errors
+
+
+def check_shared():
+    # Arquivo de colunas compartilhadas: o DataFrame mapeado é igual ao lido do CSV, e um
+    # arquivo de outra versão ou corrompido é ignorado
+    import loader
+    import shared
+    errors = []
+    with scratch_dataset() as path:
+        expected = loader.read_csv(path)
+        signature = loader.file_signature(path)
+        target = shared.write(expected, loader.shared_path(path), signature)
+        attached = shared.attach(target, signature)
+        if attached is None:
+            return ['arquivo recém-gravado não foi mapeado']
+        if not attached.equals(expected):
+            errors += frame_errors('colunas compartilhadas', attached, expected) or ['tipos diferentes do CSV']
+        if list(attached.dtypes) != list(expected.dtypes):
+            errors.append(f'tipos {list(attached.dtypes)} x {list(expected.dtypes)}')
+        if shared.attach(target, (signature[0] + 1, signature[1])) is not None:
+            errors.append('arquivo de outra versão foi aceito')
+        with open(target, 'r+b') as file:
+            file.write(b'corrompido')
+        if shared.attach(target, signature) is not None:
+            errors.append('arquivo corrompido foi aceito')
+    print(f'  {len(errors)} diferenças')
+    return errors
+
+
+# Saída do atividade-sexta/analise.py x a versão original do script (commit raiz do
+# repositório), com as mesmas respostas nos menus. Todas as sessões vão em uma única
+# entrada: o menu principal volta depois de cada uma e o fim da entrada encerra o script.
+# As opções de informações do arquivo (1 -> 3) ficam de fora: os tipos mudaram de propósito
+CLI = os.path.join(ROOT, 'atividade-sexta', 'analise.py')
+CLI_SESSIONS = [
+    '1\n1\n', '1\n2\n',
+    '2\n1\n2008\n', '2\n2\nNintendo\n', '2\n3\n10\n',
+    '2\n4\n1\ns\n1\nNintendo\n', '2\n4\n2\nn\nNintendo\n', '2\n4\n3\ns\n0.5\nNintendo\n', '2\n4\n4\nn\nSega\n',
+    '2\n5\ns\n20\n', '2\n5\nn\n', '2\n6\ns\n5\n', '2\n6\nn\n',
+    '3\n2\n10\n', '4\nPuzzle\n',
+    '5\n1\ns\n5\n', '5\n1\nn\n', '5\n2\n1\n1\n10\n', '5\n2\n1\n2\n', '5\n2\n2\n',
+]
+
+
+def _cli_output(script, cwd, *args):
+    result = subprocess.run(
+        [sys.executable, script, *args], input=''.join(CLI_SESSIONS), capture_output=True, text=True, cwd=cwd
+    )
+    return result.stdout.splitlines()
+
+
+def _cli_tokens(line):
+    # Números comparados pelo valor (2008 = 2008.0) e ausentes iguais (NaN = <NA>); a
+    # largura das colunas das tabelas não importa
+    tokens = []
+    for token in line.split():
+        if token in ('NaN', '<NA>'):
+            tokens.append(None)
+            continue
+        try:
+            tokens.append(float(token))
+        except ValueError:
+            tokens.append(token)
+    return tokens
+
+
+def _same_tokens(actual, expected):
+    if len(actual) != len(expected):
+        return False
+    for a, b in zip(actual, expected):
+        if isinstance(a, float) and isinstance(b, float):
+            if abs(a - b) > 1e-9 * max(1.0, abs(b)):
+                return False
+        elif a != b:
+            return False
+    return True
+
+
+def _same_line(actual, expected):
+    actual, expected = _cli_tokens(actual), _cli_tokens(expected)
+    if _same_tokens(actual, expected):
+        return True
+    # rótulo da linha nas tabelas: as consultas devolvem as linhas renumeradas a partir de 0
+    return (bool(actual) and bool(expected) and all(isinstance(t, float) and t.is_integer() for t in (actual[0], expected[0]))
+            and _same_tokens(actual[1:], expected[1:]))
+
+
+def check_cli():
+    root = subprocess.run(['git', 'rev-list', '--max-parents=0', 'HEAD'], capture_output=True, text=True, cwd=ROOT)
+    if root.returncode != 0:
+        print('  sem o histórico do git: comparação ignorada')
+        return []
+    original = subprocess.run(
+        ['git', 'show', f'{root.stdout.split()[0]}:atividade-sexta/analise.py'],
+        capture_output=True, text=True, cwd=ROOT, check=True
+    ).stdout
+    errors = []
+    with tempfile.TemporaryDirectory() as folder:
+        # o script original lê vgsales.csv da pasta atual
+        shutil.copyfile(DATASET, os.path.join(folder, 'vgsales.csv'))
+        with open(os.path.join(folder, 'analise.py'), 'w', encoding='utf-8') as file:
+            file.write(original)
+        expected = _cli_output('analise.py', folder)
+    for args in [(), ('--streaming',)]:
+        actual = _cli_output(CLI, ROOT, *args)
+        label = ' '.join(('analise.py',) + args)
+        if len(actual) != len(expected):
+            errors.append(f'{label}: {len(actual)} linhas x {len(expected)} linhas')
+        for number, (a, b) in enumerate(zip(actual, expected), start=1):
+            if not _same_line(a, b):
+                errors.append(f'{label}, linha {number}: {a.strip()!r} x {b.strip()!r}')
+                break
+    print(f'  {len(CLI_SESSIONS)} sessões, {len(expected)} linhas, {len(errors)} diferenças')
+    return errors
+
+
+CHECKS = {
+    'Tempo de import do app.py': check_import_budget,
+    'Laços linha a linha (iterrows)': check_row_loops,
+    'Ingestão incremental x dataset refeito': check_incremental,
+    'Streaming x consultas em memória': check_streaming,
+    'Bitmaps e top-K x pandas': check_indexes,
+    'Agregação paralela x cubo': check_parallel,
+    'Colunas compartilhadas x CSV': check_shared,
+    'Saída do analise.py x versão original': check_cli,
+}
+
+
+def main():
+    failed = False
+    for title, check in CHECKS.items():
+        print(title)
+        errors = check()
+        for error in errors:
+            print(f'  ERRO: {error}')
+        failed = failed or bool(errors)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,52 @@
+import itertools
+
+from loader import CSV_PATH, SALES_COLUMNS, derived
+
+# Cubo de agregados: somas de vendas e contagem de jogos para cada combinação
+# de Ano x Gênero x Plataforma x Editora, incluindo todos os níveis de roll-up
+DIMENSIONS = ['Year', 'Genre', 'Platform', 'Publisher']
+MEASURES = SALES_COLUMNS + ['count']
+
+
+def build_cube(df):
+    # Soma em float64 (com as 2 casas do CSV) para não acumular erro do float32 nos totais
+    base = df[DIMENSIONS].join(df[SALES_COLUMNS].astype('float64').round(2))
+    base['count'] = 1
+    # dropna=False mantém jogos sem ano/editora nos totais dos outros níveis
+    base = base.groupby(DIMENSIONS, observed=True, dropna=False)[MEASURES].sum().reset_index()
+    cube = {(): base[MEASURES].sum().to_frame().T}
+    for r in range(1, len(DIMENSIONS) + 1):
+        for dims in itertools.combinations(DIMENSIONS, r):
+            # cada nível é agregado a partir do cuboide base, que é bem menor que o dataset
+            cube[dims] = base.groupby(list(dims), observed=True, dropna=False)[MEASURES].sum().reset_index()
+    return cube
+
+
+def get_cube(path=CSV_PATH):
+    return derived('cube', build_cube, path)
+
+
+def rollup(dims, filters=None, path=CSV_PATH):
+    # Responde a uma consulta fatiando o menor cuboide que contém as dimensões pedidas
+    # filters: {coluna: lista de valores} ou {coluna: (mínimo, máximo)}
+    filters = filters or {}
+    key = tuple(d for d in DIMENSIONS if d in dims or d in filters)
+    cuboid = get_cube(path)[key]
+    if filters:
+        mask = True
+        for col, cond in filters.items():
+            if isinstance(cond, tuple):
+                selected = cuboid[col].between(cond[0], cond[1])
+            else:
+                selected = cuboid[col].isin(cond)
+            mask = mask & selected.to_numpy(dtype=bool, na_value=False)
+        cuboid = cuboid[mask]
+    if not dims:
+        return cuboid[MEASURES].sum()
+    # assim como no groupby do pandas, chaves nulas ficam fora do resultado
+    return cuboid.groupby(list(dims), observed=True)[MEASURES].sum()
+
+
+def counts(dim, filters=None, path=CSV_PATH):
+    # Equivalente ao value_counts() da coluna, respondido pelo cubo
+    return rollup([dim], filters, path)['count'].sort_values(ascending=False, kind='stable')
@@ -0,0 +1,188 @@
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+import loader
+from loader import CSV_PATH, DTYPES, SALES_COLUMNS, file_signature, rounded_sales
+
+TABLE = 'vendas'
+COLUMNS = list(DTYPES)
+INDEXED_COLUMNS = ['Year', 'Publisher', 'Genre', 'Platform', 'Name'] + SALES_COLUMNS
+CHUNK_ROWS = 100_000
+# Chave das linhas nos arquivos delta (ver incremental.py)
+KEY_COLUMNS = ['Rank', 'Name', 'Platform']
+
+# Conexões somente leitura do processo, por (caminho do CSV, assinatura da versão), e a
+# última aberta de cada caminho; o _lock só protege a escrita do banco (ingest/apply_delta)
+_conns = {}
+_latest = {}
+_lock = threading.Lock()
+
+
+def db_path(csv_path=CSV_PATH):
+    # Banco SQLite gerado a partir do CSV, gravado ao lado dele
+    return os.path.splitext(csv_path)[0] + '.db'
+
+
+def _column(col):
+    # Nomes de colunas entram no SQL por formatação, então só aceitamos os conhecidos
+    if col not in COLUMNS:
+        raise ValueError(f'Coluna desconhecida: {col}')
+    return f'"{col}"'
+
+
+def ingest(csv_path=CSV_PATH):
+    # Lê o CSV em blocos para que a ingestão não precise do arquivo inteiro em memória
+    target = db_path(csv_path)
+    tmp = target + '.tmp'
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.execute(f'''
+            CREATE TABLE {TABLE} (
+                Rank INTEGER PRIMARY KEY,
+                Name TEXT, Platform TEXT, Year INTEGER, Genre TEXT, Publisher TEXT,
+                NA_Sales REAL, EU_Sales REAL, JP_Sales REAL, Other_Sales REAL, Global_Sales REAL
+            )
+        ''')
+        for chunk in pd.read_csv(csv_path, dtype=DTYPES, chunksize=CHUNK_ROWS):
+            # float32 -> REAL com 2 casas, igual ao CSV, para os filtros baterem com o pandas
+            chunk[SALES_COLUMNS] = chunk[SALES_COLUMNS].astype('float64').round(2)
+            chunk.to_sql(TABLE, conn, if_exists='append', index=False)
+        for col in INDEXED_COLUMNS:
+            conn.execute(f'CREATE INDEX idx_{TABLE}_{col.lower()} ON {TABLE} ({_column(col)})')
+        mtime_ns, size = file_signature(csv_path)
+        conn.execute('CREATE TABLE meta (mtime_ns INTEGER, size INTEGER)')
+        conn.execute('INSERT INTO meta VALUES (?, ?)', (mtime_ns, size))
+        conn.execute('ANALYZE')
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp, target)
+    return target
+
+
+def _params(frame, columns):
+    frame = frame[columns].astype({col: 'float64' for col in SALES_COLUMNS}).round(2).astype(object)
+    return list(frame.where(frame.notna(), None).itertuples(index=False, name=None))
+
+
+def apply_delta(updates, inserts, old_signature, csv_path=CSV_PATH):
+    # Aplica as linhas alteradas/novas direto no banco, em vez de refazer a ingestão.
+    # Só vale se o banco estava na versão anterior do CSV; senão (ou se um Rank novo
+    # colidir com um existente) o banco fica desatualizado e connect() o refaz inteiro
+    target = db_path(csv_path)
+    values = [col for col in COLUMNS if col not in KEY_COLUMNS]
+    with _lock:
+        if _db_signature(target) != tuple(old_signature):
+            return False
+        conn = sqlite3.connect(target)
+        try:
+            conn.executemany(
+                f'UPDATE {TABLE} SET {", ".join(f"{_column(col)} = ?" for col in values)} '
+                f'WHERE {" AND ".join(f"{_column(col)} = ?" for col in KEY_COLUMNS)}',
+                _params(updates, values + KEY_COLUMNS)
+            )
+            conn.executemany(
+                f'INSERT INTO {TABLE} ({_select(COLUMNS)}) VALUES ({", ".join("?" * len(COLUMNS))})',
+                _params(inserts, COLUMNS)
+            )
+            conn.execute('UPDATE meta SET mtime_ns = ?, size = ?', file_signature(csv_path))
+            conn.commit()
+        except sqlite3.IntegrityError:
+            conn.rollback()
+            return False
+        finally:
+            conn.close()
+    return True
+
+
+def _db_signature(path):
+    try:
+        conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+        try:
+            return tuple(conn.execute('SELECT mtime_ns, size FROM meta').fetchone())
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+
+
+def connect(csv_path=CSV_PATH, signature=None, wait=False):
+    # Conexão da versão do dataset que a thread enxerga no loader (fixada por loader.pin no
+    # início do rerun), compartilhada por todas as sessões (check_same_thread=False).
+    # Sem banco dessa versão, quem está numa requisição não espera: usa a conexão da versão
+    # anterior enquanto outra thread (o watcher.py) refaz o banco. wait=True espera a
+    # ingestão e é para quem roda fora das requisições
+    csv_path = os.path.abspath(csv_path)
+    signature = tuple(signature or loader.dataset_signature(csv_path))
+    conn = _conns.get((csv_path, signature))
+    if conn is not None:
+        return conn
+    target = db_path(csv_path)
+    previous = _latest.get(csv_path)
+    if _db_signature(target) != signature:
+        if previous is not None and not wait:
+            if not _lock.acquire(blocking=False):
+                return previous
+        else:
+            _lock.acquire()
+        try:
+            # o banco só é refeito a partir do CSV atual, e só se estiver atrás dele
+            if _db_signature(target) != file_signature(csv_path):
+                ingest(csv_path)
+        finally:
+            _lock.release()
+    # sem o banco da versão pedida (ex.: sessão fixada numa versão já substituída), a
+    # conexão fica registrada com a versão que o banco tem de fato
+    actual = _db_signature(target)
+    conn = _conns.get((csv_path, actual))
+    if conn is None:
+        conn = sqlite3.connect(f'file:{target}?mode=ro', uri=True, check_same_thread=False)
+        conn = _conns.setdefault((csv_path, actual), conn)
+    _latest[csv_path] = conn
+    # guarda só esta versão e a publicada no loader; as outras saem do cache e são fechadas
+    # pelo coletor quando a última consulta que ainda as usa terminar
+    keep = {actual, loader.current_signature(csv_path)}
+    for key in [key for key in list(_conns) if key[0] == csv_path and key[1] not in keep]:
+        _conns.pop(key, None)
+    return conn
+
+
+def query(sql, params=(), path=CSV_PATH):
+    df = pd.read_sql_query(sql, connect(path), params=params)
+    # Restaura os tipos do loader nas colunas retornadas, menos as vendas: o banco já as
+    # guarda com 2 casas e voltar para float32 traria de volta o ruído (82.739998)
+    df = df.astype({col: DTYPES[col] for col in df.columns if col in DTYPES and col not in SALES_COLUMNS})
+    return rounded_sales(df)
+
+
+def _select(columns):
+    return ', '.join(_column(col) for col in columns)
+
+
+def games_by_publisher(empresa, columns=COLUMNS, coluna_vendas=None, minimo=None, path=CSV_PATH):
+    sql = f'SELECT {_select(columns)} FROM {TABLE} WHERE Publisher = ?'
+    params = [empresa]
+    if coluna_vendas is not None and minimo is not None:
+        sql += f' AND {_column(coluna_vendas)} > ?'
+        params.append(minimo)
+    return query(sql + ' ORDER BY Rank', params, path)
+
+
+def games_by_name(nome, columns=COLUMNS, path=CSV_PATH):
+    return query(f'SELECT {_select(columns)} FROM {TABLE} WHERE Name = ? ORDER BY Rank', (nome,), path)
+
+
+def games_above_sales(valor, regioes, columns=COLUMNS, path=CSV_PATH):
+    # Jogos com vendas acima do valor em pelo menos uma das regiões (um índice por região)
+    cond = ' OR '.join(f'{_column(col)} > ?' for col in regioes)
+    return query(f'SELECT {_select(columns)} FROM {TABLE} WHERE {cond} ORDER BY Rank', [valor] * len(regioes), path)
+
+
+if __name__ == '__main__':
+    import sys
+    print(ingest(sys.argv[1] if len(sys.argv) > 1 else CSV_PATH))
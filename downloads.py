@@ -0,0 +1,57 @@
+import gzip
+import importlib.util
+import io
+
+from loader import CSV_PATH, derived
+
+# Formatos de download: rótulo -> (extensão, tipo MIME)
+FORMATS = {
+    'CSV': ('.csv', 'text/csv'),
+    'CSV compactado (gzip)': ('.csv.gz', 'application/gzip'),
+    'Parquet': ('.parquet', 'application/vnd.apache.parquet'),
+}
+CHUNK_ROWS = 50_000
+
+
+def available_formats():
+    # Parquet depende do pyarrow, que é opcional
+    if importlib.util.find_spec('pyarrow') is None:
+        return [fmt for fmt in FORMATS if fmt != 'Parquet']
+    return list(FORMATS)
+
+
+def _dataset_blob(fmt, df, path):
+    if fmt == 'Parquet':
+        buffer = io.BytesIO()
+        df.to_parquet(buffer, index=False)
+        return buffer.getvalue()
+    with open(path, 'rb') as file:
+        data = file.read()
+    return gzip.compress(data) if fmt == 'CSV compactado (gzip)' else data
+
+
+def dataset_bytes(fmt, path=CSV_PATH):
+    # Bytes do dataset completo, gerados uma vez por versão e reaproveitados em todos os reruns
+    return derived(f'download:{fmt}', lambda df: _dataset_blob(fmt, df, path), path)
+
+
+def iter_csv_chunks(frame, chunk_rows=CHUNK_ROWS):
+    # Gera o CSV em blocos, sem montar o texto da tabela inteira de uma vez
+    yield frame.iloc[:0].to_csv(index=False).encode('utf-8')
+    for start in range(0, len(frame), chunk_rows):
+        yield frame.iloc[start:start + chunk_rows].to_csv(index=False, header=False).encode('utf-8')
+
+
+def export_bytes(frame, fmt):
+    # Exporta a visão filtrada atual no formato escolhido
+    buffer = io.BytesIO()
+    if fmt == 'Parquet':
+        frame.to_parquet(buffer, index=False)
+    elif fmt == 'CSV compactado (gzip)':
+        with gzip.GzipFile(fileobj=buffer, mode='wb') as out:
+            for chunk in iter_csv_chunks(frame):
+                out.write(chunk)
+    else:
+        for chunk in iter_csv_chunks(frame):
+            buffer.write(chunk)
+    return buffer.getvalue()
@@ -0,0 +1,107 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from lazy_imports import lazy_import
+from loader import CSV_PATH, dataset_version
+from profiling import hook
+
+pio = lazy_import('plotly.io')
+
+# Cache LRU de figuras Plotly serializadas em JSON, compartilhado entre sessões.
+# A chave é (página, valores dos widgets, versão do dataset); o limite é em bytes.
+# Com cached_view o agregado que alimenta a figura (e a tabela ao lado) fica junto com
+# ela: num acerto nem a agregação nem a montagem da figura rodam
+MAX_BYTES = 32 * 1024 * 1024
+
+
+def _freeze(value):
+    # listas (ex.: multiselect) viram tuplas para poderem fazer parte da chave
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class FigureCache:
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        return entry
+
+    def get_or_build(self, view, params, builder, path=CSV_PATH):
+        key = (view, _freeze(params), dataset_version(path))
+        entry = self._lookup(key)
+        if entry is None:
+            entry = (None, builder().to_json())
+            self._store(key, entry)
+        # cada chamada recebe um objeto novo, então quem usa pode alterá-lo à vontade
+        return pio.from_json(entry[1])
+
+    def get_or_compute(self, view, params, compute, builder, path=CSV_PATH):
+        # compute() agrega os dados; builder(dados) monta a figura. Devolve (dados, figura);
+        # os dados são compartilhados entre sessões e não devem ser modificados
+        key = (view, _freeze(params), dataset_version(path))
+        entry = self._lookup(key)
+        if entry is None:
+            data = compute()
+            entry = (data, builder(data).to_json())
+            self._store(key, entry)
+        return entry[0], pio.from_json(entry[1])
+
+    @staticmethod
+    def _size(entry):
+        data, figure = entry
+        size = len(figure)
+        if data is not None and hasattr(data, 'memory_usage'):
+            size += int(np.sum(data.memory_usage(deep=True)))
+        return size
+
+    def _store(self, key, entry):
+        size = self._size(entry)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                return
+            self._items[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._bytes -= self._size(evicted)
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._items), 'bytes': self._bytes}
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+
+cache = FigureCache()
+
+
+@hook('render-figure')
+def cached_figure(view, params, builder, path=CSV_PATH):
+    return cache.get_or_build(view, params, builder, path)
+
+
+@hook('render-figure')
+def cached_view(view, params, compute, builder, path=CSV_PATH):
+    # (dados, figura): compute só roda quando a figura não está no cache
+    return cache.get_or_compute(view, params, compute, builder, path)
@@ -0,0 +1,184 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+import cube
+import database
+import loader
+from loader import CATEGORY_COLUMNS, CSV_PATH, DTYPES, SALES_COLUMNS
+
+# Ingestão incremental: aplica um arquivo delta (mesmas colunas do vgsales.csv) ao dataset
+# python incremental.py delta.csv [vgsales.csv]
+# Linhas cuja chave (Rank, Name, Platform) já existe substituem a linha antiga; as outras
+# são acrescentadas (com um Rank ainda não usado, senão o delta inteiro é rejeitado). O cubo é atualizado só com as linhas do delta e a nova versão
+# entra no cache sem reler o CSV
+KEY = database.KEY_COLUMNS
+FLOAT_FORMAT = '%.10g'
+
+# Um delta por vez; as sessões continuam lendo a versão anterior até a troca no loader
+_lock = threading.Lock()
+
+
+def _row_keys(df):
+    return pd.MultiIndex.from_frame(df[KEY].astype({'Platform': object}))
+
+
+def get_row_keys(path=CSV_PATH):
+    return loader.derived('row_keys', _row_keys, path)
+
+
+def read_delta(delta_path):
+    delta = pd.read_csv(delta_path, dtype=DTYPES)
+    missing = [col for col in DTYPES if col not in delta.columns]
+    if missing:
+        raise ValueError(f'Colunas ausentes no delta: {", ".join(missing)}')
+    # a mesma chave repetida no delta: vale a última linha
+    return delta[list(DTYPES)].drop_duplicates(KEY, keep='last').reset_index(drop=True)
+
+
+def _align_categories(df, delta):
+    # Categorias novas vão para o fim da lista, preservando os códigos das existentes
+    df, delta = df.copy(deep=False), delta.copy()
+    for col in CATEGORY_COLUMNS:
+        new = delta[col].dropna().unique()
+        new = [value for value in new if value not in df[col].cat.categories]
+        if new:
+            df[col] = df[col].cat.add_categories(new)
+        delta[col] = pd.Categorical(delta[col].astype(object), categories=df[col].cat.categories)
+    return df, delta
+
+
+def _codes(frame, col):
+    # Códigos inteiros das chaves (-1 = ausente); as categorias só crescem no fim da
+    # lista, então o código de um valor é o mesmo no cubo antigo e no delta
+    if isinstance(frame[col].dtype, pd.CategoricalDtype):
+        return frame[col].cat.codes.to_numpy(dtype=np.int64)
+    return frame[col].fillna(-1).to_numpy(dtype=np.int64)
+
+
+def _from_codes(codes, like):
+    if isinstance(like.dtype, pd.CategoricalDtype):
+        return pd.Categorical.from_codes(codes, dtype=like.dtype)
+    return pd.Series(codes).where(codes >= 0).astype(like.dtype).array
+
+
+def merge_cube(current, added, removed):
+    # Soma os agregados das linhas novas e subtrai os das substituídas, grupo a grupo:
+    # só os grupos tocados pelo delta mudam, o resto do cubo é reaproveitado
+    rows = pd.concat([added, removed], ignore_index=True)
+    signed = pd.DataFrame({col: _codes(rows, col) for col in cube.DIMENSIONS})
+    sign = np.r_[np.ones(len(added)), -np.ones(len(removed))]
+    for col in SALES_COLUMNS:
+        signed[col] = rows[col].to_numpy(dtype=np.float64).round(2) * sign
+    signed['count'] = sign.astype(np.int64)
+
+    merged = {(): (current[()] + signed[cube.MEASURES].sum().to_numpy()).round(2)}
+    for key, cuboid in current.items():
+        if not key:
+            continue
+        changes = signed.groupby(list(key))[cube.MEASURES].sum()
+        cuboid_keys = pd.MultiIndex.from_arrays([_codes(cuboid, col) for col in key])
+        change_keys = changes.index if len(key) > 1 else pd.MultiIndex.from_arrays([changes.index])
+        positions = cuboid_keys.get_indexer(change_keys)
+        found = positions >= 0
+        # cópia: o cubo atual continua em uso pelas sessões até a troca de versão
+        result = cuboid.copy()
+        for col in key:
+            if isinstance(result[col].dtype, pd.CategoricalDtype) and len(result[col].cat.categories) != len(added[col].cat.categories):
+                result[col] = result[col].cat.set_categories(added[col].cat.categories)
+        sales = result[SALES_COLUMNS].to_numpy(copy=True)
+        sales[positions[found]] += changes[SALES_COLUMNS].to_numpy()[found]
+        result[SALES_COLUMNS] = sales.round(2)
+        result.loc[positions[found], 'count'] += changes['count'].to_numpy()[found]
+        if not found.all():
+            new_groups = pd.DataFrame({
+                col: _from_codes(change_keys.get_level_values(i).to_numpy()[~found], result[col])
+                for i, col in enumerate(key)
+            })
+            new_groups[cube.MEASURES] = changes.to_numpy()[~found]
+            result = pd.concat([result, new_groups.astype(result.dtypes.to_dict())], ignore_index=True)
+        # grupos que ficaram sem jogos (ex.: ano revisado) saem do cubo
+        merged[key] = result[result['count'] > 0].reset_index(drop=True)
+    return merged
+
+
+def _csv_frame(df):
+    # Vendas com as 2 casas do CSV original (o float32 escreveria 0.009999999776482582);
+    # FLOAT_FORMAT omite o '.0' dos inteiros e ausentes viram 'N/A', como no arquivo original
+    return df.astype({col: 'float64' for col in SALES_COLUMNS}).round(2)
+
+
+def _write_csv(path, df, inserts, updated):
+    if len(updated):
+        # atualizações exigem regravar o arquivo (de uma vez, por troca atômica)
+        tmp = path + '.tmp'
+        _csv_frame(df).to_csv(tmp, index=False, float_format=FLOAT_FORMAT, na_rep='N/A')
+        os.replace(tmp, path)
+        return
+    with open(path, 'rb+') as file:
+        file.seek(0, os.SEEK_END)
+        if file.tell():
+            file.seek(-1, os.SEEK_END)
+            if file.read(1) != b'\n':
+                file.write(b'\n')
+    _csv_frame(inserts).to_csv(path, mode='a', header=False, index=False, float_format=FLOAT_FORMAT, na_rep='N/A')
+
+
+def apply_delta(delta_path, path=CSV_PATH):
+    delta = read_delta(delta_path)
+    with _lock:
+        df = loader.load_dataset(path)
+        old_signature = loader.file_signature(path)
+        keys = get_row_keys(path)
+        current_cube = cube.get_cube(path)
+
+        positions = keys.get_indexer(_row_keys(delta))
+        is_update = positions >= 0
+        # Rank é a chave primária do banco: uma linha nova com o Rank de outro jogo não pode
+        # entrar, e a checagem vem antes de qualquer escrita no CSV ou no banco
+        new_ranks = delta.loc[~is_update, 'Rank']
+        collisions = new_ranks[new_ranks.isin(df['Rank']) | new_ranks.duplicated(keep=False)]
+        if len(collisions):
+            ranks = ', '.join(str(rank) for rank in sorted(collisions.unique())[:10])
+            raise ValueError(f'Linhas novas com Rank já usado por outro jogo: {ranks}')
+        df, delta = _align_categories(df, delta)
+        updates, inserts = delta[is_update], delta[~is_update]
+        updated = positions[is_update]
+
+        removed = df.iloc[updated]
+        new_df = df
+        if len(updated):
+            # só as colunas alteradas são copiadas; o DataFrame antigo não é modificado
+            new_df = df.copy(deep=False)
+            for col in DTYPES:
+                values = new_df[col].copy()
+                values.iloc[updated] = updates[col].to_numpy()
+                new_df[col] = values
+        if len(inserts):
+            new_df = pd.concat([new_df, inserts], ignore_index=True)
+
+        _write_csv(path, new_df, inserts, updated)
+        database.apply_delta(updates, inserts, old_signature, path)
+        if loader.feather is not None:
+            try:
+                loader.build_snapshot(path, new_df)
+                # os outros processos do servidor mapeiam a nova versão em vez de reler o CSV
+                attached = loader.build_shared(path, new_df)
+                if attached is not None:
+                    new_df = attached
+            except OSError:
+                pass
+        derived = {
+            'cube': merge_cube(current_cube, delta, removed),
+            'row_keys': keys.append(_row_keys(inserts)) if len(inserts) else keys,
+        }
+        loader.replace_dataset(path, new_df, derived)
+    return {'updated': int(len(updates)), 'inserted': int(len(inserts)), 'version': loader.dataset_version(path)}
+
+
+if __name__ == '__main__':
+    import sys
+    result = apply_delta(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else CSV_PATH)
+    print(f'{result["updated"]} linhas atualizadas, {result["inserted"]} inseridas (versão {result["version"]})')
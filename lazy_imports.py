@@ -0,0 +1,25 @@
+import importlib
+
+
+class LazyModule:
+    # Proxy que só importa o módulo no primeiro acesso a um atributo, para que
+    # bibliotecas de gráficos não pesem na inicialização dos workers
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        if self._module is None:
+            self.__dict__['_module'] = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = 'carregado' if self._module is not None else 'não carregado'
+        return f'<LazyModule {self._name} ({state})>'
+
+
+def lazy_import(name):
+    return LazyModule(name)
@@ -0,0 +1,257 @@
+import os
+import threading
+
+import pandas as pd
+
+import shared
+
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:  # sem pyarrow o loader continua funcionando só com o CSV
+    pa = feather = None
+
+# Caminho padrão do dataset, resolvido a partir da pasta do projeto
+CSV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'vgsales.csv')
+
+SALES_COLUMNS = ['NA_Sales', 'EU_Sales', 'JP_Sales', 'Other_Sales', 'Global_Sales']
+CATEGORY_COLUMNS = ['Platform', 'Genre', 'Publisher']
+
+# Tipos explícitos: evita a inferência do pandas e reduz bastante a memória
+DTYPES = {
+    'Rank': 'int32',
+    'Name': str,
+    'Platform': 'category',
+    'Year': 'Int16',
+    'Genre': 'category',
+    'Publisher': 'category',
+    **{col: 'float32' for col in SALES_COLUMNS},
+}
+
+# Cache compartilhado por todas as sessões do processo: caminho -> entrada
+# A entrada guarda a assinatura do arquivo (mtime, tamanho) usada na invalidação
+_cache = {}
+_lock = threading.RLock()
+# Caminhos observados pelo watcher.py: a troca de versão é feita por ele, em segundo plano
+_watched = set()
+# Versão fixada por thread (cada sessão do Streamlit roda o script em uma thread)
+_local = threading.local()
+# Um lock por estrutura derivada: (caminho, nome) -> lock
+_build_locks = {}
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def read_csv(path=CSV_PATH):
+    # Leitura direta do CSV com os tipos definidos, sem passar pelo cache
+    return pd.read_csv(path, dtype=DTYPES)
+
+
+def rounded_sales(frame):
+    # Vendas em float64 com as 2 casas do CSV, para o que sai das consultas: o float32 do
+    # DataFrame em memória viraria 41.4900016784668 (e somas como 678.8999633789062)
+    sales = [col for col in SALES_COLUMNS if col in frame.columns]
+    if not sales:
+        return frame
+    return frame.astype({col: 'float64' for col in sales}).round({col: 2 for col in sales})
+
+
+def snapshot_path(path=CSV_PATH):
+    # Snapshot colunar (Arrow/Feather) gravado ao lado do CSV
+    return os.path.splitext(path)[0] + '.feather'
+
+
+def build_snapshot(path=CSV_PATH, df=None):
+    if feather is None:
+        raise RuntimeError('pyarrow é necessário para gerar o snapshot colunar')
+    if df is None:
+        df = read_csv(path)
+    target = snapshot_path(path)
+    # Sem compressão para permitir memory-map; as categorias viram dicionários no Arrow
+    # Um único bloco por coluna: take/iloc em colunas de texto fragmentadas concatena
+    # todos os fragmentos a cada chamada
+    tmp = target + '.tmp'
+    table = pa.Table.from_pandas(df, preserve_index=False).combine_chunks()
+    feather.write_feather(table, tmp, compression='uncompressed', chunksize=max(len(df), 1))
+    os.replace(tmp, target)
+    return target
+
+
+def snapshot_is_fresh(path):
+    try:
+        return os.stat(snapshot_path(path)).st_mtime_ns >= os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def read_snapshot(path=CSV_PATH):
+    # DataFrame sobre o snapshot mapeado em memória, sem passar pelo cache
+    table = feather.read_table(snapshot_path(path), memory_map=True)
+    return table.to_pandas(split_blocks=True)
+
+
+def shared_path(path=CSV_PATH):
+    # Colunas tipadas compartilhadas entre os processos do servidor (ver shared.py)
+    return os.path.splitext(path)[0] + '.columns'
+
+
+def build_shared(path=CSV_PATH, df=None, signature=None):
+    # Publica a versão nas colunas compartilhadas e devolve o DataFrame montado sobre elas,
+    # para que este processo também use as páginas compartilhadas em vez da sua cópia
+    signature = signature or file_signature(path)
+    if df is None:
+        df = read_csv(path)
+    target = shared.write(df, shared_path(path), signature)
+    return shared.attach(target, signature)
+
+
+def read_dataset(path=CSV_PATH):
+    # Ordem: colunas compartilhadas da versão atual (nenhuma cópia por processo), snapshot
+    # mapeado em memória mais novo que o CSV e, por fim, o próprio CSV
+    signature = file_signature(path)
+    if pa is not None:
+        df = shared.attach(shared_path(path), signature)
+        if df is not None:
+            return df
+    if feather is not None and snapshot_is_fresh(path):
+        df = read_snapshot(path)
+    else:
+        df = read_csv(path)
+        if feather is not None:
+            try:
+                build_snapshot(path, df)
+            except OSError:
+                pass  # pasta somente leitura: segue com o CSV
+    if pa is not None:
+        try:
+            # o primeiro processo publica; os outros só mapeiam (None: outra versão já substituiu)
+            attached = build_shared(path, df, signature)
+            if attached is not None:
+                return attached
+        except (OSError, TypeError, ValueError):
+            pass  # sem permissão de escrita ou tipo sem suporte no shared.py: segue com a cópia
+    return df
+
+
+def _entry(path):
+    path = os.path.abspath(path)
+    pinned = _local.__dict__.get('pinned', {}).get(path)
+    if pinned is not None:
+        return pinned
+    entry = _cache.get(path)
+    if entry is not None and path in _watched:
+        return entry
+    signature = file_signature(path)
+    if entry is not None and entry['signature'] == signature:
+        return entry
+    with _lock:
+        # outra thread pode ter recarregado enquanto esperávamos o lock
+        entry = _cache.get(path)
+        if entry is None or entry['signature'] != signature:
+            entry = {'signature': signature, 'df': read_dataset(path), 'derived': {}}
+            _cache[path] = entry
+    return entry
+
+
+def pin(path=CSV_PATH):
+    # Fixa a versão mais recente para o resto da execução nesta thread e devolve o
+    # DataFrame; o app chama no início de cada rerun, então uma execução em andamento
+    # termina na versão em que começou mesmo que o watcher troque a versão no meio
+    pinned = _local.__dict__.setdefault('pinned', {})
+    pinned.pop(os.path.abspath(path), None)
+    entry = _entry(path)
+    pinned[os.path.abspath(path)] = entry
+    return entry['df']
+
+
+def watch(path, enabled=True):
+    with _lock:
+        (_watched.add if enabled else _watched.discard)(os.path.abspath(path))
+
+
+def current_signature(path=CSV_PATH):
+    # Assinatura da versão publicada no cache (ignora a versão fixada na thread)
+    entry = _cache.get(os.path.abspath(path))
+    return entry['signature'] if entry is not None else None
+
+
+def load_dataset(path=CSV_PATH):
+    # O DataFrame retornado é compartilhado entre sessões: não deve ser modificado
+    return _entry(path)['df']
+
+
+def derived(name, builder, path=CSV_PATH):
+    # Estruturas derivadas (cubos, índices...) calculadas uma vez por versão do dataset
+    # e descartadas junto com ela quando o CSV muda
+    # O cálculo só segura o lock do próprio nome: quem pede outra estrutura, carrega o
+    # dataset ou troca a versão não espera por ele; o _lock fica só para guardar o resultado
+    entry = _entry(path)
+    cache = entry['derived']
+    if name not in cache:
+        with _lock:
+            build_lock = _build_locks.setdefault((os.path.abspath(path), name), threading.Lock())
+        with build_lock:
+            if name not in cache:
+                value = builder(entry['df'])
+                with _lock:
+                    cache.setdefault(name, value)
+    return cache[name]
+
+
+def derived_items(path=CSV_PATH):
+    # Estruturas derivadas já calculadas para a versão atual (nome -> objeto)
+    return dict(_entry(path)['derived'])
+
+
+def store_derived(name, value, path=CSV_PATH, signature=None):
+    # Guarda uma estrutura calculada fora do processo (ex.: warmup.py); se a versão já
+    # mudou desde que o cálculo começou, o resultado é descartado
+    entry = _cache.get(os.path.abspath(path))
+    if entry is None or (signature is not None and entry['signature'] != tuple(signature)):
+        return False
+    with _lock:
+        entry['derived'].setdefault(name, value)
+    return True
+
+
+def replace_dataset(path, df, derived_values=None, signature=None):
+    # Instala uma versão já calculada (ex.: após aplicar um delta) sem reler o arquivo;
+    # a assinatura padrão é a do arquivo já regravado. A troca é uma única atribuição:
+    # quem já pegou a entrada antiga continua com ela
+    path = os.path.abspath(path)
+    entry = {'signature': signature or file_signature(path), 'df': df, 'derived': dict(derived_values or {})}
+    with _lock:
+        _cache[path] = entry
+
+
+def clear_cache(path=None):
+    # Descarta o dataset (e os derivados) do cache; sem caminho, limpa tudo
+    with _lock:
+        if path is None:
+            _cache.clear()
+        else:
+            _cache.pop(os.path.abspath(path), None)
+
+
+def dataset_signature(path=CSV_PATH):
+    # Assinatura da versão que esta thread enxerga (a mesma que _entry devolveria), sem
+    # carregar o dataset: a fixada por pin, a publicada (com o watcher) ou a do arquivo
+    path = os.path.abspath(path)
+    entry = _local.__dict__.get('pinned', {}).get(path)
+    if entry is None and path in _watched:
+        entry = _cache.get(path)
+    return entry['signature'] if entry is not None else file_signature(path)
+
+
+def dataset_version(path=CSV_PATH):
+    mtime_ns, size = _entry(path)['signature']
+    return f'{mtime_ns}-{size}'
+
+
+if __name__ == '__main__':
+    # Etapa de build: python loader.py [caminho.csv]
+    import sys
+    print(build_snapshot(sys.argv[1] if len(sys.argv) > 1 else CSV_PATH))
@@ -0,0 +1,161 @@
+import dataclasses
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+import figure_cache
+import loader
+from loader import CSV_PATH, DTYPES, SALES_COLUMNS
+
+try:
+    import psutil
+except ImportError:  # sem psutil o RSS vem de /proc (Linux)
+    psutil = None
+
+# Instrumentação de memória: bytes por coluna antes/depois dos tipos do loader,
+# tamanho de cada estrutura derivada da versão atual e o RSS do processo ao longo do tempo
+# Tipos que o pandas infere sem o dtype= do loader (inteiros e floats de 64 bits, texto como object)
+UNOPTIMIZED = {
+    col: 'int64' if col == 'Rank' else 'float64' if col == 'Year' or col in SALES_COLUMNS else object
+    for col in DTYPES
+}
+# Linhas convertidas para estimar o tamanho sem os tipos otimizados (escalado para o total)
+SAMPLE_ROWS = 100_000
+SAMPLE_SECONDS = 5.0
+# 1 hora de amostras a cada 5 s
+MAX_SAMPLES = 720
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def _column_profile(df):
+    # Converter o dataset inteiro para object dobraria a memória; uma amostra de linhas
+    # espalhadas pelo arquivo basta para estimar o tamanho sem otimização
+    sample = df.iloc[::max(1, len(df) // SAMPLE_ROWS)]
+    scale = len(df) / max(len(sample), 1)
+    before = sample.astype({col: UNOPTIMIZED[col] for col in sample.columns if col in UNOPTIMIZED})
+    profile = pd.DataFrame({
+        'Coluna': df.columns,
+        'Tipo original': [str(before[col].dtype) for col in df.columns],
+        'Tipo otimizado': [str(dtype) for dtype in df.dtypes],
+        'Antes (bytes)': (before.memory_usage(index=False, deep=True) * scale).round().astype('int64').to_numpy(),
+        'Depois (bytes)': df.memory_usage(index=False, deep=True).to_numpy(),
+    })
+    profile['Redução (%)'] = (100 * (1 - profile['Depois (bytes)'] / profile['Antes (bytes)'])).round(1)
+    return profile
+
+
+def column_profile(path=CSV_PATH):
+    # Bytes por coluna antes e depois dos tipos do loader (calculado uma vez por versão)
+    return loader.derived('memory_columns', _column_profile, path)
+
+
+def sizeof(value):
+    # Tamanho aproximado em bytes de uma estrutura derivada (cubos, índices, resumos)
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(value, pd.DataFrame) else int(usage)
+    if isinstance(value, pd.Index):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sizeof(k) + sizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(sizeof(item) for item in value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return sum(sizeof(getattr(value, field.name)) for field in dataclasses.fields(value))
+    return sys.getsizeof(value)
+
+
+def cache_sizes(path=CSV_PATH):
+    # Uma linha por estrutura em cache no processo, da maior para a menor
+    sizes = {'dataset (DataFrame)': sizeof(loader.load_dataset(path))}
+    sizes.update({name: sizeof(value) for name, value in loader.derived_items(path).items()})
+    sizes['figuras (figure_cache)'] = figure_cache.cache.stats()['bytes']
+    result = pd.DataFrame({'Estrutura': list(sizes), 'Bytes': list(sizes.values())})
+    return result.sort_values('Bytes', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def rss_bytes():
+    # Memória residente do processo; None quando não há como medir
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        pass
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    return None
+
+
+class RssSampler(threading.Thread):
+    # Amostra o RSS periodicamente junto com a versão do dataset em uso, para ver
+    # quanto cada versão custa ao processo (inclusive durante a troca pelo watcher)
+    def __init__(self, path=CSV_PATH, interval=SAMPLE_SECONDS, max_samples=MAX_SAMPLES):
+        super().__init__(name='rss-sampler', daemon=True)
+        self.path = os.path.abspath(path)
+        self.interval = interval
+        self.samples = deque(maxlen=max_samples)
+        self.stopped = threading.Event()
+
+    def sample(self):
+        rss = rss_bytes()
+        if rss is not None:
+            signature = loader.current_signature(self.path)
+            version = f'{signature[0]}-{signature[1]}' if signature is not None else None
+            self.samples.append((time.time(), rss, version))
+
+    def run(self):
+        self.sample()
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def frame(self):
+        result = pd.DataFrame(list(self.samples), columns=['Momento', 'RSS (bytes)', 'Versão'])
+        result['Momento'] = pd.to_datetime(result['Momento'], unit='s')
+        return result
+
+    def stop(self):
+        self.stopped.set()
+
+
+_sampler = None
+_lock = threading.Lock()
+
+
+def start_sampler(path=CSV_PATH, interval=SAMPLE_SECONDS):
+    # Idempotente: um amostrador por processo, iniciado pelo app
+    global _sampler
+    with _lock:
+        if _sampler is None or not _sampler.is_alive():
+            _sampler = RssSampler(path, interval)
+            _sampler.start()
+    return _sampler
+
+
+def rss_history():
+    with _lock:
+        sampler = _sampler
+    return sampler.frame() if sampler is not None else RssSampler().frame()
+
+
+def version_costs(history):
+    # RSS por versão do dataset: primeira amostra, pico e a diferença de pico para a versão anterior
+    if history.empty:
+        return pd.DataFrame(columns=['Versão', 'Início', 'RSS inicial (bytes)', 'RSS pico (bytes)', 'Variação (bytes)'])
+    grouped = history.groupby('Versão', sort=False)
+    result = pd.DataFrame({
+        'Início': grouped['Momento'].min(),
+        'RSS inicial (bytes)': grouped['RSS (bytes)'].first(),
+        'RSS pico (bytes)': grouped['RSS (bytes)'].max(),
+    }).sort_values('Início').reset_index()
+    result['Variação (bytes)'] = result['RSS pico (bytes)'].diff().astype('Int64')
+    return result
@@ -0,0 +1,227 @@
+import io
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import reduction, spawn, util
+from multiprocessing.context import SpawnContext, SpawnProcess, set_spawning_popen
+
+import numpy as np
+
+import loader
+import streaming
+from loader import CSV_PATH
+
+# Agregação paralela por partições: o dataset é dividido por faixa de linhas ou por Year,
+# cada processo do pool calcula o agregado parcial (streaming.Rollup/TopN) da sua partição
+# lendo o snapshot Arrow mapeado em memória (as páginas do arquivo são compartilhadas entre
+# os processos pelo sistema operacional, nada é copiado na ida) e o processo principal junta
+# os parciais. Sem snapshot, com 1 worker ou com poucas linhas, roda em série no processo
+WORKERS = os.cpu_count() or 1
+# Abaixo disso o custo de despachar as tarefas supera o ganho
+MIN_PARALLEL_ROWS = 1_000_000
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_lock = threading.Lock()
+# Snapshots abertos em cada processo do pool: caminho -> (mtime, tabela mapeada)
+_tables = {}
+
+
+def _preparation_data(name):
+    # O que o spawn manda ao worker antes da tarefa, sem o __main__ do pai: no Streamlit
+    # ele é o app.py, e cada worker desenharia a página e iniciaria o próprio watcher. O
+    # worker só importa os módulos das tarefas (parallel, streaming...) ao recebê-las
+    data = spawn.get_preparation_data(name)
+    data.pop('init_main_from_path', None)
+    data.pop('init_main_from_name', None)
+    return data
+
+
+if sys.platform != 'win32':
+    from multiprocessing import popen_spawn_posix, resource_tracker
+
+    class _WorkerPopen(popen_spawn_posix.Popen):
+        # O _launch do spawn (posix) com os dados de preparação acima
+        def _launch(self, process_obj):
+            tracker_fd = resource_tracker.getfd()
+            self._fds.append(tracker_fd)
+            prep_data = _preparation_data(process_obj._name)
+            fp = io.BytesIO()
+            set_spawning_popen(self)
+            try:
+                reduction.dump(prep_data, fp)
+                reduction.dump(process_obj, fp)
+            finally:
+                set_spawning_popen(None)
+
+            parent_r = child_w = child_r = parent_w = None
+            try:
+                parent_r, child_w = os.pipe()
+                child_r, parent_w = os.pipe()
+                cmd = spawn.get_command_line(tracker_fd=tracker_fd, pipe_handle=child_r)
+                self._fds.extend([child_r, child_w])
+                self.pid = util.spawnv_passfds(spawn.get_executable(), cmd, self._fds)
+                self.sentinel = parent_r
+                with open(parent_w, 'wb', closefd=False) as f:
+                    f.write(fp.getbuffer())
+            finally:
+                fds_to_close = [fd for fd in (parent_r, parent_w) if fd is not None]
+                self.finalizer = util.Finalize(self, util.close_fds, fds_to_close)
+                for fd in (child_r, child_w):
+                    if fd is not None:
+                        os.close(fd)
+
+    class _WorkerProcess(SpawnProcess):
+        @staticmethod
+        def _Popen(process_obj):
+            return _WorkerPopen(process_obj)
+
+    class _WorkerContext(SpawnContext):
+        Process = _WorkerProcess
+
+    def _context():
+        return _WorkerContext()
+else:
+    def _context():
+        # no Windows o spawn padrão (os workers importam o __main__ do pai)
+        return multiprocessing.get_context('spawn')
+
+
+def get_pool(workers=None):
+    # Pool compartilhado do processo (também usado pelo warmup.py); spawn porque o processo
+    # do Streamlit tem várias threads e um fork copiaria locks já travados
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(workers or WORKERS, mp_context=_context())
+        return _pool
+
+
+def discard_pool():
+    # Descarta um pool quebrado (BrokenProcessPool); o próximo get_pool cria outro
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+
+def _table(path):
+    snapshot = loader.snapshot_path(path)
+    mtime = os.stat(snapshot).st_mtime_ns
+    cached = _tables.get(snapshot)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, loader.feather.read_table(snapshot, memory_map=True))
+        _tables[snapshot] = cached
+    return cached[1]
+
+
+def _partition(path, columns, rows=None, years=None, missing_year=False):
+    # rows: (início, fim) de linhas; years: (primeiro, último) ano; missing_year: jogos sem ano
+    table = _table(path)
+    if rows is not None:
+        table = table.slice(rows[0], rows[1] - rows[0])
+    if years is not None or missing_year:
+        year = table.column('Year').to_numpy(zero_copy_only=False)  # float, ausentes como NaN
+        mask = np.isnan(year) if missing_year else (year >= years[0]) & (year <= years[1])
+        table = table.filter(mask)
+    return table.select(list(columns)).to_pandas()
+
+
+def _compute(make_partial, path, predicate, filter_columns, partition):
+    # Roda no processo do pool: agrega uma partição e devolve o parcial
+    aggregate = make_partial()
+    columns = list(dict.fromkeys(list(aggregate.columns()) + list(filter_columns)))
+    frame = _partition(path, columns, **partition)
+    if predicate is not None:
+        frame = frame[predicate(frame)]
+    return aggregate.add(frame)
+
+
+def row_partitions(size, parts):
+    bounds = np.linspace(0, size, parts + 1).astype(np.int64)
+    return [{'rows': (int(start), int(stop))} for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+
+
+def year_partitions(path, parts):
+    # Faixas de anos com quantidades de linhas parecidas (um ano nunca é dividido), mais uma
+    # partição para os jogos sem ano; assim cada grupo com Year fica em uma partição só
+    year = _table(path).column('Year').to_numpy(zero_copy_only=False)
+    values, counts = np.unique(year[~np.isnan(year)].astype(np.int64), return_counts=True)
+    cuts = np.searchsorted(np.cumsum(counts), np.linspace(0, counts.sum(), parts + 1)[1:-1], side='right')
+    groups = [group for group in np.split(values, np.unique(cuts)) if len(group)]
+    return [{'years': (int(group[0]), int(group[-1]))} for group in groups] + [{'missing_year': True}]
+
+
+def _can_parallelize(path, workers):
+    if workers <= 1 or loader.feather is None or not loader.snapshot_is_fresh(path):
+        return False
+    return len(_table(path)) >= MIN_PARALLEL_ROWS
+
+
+def run(make_partial, path=CSV_PATH, predicate=None, filter_columns=(), by='rows', workers=None):
+    # make_partial: cria um agregado parcial vazio e precisa ir para outros processos
+    # (ex.: functools.partial(streaming.Rollup, ['Genre'])); predicate: streaming.Matches/Above
+    # by: 'rows' (faixas de linhas) ou 'year' (faixas de anos)
+    path = os.path.abspath(path)
+    workers = workers or WORKERS
+    if not _can_parallelize(path, workers):
+        # em série: o mesmo agregado sobre o DataFrame já carregado pelo loader
+        frame = loader.load_dataset(path)
+        if predicate is not None:
+            frame = frame[predicate(frame)]
+        return make_partial().add(frame).result()
+    if by == 'year':
+        partitions = year_partitions(path, workers)
+    else:
+        partitions = row_partitions(len(_table(path)), workers)
+    try:
+        pool = get_pool()
+        futures = [pool.submit(_compute, make_partial, path, predicate, filter_columns, part) for part in partitions]
+        partials = [future.result() for future in futures]
+    except (OSError, RuntimeError) as error:
+        # BrokenProcessPool é um RuntimeError; o resultado sai em série e o pool é refeito depois
+        logger.warning('Agregação paralela indisponível (%s); executando em série', error)
+        discard_pool()
+        return run(make_partial, path, predicate, filter_columns, by, workers=1)
+    result = partials[0]
+    for other in partials[1:]:
+        result.merge(other)
+    return result.result()
+
+
+def rollup(dims, filters=None, path=CSV_PATH, by='rows', workers=None):
+    # Mesmo resultado de cube.rollup/streaming.Rollup, calculado por partições
+    filters = {col: values for col, values in (filters or {}).items() if values}
+    predicate = streaming.Matches(filters) if filters else None
+    return run(partial(streaming.Rollup, list(dims)), path, predicate, list(filters), by, workers)
+
+
+def counts(column, path=CSV_PATH, workers=None):
+    # Equivalente ao value_counts() da coluna
+    return rollup([column], path=path, workers=workers)['count'].sort_values(ascending=False, kind='stable')
+
+
+def decade_averages(column='Global_Sales', path=CSV_PATH, workers=None):
+    # Média de vendas por jogo em cada década (groupby(Year // 10 * 10)); as partições
+    # por ano mantêm cada ano inteiro em um processo
+    years = rollup(['Year'], path=path, by='year', workers=workers)
+    decades = years.groupby(years.index // 10 * 10)[[column, 'count']].sum()
+    return decades[column] / decades['count']
+
+
+def top_games(column, n, columns=None, path=CSV_PATH, workers=None):
+    return run(partial(streaming.TopN, column, n, columns), path, workers=workers)
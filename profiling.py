@@ -0,0 +1,243 @@
+import contextvars
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+import numpy as np
+import pandas as pd
+
+# Instrumentação das etapas de cada rerun do app: carga do dataset, filtros, agregações,
+# tabela e gráficos. Cada etapa vira um registro (duração, blocos alocados e, com o
+# tracemalloc ligado, bytes alocados) num buffer circular compartilhado pelo processo.
+# Só mede reruns que ligaram o profiling (painel de depuração da sessão ou a variável de
+# ambiente VGSALES_PROFILE=1); fora deles cada gancho custa uma leitura de ContextVar.
+# Blocos e bytes são do processo inteiro: com várias sessões ao mesmo tempo incluem o
+# que as outras alocaram durante a etapa
+PHASES = ('load', 'filter', 'aggregate', 'render-table', 'render-figure')
+ENV_FLAG = 'VGSALES_PROFILE'
+# Registros de etapas e de reruns guardados (os mais antigos são descartados)
+MAX_RECORDS = 5000
+MAX_RERUNS = 500
+DUMP_FORMAT = 1
+
+_records = deque(maxlen=MAX_RECORDS)
+_reruns = deque(maxlen=MAX_RERUNS)
+_lock = threading.Lock()
+_ids = itertools.count(1)
+# Rerun medido no contexto atual (None = sem profiling) e profundidade das etapas aninhadas
+_current = contextvars.ContextVar('profiling_rerun', default=None)
+_depth = contextvars.ContextVar('profiling_depth', default=0)
+
+
+class TraceOwner:
+    # Dono de um pedido de tracemalloc (ex.: um por sessão do app, no session_state)
+    pass
+
+
+# Donos que pediram o tracemalloc: ele fica ligado enquanto houver algum, e um dono
+# descartado (sessão encerrada) deixa de contar sem precisar desligar o pedido
+_tracers = weakref.WeakSet()
+_tracing_lock = threading.RLock()
+_process_owner = TraceOwner()
+
+
+def env_enabled():
+    return os.environ.get(ENV_FLAG, '') not in ('', '0')
+
+
+def start_rerun(enabled=None):
+    # Começa a medir um rerun neste contexto; enabled=None segue a variável de ambiente
+    if enabled is None:
+        enabled = env_enabled()
+    if not enabled:
+        _current.set(None)
+        return None
+    rerun = {'rerun': next(_ids), 'time': time.time(), 'page': None, 'option': None,
+             'start': time.perf_counter(), 'total_ms': None}
+    _current.set(rerun)
+    return rerun
+
+
+def set_page(page, option=None):
+    rerun = _current.get()
+    if rerun is not None:
+        rerun['page'] = page
+        if option is not None:
+            rerun['option'] = option
+
+
+def end_rerun():
+    rerun = _current.get()
+    if rerun is None:
+        return None
+    rerun['total_ms'] = (time.perf_counter() - rerun.pop('start')) * 1000
+    _current.set(None)
+    with _lock:
+        _reruns.append(rerun)
+    return rerun
+
+
+def active():
+    return _current.get() is not None
+
+
+def tracing_allocations():
+    return tracemalloc.is_tracing()
+
+
+def _sync_tracing():
+    with _tracing_lock:
+        wanted = any(True for _ in _tracers)
+        if wanted and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not wanted and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def trace_allocations(enabled=True, owner=None):
+    # O tracemalloc vale para o processo todo e deixa todas as alocações mais lentas: liga
+    # com o primeiro dono que pede e desliga quando o último desiste. Só mexe nele quando o
+    # pedido deste dono muda, então pode ser chamado a cada rerun
+    owner = _process_owner if owner is None else owner
+    with _tracing_lock:
+        if (owner in _tracers) == bool(enabled):
+            return
+        if enabled:
+            _tracers.add(owner)
+            weakref.finalize(owner, _sync_tracing)
+        else:
+            _tracers.discard(owner)
+        _sync_tracing()
+
+
+@contextmanager
+def phase(name, label=None):
+    rerun = _current.get()
+    if rerun is None:
+        yield
+        return
+    depth = _depth.get()
+    token = _depth.set(depth + 1)
+    tracing = tracemalloc.is_tracing()
+    traced = tracemalloc.get_traced_memory()[0] if tracing else None
+    blocks = sys.getallocatedblocks()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        record = {
+            'rerun': rerun['rerun'],
+            'phase': name,
+            'label': label,
+            'depth': depth,
+            'ms': elapsed,
+            'blocks': sys.getallocatedblocks() - blocks,
+            'bytes': tracemalloc.get_traced_memory()[0] - traced if tracing and tracemalloc.is_tracing() else None,
+            'thread': threading.current_thread().name,
+        }
+        _depth.reset(token)
+        with _lock:
+            _records.append(record)
+
+
+def hook(name, label=None):
+    # Decorador: cada chamada da função vira uma etapa (o rótulo padrão é o nome da função)
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return func(*args, **kwargs)
+            with phase(name, label or func.__name__):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _pages():
+    with _lock:
+        return {rerun['rerun']: rerun for rerun in _reruns}
+
+
+def records_frame(rerun=None):
+    # Uma linha por etapa medida (a mais recente por último), com a página do rerun
+    with _lock:
+        rows = [record for record in _records if rerun is None or record['rerun'] == rerun]
+    pages = _pages()
+    frame = pd.DataFrame(rows, columns=['rerun', 'phase', 'label', 'depth', 'ms', 'blocks', 'bytes', 'thread'])
+    frame.insert(1, 'page', [pages.get(rerun_id, {}).get('page') for rerun_id in frame['rerun']])
+    frame.insert(2, 'option', [pages.get(rerun_id, {}).get('option') for rerun_id in frame['rerun']])
+    return frame
+
+
+def last_rerun(page=None):
+    # Último rerun medido (opcionalmente de uma página), ou None
+    with _lock:
+        for rerun in reversed(_reruns):
+            if page is None or rerun['page'] == page:
+                return dict(rerun)
+    return None
+
+
+def rerun_breakdown(rerun):
+    # Etapas de primeiro nível de um rerun somadas por etapa, mais o tempo não atribuído
+    # (widgets, montagem dos gráficos fora do cache, envio ao navegador)
+    frame = records_frame(rerun['rerun'])
+    top = frame[frame['depth'] == 0]
+    result = top.groupby('phase', sort=False).agg(
+        calls=('ms', 'size'), ms=('ms', 'sum'), blocks=('blocks', 'sum'), bytes=('bytes', 'sum')
+    ).reset_index()
+    if top['bytes'].isna().all():
+        result['bytes'] = np.nan
+    other = rerun['total_ms'] - result['ms'].sum()
+    result.loc[len(result)] = ['não atribuído', 0, max(other, 0.0), np.nan, np.nan]
+    return result
+
+
+def phase_summary():
+    # Por página e etapa, sobre todos os registros do buffer: chamadas e percentis de duração
+    frame = records_frame()
+    frame = frame[frame['depth'] == 0]
+    if frame.empty:
+        return pd.DataFrame(columns=['page', 'option', 'phase', 'calls', 'p50_ms', 'p95_ms', 'max_ms', 'blocks_mean'])
+    grouped = frame.groupby(['page', 'option', 'phase'], dropna=False)['ms']
+    result = pd.DataFrame({
+        'calls': grouped.size(),
+        'p50_ms': grouped.median(),
+        'p95_ms': grouped.quantile(0.95),
+        'max_ms': grouped.max(),
+        'blocks_mean': frame.groupby(['page', 'option', 'phase'], dropna=False)['blocks'].mean(),
+    })
+    return result.reset_index()
+
+
+def dump(path=None):
+    # JSON com os reruns e as etapas do buffer, para análise fora do app
+    with _lock:
+        payload = {
+            'format': DUMP_FORMAT,
+            'generated': time.time(),
+            'pid': os.getpid(),
+            'tracemalloc': tracemalloc.is_tracing(),
+            'reruns': list(_reruns),
+            'records': list(_records),
+        }
+    data = json.dumps(payload, ensure_ascii=False, indent=2)
+    if path is not None:
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(data)
+    return data
+
+
+def clear():
+    with _lock:
+        _records.clear()
+        _reruns.clear()
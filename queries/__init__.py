@@ -0,0 +1,26 @@
+# Consultas do dashboard sem dependência do Streamlit: podem ser chamadas,
+# cacheadas, agrupadas e medidas fora de um rerun. app.py e analise.py usam as mesmas.
+from queries.filters import (
+    REGIONS,
+    best_seller,
+    first_games,
+    game_summary,
+    games_above_global_sales,
+    games_above_sales,
+    games_by_genre,
+    games_by_publisher,
+    games_by_year,
+    search_games,
+    top_games,
+)
+from queries.metrics import GeneralMetrics, general_metrics
+from queries.rollups import (
+    counts,
+    genre_sales,
+    publisher_counts,
+    region_totals,
+    releases_per_year_mean,
+    total_sales,
+    year_counts,
+    year_sales,
+)
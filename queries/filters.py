@@ -0,0 +1,103 @@
+from typing import Optional, Sequence
+
+import pandas as pd
+
+import bitmap
+import database
+import search
+import topk
+from loader import CSV_PATH, load_dataset, rounded_sales
+from profiling import hook
+
+# Regiões usadas no filtro por número de vendas (sem a global)
+REGIONS = ['JP_Sales', 'EU_Sales', 'NA_Sales', 'Other_Sales']
+# Agregação de game_summary: vendas somadas entre plataformas, o resto da primeira linha
+SUMMARY = {
+    'Rank': 'min',
+    'Publisher': 'first',
+    'Global_Sales': 'sum',
+    'NA_Sales': 'sum',
+    'EU_Sales': 'sum',
+    'JP_Sales': 'sum',
+    'Other_Sales': 'sum',
+    'Year': 'first',
+    'Genre': 'first',
+    'Platform': 'first'
+}
+
+
+@hook('filter')
+def games_by_year(year: int, columns: Sequence[str] = database.COLUMNS, path: str = CSV_PATH) -> pd.DataFrame:
+    return rounded_sales(bitmap.filter_frame({'Year': [year]}, columns, path))
+
+
+@hook('filter')
+def games_by_publisher(
+    publisher: str,
+    columns: Sequence[str] = database.COLUMNS,
+    region: Optional[str] = None,
+    min_sales: Optional[float] = None,
+    path: str = CSV_PATH,
+) -> pd.DataFrame:
+    # Com região e valor mínimo, só os jogos da editora que venderam mais que isso na região
+    return database.games_by_publisher(publisher, list(columns), region, min_sales, path)
+
+
+@hook('filter')
+def games_by_genre(genre: str, columns: Sequence[str] = database.COLUMNS, path: str = CSV_PATH) -> pd.DataFrame:
+    return rounded_sales(bitmap.filter_frame({'Genre': [genre]}, columns, path))
+
+
+@hook('filter')
+def games_above_sales(
+    min_sales: float,
+    regions: Sequence[str] = REGIONS,
+    columns: Sequence[str] = database.COLUMNS,
+    path: str = CSV_PATH,
+) -> pd.DataFrame:
+    # Jogos que venderam mais que min_sales em pelo menos uma das regiões
+    return database.games_above_sales(min_sales, list(regions), list(columns), path)
+
+
+@hook('filter')
+def games_above_global_sales(min_sales: float, columns: Sequence[str] = database.COLUMNS, path: str = CSV_PATH) -> pd.DataFrame:
+    return database.games_above_sales(min_sales, ['Global_Sales'], list(columns), path)
+
+
+@hook('filter')
+def top_games(
+    sales_column: str = 'Global_Sales',
+    n: int = 10,
+    columns: Sequence[str] = database.COLUMNS,
+    platforms: Optional[Sequence[str]] = None,
+    genres: Optional[Sequence[str]] = None,
+    publishers: Optional[Sequence[str]] = None,
+    path: str = CSV_PATH,
+) -> pd.DataFrame:
+    # Seleção parcial sobre a ordem pré-calculada de cada coluna, sem ordenar o dataset
+    return rounded_sales(topk.top_games(sales_column, n, columns, platforms, genres, publishers, path))
+
+
+@hook('filter')
+def best_seller(sales_column: str = 'Global_Sales', path: str = CSV_PATH) -> pd.Series:
+    return rounded_sales(load_dataset(path).iloc[topk.top_rows(sales_column, 1, path=path)[:1]]).iloc[0]
+
+
+@hook('filter')
+def game_summary(name: str, path: str = CSV_PATH) -> Optional[pd.Series]:
+    # Soma as vendas de todas as plataformas do jogo em uma única linha
+    games = database.games_by_name(name, path=path)
+    if games.empty:
+        return None
+    return games.groupby('Name').agg(SUMMARY).reset_index().iloc[0]
+
+
+@hook('filter')
+def first_games(n: int, path: str = CSV_PATH) -> pd.DataFrame:
+    return load_dataset(path)[['Name']].head(n)
+
+
+@hook('filter')
+def search_games(term: str, page: int = 0, page_size: int = search.PAGE_SIZE, path: str = CSV_PATH) -> tuple[int, pd.DataFrame]:
+    # (total de resultados, linhas da página), ordenados por relevância
+    return search.search(term, page, page_size, path)
@@ -0,0 +1,45 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import pandas as pd
+
+import bitmap
+import cube
+from loader import CSV_PATH, load_dataset
+from profiling import hook
+
+
+@dataclass(frozen=True)
+class GeneralMetrics:
+    # Resumo da página 'Métricas Gerais' para um intervalo de anos
+    total_games: int
+    oldest_year: Optional[int]
+    recent_year: Optional[int]
+    avg_sales: float
+    max_decade_avg_sales: float
+    top_publishers: pd.Series
+
+    @property
+    def top_publisher(self):
+        # (editora com mais jogos, quantidade) ou ('N/A', 0) se não houver jogos
+        if self.top_publishers.empty:
+            return 'N/A', 0
+        return self.top_publishers.index[0], int(self.top_publishers.iloc[0])
+
+
+@hook('aggregate')
+def general_metrics(start: int, end: int, path: str = CSV_PATH) -> GeneralMetrics:
+    df = load_dataset(path)
+    # Jogos únicos não são somáveis no cubo, então só essa métrica olha as linhas (as do bitmap)
+    year_bits = bitmap.select({'Year': (start, end)}, path)
+    year_stats = cube.rollup(['Year'], {'Year': (start, end)}, path)
+    all_years = cube.rollup(['Year'], path=path)
+    decades = all_years.groupby(all_years.index // 10 * 10)[['Global_Sales', 'count']].sum()
+    return GeneralMetrics(
+        total_games=int(df['Name'].iloc[bitmap.rows(year_bits, len(df))].nunique()),
+        oldest_year=int(year_stats.index.min()) if not year_stats.empty else None,
+        recent_year=int(year_stats.index.max()) if not year_stats.empty else None,
+        avg_sales=float(year_stats['Global_Sales'].sum() / year_stats['count'].sum()) if not year_stats.empty else float('nan'),
+        max_decade_avg_sales=float((decades['Global_Sales'] / decades['count']).max()),
+        top_publishers=cube.counts('Publisher', {'Year': (start, end)}, path),
+    )
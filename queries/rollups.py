@@ -0,0 +1,57 @@
+from typing import Optional, Sequence
+
+import pandas as pd
+
+import cube
+from loader import CSV_PATH, SALES_COLUMNS
+from profiling import hook
+
+
+@hook('aggregate')
+def counts(column: str, values: Optional[Sequence] = None, path: str = CSV_PATH) -> pd.Series:
+    # Número de jogos por valor da coluna (maior primeiro), opcionalmente só para alguns valores
+    return cube.counts(column, {column: list(values)} if values else None, path)
+
+
+@hook('aggregate')
+def genre_sales(genres: Optional[Sequence[str]] = None, path: str = CSV_PATH) -> pd.DataFrame:
+    # Vendas somadas por gênero, uma coluna por região
+    filters = {'Genre': list(genres)} if genres else None
+    return cube.rollup(['Genre'], filters, path)[['Global_Sales'] + [col for col in SALES_COLUMNS if col != 'Global_Sales']].reset_index()
+
+
+@hook('aggregate')
+def publisher_counts(max_count: Optional[int] = None, n: Optional[int] = None, path: str = CSV_PATH) -> pd.Series:
+    # Editoras com mais jogos; max_count limita a quantidade de jogos por editora
+    result = counts('Publisher', path=path)
+    if max_count is not None:
+        result = result[result <= max_count]
+    return result.head(n) if n is not None else result
+
+
+@hook('aggregate')
+def year_counts(start: int, end: int, path: str = CSV_PATH) -> pd.Series:
+    return cube.rollup(['Year'], {'Year': (start, end)}, path)['count']
+
+
+@hook('aggregate')
+def year_sales(start: int, end: int, path: str = CSV_PATH) -> pd.Series:
+    return cube.rollup(['Year'], {'Year': (start, end)}, path)['Global_Sales']
+
+
+@hook('aggregate')
+def region_totals(regions: Sequence[str], path: str = CSV_PATH) -> pd.DataFrame:
+    totals = cube.rollup([], path=path)[list(regions)].reset_index()
+    totals.columns = ['Região', 'Vendas (milhões)']
+    totals['Região'] = totals['Região'].str.replace('_Sales', '')
+    return totals
+
+
+@hook('aggregate')
+def total_sales(column: str = 'Global_Sales', path: str = CSV_PATH) -> float:
+    return float(cube.rollup([], path=path)[column])
+
+
+@hook('aggregate')
+def releases_per_year_mean(path: str = CSV_PATH) -> float:
+    return float(cube.rollup(['Year'], path=path)['count'].mean())
@@ -0,0 +1,136 @@
+from typing import Optional, Sequence
+
+import pandas as pd
+
+import database
+import streaming
+from loader import CSV_PATH, DTYPES, SALES_COLUMNS, rounded_sales
+from queries.filters import REGIONS, SUMMARY
+
+# As mesmas consultas dos menus (mesmos nomes e parâmetros de queries), executadas em blocos
+# sobre o arquivo em vez do DataFrame em memória: para catálogos que não cabem na RAM.
+# Filtros devolvem só as linhas selecionadas; top-N e roll-ups guardam apenas o agregado
+
+
+def _filter(predicate, filter_columns, columns, path):
+    needed = list(dict.fromkeys(list(columns) + list(filter_columns)))
+    chunks = streaming.where(streaming.iter_chunks(path, needed), predicate)
+    return rounded_sales(streaming.collect(streaming.select(chunks, columns)))
+
+
+def games_by_year(year: int, columns: Sequence[str] = database.COLUMNS, path: str = CSV_PATH) -> pd.DataFrame:
+    return _filter(streaming.Matches({'Year': [year]}), ['Year'], columns, path)
+
+
+def games_by_publisher(
+    publisher: str,
+    columns: Sequence[str] = database.COLUMNS,
+    region: Optional[str] = None,
+    min_sales: Optional[float] = None,
+    path: str = CSV_PATH,
+) -> pd.DataFrame:
+    by_publisher = streaming.Matches({'Publisher': [publisher]})
+    if region is None or min_sales is None:
+        return _filter(by_publisher, ['Publisher'], columns, path)
+    by_sales = streaming.Above(min_sales, [region])
+    return _filter(lambda chunk: by_publisher(chunk) & by_sales(chunk), ['Publisher', region], columns, path)
+
+
+def games_by_genre(genre: str, columns: Sequence[str] = database.COLUMNS, path: str = CSV_PATH) -> pd.DataFrame:
+    return _filter(streaming.Matches({'Genre': [genre]}), ['Genre'], columns, path)
+
+
+def games_above_sales(
+    min_sales: float,
+    regions: Sequence[str] = REGIONS,
+    columns: Sequence[str] = database.COLUMNS,
+    path: str = CSV_PATH,
+) -> pd.DataFrame:
+    return _filter(streaming.Above(min_sales, regions), regions, columns, path)
+
+
+def games_above_global_sales(min_sales: float, columns: Sequence[str] = database.COLUMNS, path: str = CSV_PATH) -> pd.DataFrame:
+    return games_above_sales(min_sales, ['Global_Sales'], columns, path)
+
+
+def top_games(
+    sales_column: str = 'Global_Sales',
+    n: int = 10,
+    columns: Sequence[str] = database.COLUMNS,
+    platforms: Optional[Sequence[str]] = None,
+    genres: Optional[Sequence[str]] = None,
+    publishers: Optional[Sequence[str]] = None,
+    path: str = CSV_PATH,
+) -> pd.DataFrame:
+    filters = {'Platform': platforms, 'Genre': genres, 'Publisher': publishers}
+    return rounded_sales(streaming.run(
+        streaming.TopN(sales_column, n, columns), path,
+        streaming.Matches(filters), [col for col, values in filters.items() if values],
+    ))
+
+
+def best_seller(sales_column: str = 'Global_Sales', path: str = CSV_PATH) -> pd.Series:
+    return top_games(sales_column, 1, list(DTYPES), path=path).iloc[0]
+
+
+def game_summary(name: str, path: str = CSV_PATH) -> Optional[pd.Series]:
+    games = _filter(streaming.Matches({'Name': [name]}), ['Name'], list(DTYPES), path)
+    if games.empty:
+        return None
+    return games.groupby('Name').agg(SUMMARY).reset_index().iloc[0]
+
+
+def first_games(n: int, path: str = CSV_PATH) -> pd.DataFrame:
+    return streaming.collect(streaming.head(streaming.iter_chunks(path, ['Name'], min(n, streaming.CHUNK_ROWS) or 1), n))
+
+
+def _rollup(dims, filters=None, path=CSV_PATH):
+    filters = {col: values for col, values in (filters or {}).items() if values}
+    predicate = streaming.Matches(filters) if filters else None
+    return streaming.run(streaming.Rollup(dims), path, predicate, list(filters))
+
+
+def counts(column: str, values: Optional[Sequence] = None, path: str = CSV_PATH) -> pd.Series:
+    return _rollup([column], {column: list(values)} if values else None, path)['count'].sort_values(ascending=False, kind='stable')
+
+
+def genre_sales(genres: Optional[Sequence[str]] = None, path: str = CSV_PATH) -> pd.DataFrame:
+    result = _rollup(['Genre'], {'Genre': list(genres)} if genres else None, path)
+    return result[['Global_Sales'] + [col for col in SALES_COLUMNS if col != 'Global_Sales']].reset_index()
+
+
+def publisher_counts(max_count: Optional[int] = None, n: Optional[int] = None, path: str = CSV_PATH) -> pd.Series:
+    result = counts('Publisher', path=path)
+    if max_count is not None:
+        result = result[result <= max_count]
+    return result.head(n) if n is not None else result
+
+
+def year_counts(start: int, end: int, path: str = CSV_PATH) -> pd.Series:
+    return _rollup(['Year'], {'Year': (start, end)}, path)['count']
+
+
+def year_sales(start: int, end: int, path: str = CSV_PATH) -> pd.Series:
+    return _rollup(['Year'], {'Year': (start, end)}, path)['Global_Sales']
+
+
+def region_totals(regions: Sequence[str], path: str = CSV_PATH) -> pd.DataFrame:
+    totals = _rollup([], path=path)[list(regions)].reset_index()
+    totals.columns = ['Região', 'Vendas (milhões)']
+    totals['Região'] = totals['Região'].str.replace('_Sales', '')
+    return totals
+
+
+def total_sales(column: str = 'Global_Sales', path: str = CSV_PATH) -> float:
+    return float(_rollup([], path=path)[column])
+
+
+def releases_per_year_mean(path: str = CSV_PATH) -> float:
+    return float(_rollup(['Year'], path=path)['count'].mean())
+
+
+def column_info(path: str = CSV_PATH) -> tuple[int, pd.DataFrame]:
+    # (número de linhas, tipo e valores não nulos por coluna), no lugar de df.shape/df.info()
+    stats = streaming.ColumnStats()
+    info = streaming.run(stats, path)
+    return stats.rows, info
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from loader import rounded_sales
+
+# Conversões de formato para os gráficos e cartões, sem laços em Python sobre as linhas
+
+
+def to_long(frame, id_column, value_columns, var_name='variable', value_name='value', labels=None):
+    # Formato largo (uma coluna por região) -> longo (uma linha por par id x coluna), na
+    # ordem id -> coluna, como um laço aninhado sobre as linhas e as colunas
+    # labels: nomes exibidos para as colunas de valor (padrão: os próprios nomes)
+    value_columns = list(value_columns)
+    labels = value_columns if labels is None else list(labels)
+    rows = len(frame)
+    return pd.DataFrame({
+        id_column: np.repeat(frame[id_column].to_numpy(), len(value_columns)),
+        var_name: np.tile(np.asarray(labels, dtype=object), rows),
+        # to_numpy em 2D é linha a linha, então ravel já sai na ordem id -> coluna
+        value_name: frame[value_columns].to_numpy().ravel(),
+    })
+
+
+def records(frame, columns=None):
+    # Linhas como dicionários, para montar um widget por linha (cartões, expanders);
+    # a conversão é feita de uma vez pelo pandas, não linha a linha como no iterrows
+    # Vendas voltam às 2 casas do CSV: o float32 viraria 41.4900016784668 no float do Python
+    frame = frame if columns is None else frame[list(columns)]
+    return rounded_sales(frame).to_dict('records')
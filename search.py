@@ -0,0 +1,83 @@
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+
+from loader import CSV_PATH, derived, load_dataset
+
+# Índice invertido de trigramas sobre a coluna Name, usado na 'Busca de Jogos'
+# Consultas com menos de 3 caracteres casam com o início das palavras
+PAGE_SIZE = 20
+
+
+def normalize(text):
+    # Remove acentos e ignora maiúsculas: 'Pokémon' e 'POKEMON' viram 'pokemon'
+    text = unicodedata.normalize('NFKD', str(text))
+    return ''.join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def build_index(df):
+    names = [normalize(name) for name in df['Name'].fillna('')]
+    grams = defaultdict(list)
+    prefixes = defaultdict(list)
+    for row, name in enumerate(names):
+        for gram in trigrams(name):
+            grams[gram].append(row)
+        for prefix in {word[:n] for word in name.split() for n in (1, 2)}:
+            prefixes[prefix].append(row)
+    return {
+        'names': names,
+        'grams': {gram: np.array(rows, dtype=np.int32) for gram, rows in grams.items()},
+        'prefixes': {prefix: np.array(rows, dtype=np.int32) for prefix, rows in prefixes.items()},
+        'sales': df['Global_Sales'].to_numpy(),
+        'rank': df['Rank'].to_numpy(),
+    }
+
+
+def get_index(path=CSV_PATH):
+    return derived('search_index', build_index, path)
+
+
+def _candidates(index, query):
+    if len(query) < 3:
+        return index['prefixes'].get(query, np.empty(0, dtype=np.int32))
+    # Intersecta das listas menores para as maiores; só as linhas candidatas são verificadas
+    postings = sorted((index['grams'].get(gram) for gram in trigrams(query)), key=lambda p: -1 if p is None else len(p))
+    if postings[0] is None:
+        return np.empty(0, dtype=np.int32)
+    rows = postings[0]
+    for posting in postings[1:]:
+        rows = np.intersect1d(rows, posting, assume_unique=True)
+        if not len(rows):
+            break
+    names = index['names']
+    return np.array([row for row in rows if query in names[row]], dtype=np.int32)
+
+
+def _tier(name, query):
+    # 0 = nome exato, 1 = prefixo do nome, 2 = prefixo de palavra, 3 = no meio do nome
+    if name == query:
+        return 0
+    if name.startswith(query):
+        return 1
+    if f' {query}' in name:
+        return 2
+    return 3
+
+
+def search(term, page=0, page_size=PAGE_SIZE, path=CSV_PATH):
+    # Retorna (total de resultados, linhas da página pedida) ordenadas por relevância e vendas
+    index = get_index(path)
+    query = normalize(term).strip()
+    if not query:
+        return 0, load_dataset(path).iloc[:0]
+    rows = _candidates(index, query)
+    names = index['names']
+    tiers = np.array([_tier(names[row], query) for row in rows], dtype=np.int8)
+    order = np.lexsort((index['rank'][rows], -index['sales'][rows], tiers))
+    start = page * page_size
+    return len(rows), load_dataset(path).iloc[rows[order[start:start + page_size]]]
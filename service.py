@@ -0,0 +1,190 @@
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+import loader
+import queries
+from loader import CSV_PATH
+
+# Serviço de consultas do processo do app: um event loop asyncio em uma thread própria
+# recebe as consultas de todas as sessões do Streamlit. Consultas idênticas em andamento
+# (mesma função de queries, mesmos argumentos, mesma versão do dataset) são calculadas
+# uma vez só e todas as sessões que esperavam recebem o mesmo resultado (single-flight):
+# depois de um deploy, N sessões abrindo a mesma página custam um cálculo por consulta.
+# Não é um cache: terminado o cálculo, o próximo pedido calcula de novo
+# Threads que executam as consultas (o pandas libera o GIL em boa parte das operações)
+WORKERS = min(4, os.cpu_count() or 1)
+# Latências guardadas por consulta para os percentis
+LATENCY_SAMPLES = 500
+
+
+def _freeze(value):
+    # listas (ex.: multiselect) viram tuplas para poderem fazer parte da chave
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class _Metrics:
+    def __init__(self, samples):
+        self.requests = 0
+        self.computes = 0
+        self.joined = 0  # pedidos que aproveitaram um cálculo em andamento
+        self.errors = 0
+        self.in_flight = 0
+        self.compute_ms = deque(maxlen=samples)  # duração de cada cálculo
+        self.wait_ms = deque(maxlen=samples)  # quanto cada sessão esperou (inclui os agrupados)
+
+
+class QueryService:
+    def __init__(self, workers=WORKERS, samples=LATENCY_SAMPLES):
+        self.workers = workers
+        self.samples = samples
+        self._loop = None
+        self._executor = None
+        self._start_lock = threading.Lock()
+        self._inflight = {}  # chave -> asyncio.Future; só usado na thread do loop
+        self._metrics = {}
+        self._metrics_lock = threading.Lock()
+
+    def _ensure_loop(self):
+        with self._start_lock:
+            if self._loop is None:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='query')
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name='query-service', daemon=True).start()
+            return self._loop
+
+    def _metric(self, name):
+        # chamar com _metrics_lock
+        return self._metrics.setdefault(name, _Metrics(self.samples))
+
+    async def _compute(self, name, call):
+        with self._metrics_lock:
+            metric = self._metric(name)
+            metric.computes += 1
+            metric.in_flight += 1
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+        except Exception:
+            with self._metrics_lock:
+                metric.errors += 1
+            raise
+        finally:
+            with self._metrics_lock:
+                metric.in_flight -= 1
+                metric.compute_ms.append((time.perf_counter() - start) * 1000)
+
+    def _done(self, key, future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+    async def _fetch(self, key, call):
+        # Roda no loop: junta-se ao cálculo em andamento da mesma chave ou começa um
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._compute(key[0], call))
+            self._inflight[key] = future
+            future.add_done_callback(partial(self._done, key))
+        else:
+            with self._metrics_lock:
+                self._metric(key[0]).joined += 1
+        # shield: uma sessão que desiste não cancela o cálculo dos outros
+        return await asyncio.shield(future)
+
+    def submit(self, name, *args, path=CSV_PATH, **kwargs):
+        # Agenda queries.<name>(*args, path=path, **kwargs) e devolve um concurrent.futures.Future.
+        # A versão da chave é a que a sessão enxerga (fixada por loader.pin); o cálculo usa
+        # a versão publicada, que só difere dela durante a troca feita pelo watcher
+        path = os.path.abspath(path)
+        with self._metrics_lock:
+            self._metric(name).requests += 1
+        try:
+            key = (name, _freeze(args), _freeze(sorted(kwargs.items())), path, loader.dataset_version(path))
+            func = getattr(queries, name)
+        except Exception:
+            with self._metrics_lock:
+                self._metric(name).errors += 1
+            raise
+        # o cálculo roda no contexto de quem pediu primeiro (ex.: as etapas do profiling.py
+        # entram no rerun dessa sessão)
+        context = contextvars.copy_context()
+        return asyncio.run_coroutine_threadsafe(
+            self._fetch(key, lambda: context.run(func, *args, path=path, **kwargs)), self._ensure_loop())
+
+    def _waited(self, name, start):
+        with self._metrics_lock:
+            self._metric(name).wait_ms.append((time.perf_counter() - start) * 1000)
+
+    def query(self, name, *args, path=CSV_PATH, **kwargs):
+        # Versão síncrona, para as sessões do Streamlit. O resultado pode ser o mesmo objeto
+        # entregue a outras sessões: quem usa não deve modificá-lo
+        start = time.perf_counter()
+        try:
+            return self.submit(name, *args, path=path, **kwargs).result()
+        finally:
+            self._waited(name, start)
+
+    async def query_async(self, name, *args, path=CSV_PATH, **kwargs):
+        # Para quem já roda em outro event loop
+        start = time.perf_counter()
+        try:
+            return await asyncio.wrap_future(self.submit(name, *args, path=path, **kwargs))
+        finally:
+            self._waited(name, start)
+
+    def stats(self):
+        # Uma linha por consulta: pedidos, cálculos, pedidos agrupados e latências
+        rows = []
+        with self._metrics_lock:
+            for name, metric in sorted(self._metrics.items()):
+                compute = np.array(metric.compute_ms) if metric.compute_ms else np.array([np.nan])
+                wait = np.array(metric.wait_ms) if metric.wait_ms else np.array([np.nan])
+                rows.append({
+                    'Consulta': name,
+                    'Pedidos': metric.requests,
+                    'Cálculos': metric.computes,
+                    'Agrupados': metric.joined,
+                    'Erros': metric.errors,
+                    'Em andamento': metric.in_flight,
+                    'Cálculo p50 (ms)': np.percentile(compute, 50),
+                    'Cálculo p95 (ms)': np.percentile(compute, 95),
+                    'Espera p50 (ms)': np.percentile(wait, 50),
+                    'Espera p95 (ms)': np.percentile(wait, 95),
+                    'Espera máx. (ms)': wait.max(),
+                })
+        columns = ['Consulta', 'Pedidos', 'Cálculos', 'Agrupados', 'Erros', 'Em andamento', 'Cálculo p50 (ms)',
+                   'Cálculo p95 (ms)', 'Espera p50 (ms)', 'Espera p95 (ms)', 'Espera máx. (ms)']
+        return pd.DataFrame(rows, columns=columns)
+
+    def reset_stats(self):
+        with self._metrics_lock:
+            self._metrics.clear()
+
+    def shutdown(self):
+        with self._start_lock:
+            loop, executor = self._loop, self._executor
+            self._loop = self._executor = None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+service = QueryService()
+
+
+def query(name, *args, path=CSV_PATH, **kwargs):
+    return service.query(name, *args, path=path, **kwargs)
+
+
+def stats():
+    return service.stats()
@@ -0,0 +1,144 @@
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # sem pyarrow não há como montar a coluna de texto sem cópia
+    pa = None
+
+# Colunas tipadas em um arquivo mapeado em memória, compartilhado por todos os processos do
+# servidor: cada processo monta o DataFrame por cima das páginas do arquivo (sem copiar),
+# então a memória do nó não cresce com o número de processos.
+# Formato: MAGIC | formato, tamanho do cabeçalho (uint32) | cabeçalho JSON | colunas
+# O cabeçalho guarda a versão do dataset (assinatura do CSV); uma versão nova é gravada em
+# outro arquivo e trocada com os.replace, e quem já mapeou a anterior continua lendo-a
+MAGIC = b'VGSALES\x00'
+FORMAT = 1
+PREFIX = struct.Struct('<II')
+# Alinhamento de cada coluna no arquivo (linha de cache)
+ALIGN = 64
+# Tipo do texto que o read_csv(dtype=str) do loader produz no pandas em uso: str (Arrow)
+# no pandas 3, object no 2.x. O DataFrame mapeado usa o mesmo, venha de onde vier
+TEXT_DTYPE = pd.Series([], dtype=str).dtype
+
+
+def _aligned(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+
+def _segments(df):
+    # (descrição da coluna, [buffers]) na ordem em que são gravados
+    for col in df.columns:
+        series = df[col]
+        dtype = series.dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            yield {'name': col, 'kind': 'category', 'dtype': str(series.cat.codes.dtype),
+                   'categories': [str(value) for value in dtype.categories]}, [series.cat.codes.to_numpy()]
+        elif isinstance(dtype, pd.StringDtype) or dtype == object:
+            values = pa.array(series.to_numpy(dtype=object), type=pa.large_string(), from_pandas=True)
+            validity, offsets, data = values.buffers()
+            yield {'name': col, 'kind': 'string', 'null_count': values.null_count}, [
+                np.frombuffer(offsets, dtype=np.int64, count=len(values) + 1),
+                np.frombuffer(data, dtype=np.uint8) if data is not None else np.zeros(0, dtype=np.uint8),
+                np.frombuffer(validity, dtype=np.uint8) if values.null_count else np.zeros(0, dtype=np.uint8),
+            ]
+        elif isinstance(series.array, pd.arrays.IntegerArray):
+            # inteiros com ausentes (Int16): valores e máscara
+            array = series.array
+            yield {'name': col, 'kind': 'masked', 'dtype': str(array._data.dtype)}, [array._data, array._mask]
+        elif isinstance(dtype, np.dtype):
+            yield {'name': col, 'kind': 'numpy', 'dtype': str(dtype)}, [series.to_numpy()]
+        else:
+            raise TypeError(f'Tipo sem suporte nas colunas compartilhadas: {col} ({dtype})')
+
+
+def write(df, target, version):
+    # Grava em um arquivo temporário e troca de uma vez: leitores nunca veem um arquivo pela metade
+    columns, buffers, offset = [], [], 0
+    for column, arrays in _segments(df):
+        column['buffers'] = []
+        for array in arrays:
+            column['buffers'].append([offset, int(array.nbytes)])
+            buffers.append((offset, array))
+            offset = _aligned(offset + array.nbytes)
+        columns.append(column)
+    header = json.dumps({'format': FORMAT, 'version': list(version), 'rows': len(df), 'columns': columns}).encode()
+    start = _aligned(len(MAGIC) + PREFIX.size + len(header))
+    tmp = f'{target}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as file:
+        file.write(MAGIC + PREFIX.pack(FORMAT, len(header)) + header)
+        for position, array in buffers:
+            file.seek(start + position)
+            file.write(np.ascontiguousarray(array).tobytes())
+        file.truncate(start + offset)
+    os.replace(tmp, target)
+    return target
+
+
+def read_header(buffer):
+    # Cabeçalho (dict) do arquivo já mapeado, ou None se não for deste formato
+    prefix = len(MAGIC) + PREFIX.size
+    if len(buffer) < prefix or buffer[:len(MAGIC)] != MAGIC:
+        return None
+    fmt, size = PREFIX.unpack(buffer[len(MAGIC):prefix])
+    if fmt != FORMAT:
+        return None
+    header = json.loads(buffer[prefix:prefix + size])
+    header['start'] = _aligned(prefix + size)
+    return header
+
+
+def _column(buffer, start, rows, column):
+    def array(i, dtype, count=None):
+        offset, size = column['buffers'][i]
+        count = size // np.dtype(dtype).itemsize if count is None else count
+        if not count:
+            return np.zeros(0, dtype=dtype)
+        return np.frombuffer(buffer, dtype=dtype, count=count, offset=start + offset)
+
+    kind = column['kind']
+    if kind == 'numpy':
+        return pd.Series(array(0, column['dtype']), copy=False)
+    if kind == 'masked':
+        return pd.Series(pd.arrays.IntegerArray(array(0, column['dtype']), array(1, np.bool_), copy=False), copy=False)
+    if kind == 'category':
+        dtype = pd.CategoricalDtype(pd.Index(column['categories'], dtype='str'))
+        return pd.Series(pd.Categorical.from_codes(array(0, column['dtype']), dtype=dtype, validate=False), copy=False)
+    # texto: buffers do Arrow apontando para o mapeamento
+    offsets, data = array(0, np.int64, rows + 1), array(1, np.uint8)
+    validity = pa.py_buffer(array(2, np.uint8)) if column['null_count'] else None
+    values = pa.Array.from_buffers(pa.large_string(), rows, [validity, pa.py_buffer(offsets), pa.py_buffer(data)], column['null_count'])
+    if TEXT_DTYPE == object:
+        # pandas 2.x: objetos Python como no CSV (esta coluna é copiada; ausentes como NaN)
+        objects = values.to_numpy(zero_copy_only=False)
+        return pd.Series(np.where(pd.isna(objects), np.nan, objects), dtype=object)
+    dtype = pd.StringDtype('pyarrow', na_value=np.nan)
+    return pa.chunked_array([values]).to_pandas(types_mapper={pa.large_string(): dtype}.get)
+
+
+def attach(target, version=None):
+    # DataFrame somente leitura sobre o arquivo mapeado; None se o arquivo não existe,
+    # é de outro formato ou de outra versão do dataset
+    try:
+        with open(target, 'rb') as file:
+            # o mapeamento continua válido depois de fechar o arquivo (e depois de um os.replace);
+            # cabeçalho e colunas saem do mesmo mapeamento, então são sempre da mesma versão
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        header = read_header(buffer)
+    except (OSError, ValueError):
+        return None
+    if header is None or (version is not None and tuple(header['version']) != tuple(version)):
+        return None
+    rows = header['rows']
+    try:
+        columns = {column['name']: _column(buffer, header['start'], rows, column) for column in header['columns']}
+    except (TypeError, ValueError, KeyError, AttributeError):
+        # pandas/pyarrow sem suporte a algum tipo (ex.: pandas < 2.3) ou cabeçalho
+        # inesperado: quem chamou cai no snapshot/CSV
+        return None
+    return pd.DataFrame(columns, copy=False)
@@ -0,0 +1,214 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from loader import CSV_PATH, DTYPES, SALES_COLUMNS
+
+# Execução em blocos para datasets maiores que a memória: o arquivo (CSV ou Parquet) é lido
+# CHUNK_ROWS linhas por vez e passa por geradores (filtro -> colunas -> agregado parcial).
+# Os agregados parciais se combinam (merge), então blocos processados em qualquer ordem,
+# ou em processos diferentes, dão o mesmo resultado; a memória fica limitada ao bloco
+# mais o tamanho do agregado (grupos, N linhas do top-N)
+CHUNK_ROWS = 250_000
+MEASURES = SALES_COLUMNS + ['count']
+
+
+def _is_parquet(path):
+    return os.path.splitext(path)[1].lower() == '.parquet'
+
+
+def iter_chunks(path=CSV_PATH, columns=None, chunk_rows=None):
+    # Blocos com os tipos do loader; columns limita o que é lido do arquivo
+    chunk_rows = chunk_rows or CHUNK_ROWS
+    columns = list(columns) if columns is not None else list(DTYPES)
+    dtypes = {col: DTYPES[col] for col in columns}
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+        start = 0
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=columns):
+            chunk = batch.to_pandas().astype(dtypes)
+            chunk.index = pd.RangeIndex(start, start + len(chunk))
+            start += len(chunk)
+            yield chunk
+        return
+    yield from pd.read_csv(path, usecols=columns, dtype=dtypes, chunksize=chunk_rows)
+
+
+class Matches:
+    # Predicado no formato de bitmap.select: {coluna: lista de valores} ou {coluna: (mínimo, máximo)};
+    # AND entre as colunas, OR entre os valores. Classe (e não closure) para poder ir aos
+    # processos do parallel.py
+    def __init__(self, filters):
+        self.filters = {col: values for col, values in filters.items() if values}
+
+    def __call__(self, chunk):
+        mask = np.ones(len(chunk), dtype=bool)
+        for col, values in self.filters.items():
+            if isinstance(values, tuple):
+                selected = chunk[col].between(values[0], values[1])
+            else:
+                selected = chunk[col].isin(list(values))
+            mask &= selected.to_numpy(dtype=bool, na_value=False)
+        return mask
+
+
+class Above:
+    # Vendas acima de min_sales em pelo menos uma das regiões
+    def __init__(self, min_sales, regions):
+        self.min_sales = min_sales
+        self.regions = list(regions)
+
+    def __call__(self, chunk):
+        # float32 -> float64 com as 2 casas do CSV, como no database.py e no cube.py
+        # (0.1 em float32 vira 0.10000000149 e passaria em '> 0.1')
+        return (chunk[self.regions].to_numpy(dtype=np.float64).round(2) > self.min_sales).any(axis=1)
+
+
+def where(chunks, predicate):
+    for chunk in chunks:
+        yield chunk[predicate(chunk)]
+
+
+def select(chunks, columns):
+    for chunk in chunks:
+        yield chunk[list(columns)]
+
+
+def head(chunks, n):
+    for chunk in chunks:
+        if n <= 0:
+            return
+        yield chunk.iloc[:n]
+        n -= len(chunk)
+
+
+def collect(chunks):
+    # Junta os blocos (já filtrados) em um DataFrame; as categorias de cada bloco são unidas
+    frames = list(chunks)
+    if not frames:
+        return pd.DataFrame({col: pd.Series(dtype=DTYPES[col]) for col in DTYPES})
+    result = pd.concat(frames, ignore_index=True)
+    return result.astype({col: DTYPES[col] for col in result.columns if col in DTYPES})
+
+
+def consume(chunks, partial):
+    for chunk in chunks:
+        partial.add(chunk)
+    return partial
+
+
+class Rollup:
+    # Somas de vendas e contagem de jogos por grupo (as mesmas medidas do cube.py)
+    def __init__(self, dims):
+        self.dims = list(dims)
+        self.partial = None
+
+    def columns(self):
+        return self.dims + SALES_COLUMNS
+
+    def add(self, chunk):
+        measures = chunk[SALES_COLUMNS].astype('float64').round(2)
+        measures['count'] = 1
+        if self.dims:
+            # chaves como valores simples: blocos diferentes têm categorias diferentes
+            keys = [chunk[col].astype(object) if isinstance(chunk[col].dtype, pd.CategoricalDtype) else chunk[col] for col in self.dims]
+            part = measures.groupby(keys)[MEASURES].sum()
+        else:
+            part = measures.sum()
+        self._combine(part)
+        return self
+
+    def merge(self, other):
+        if other.partial is not None:
+            self._combine(other.partial)
+        return self
+
+    def _combine(self, part):
+        if self.partial is None:
+            self.partial = part
+        elif not self.dims:
+            self.partial = self.partial + part
+        else:
+            # o agregado tem no máximo um registro por grupo, independente do número de linhas
+            self.partial = pd.concat([self.partial, part]).groupby(level=list(range(len(self.dims)))).sum()
+
+    def result(self):
+        # Como em cube.rollup: grupos ordenados pela chave, chaves nulas fora do resultado
+        if self.partial is None:
+            # nenhum bloco: o agregado de um bloco vazio tem o formato certo
+            self.add(pd.DataFrame({col: pd.Series(dtype=DTYPES[col]) for col in self.columns()}))
+        result = self.partial.copy()
+        if self.dims:
+            result.index.names = self.dims
+            result = result.sort_index()
+        result['count'] = result['count'].astype('int64')
+        return result
+
+
+class TopN:
+    # As n linhas com maior venda na coluna; empates pelo Rank, como no topk.py
+    def __init__(self, column, n, columns=None):
+        self.column = column
+        self.n = n
+        self.output = list(columns) if columns is not None else list(DTYPES)
+        self.rows = None
+
+    def columns(self):
+        return list(dict.fromkeys(self.output + [self.column, 'Rank']))
+
+    def _best(self, frame):
+        frame = frame.nlargest(self.n, self.column, keep='all')
+        return frame.sort_values([self.column, 'Rank'], ascending=[False, True], kind='stable').head(self.n)
+
+    def add(self, chunk):
+        self._combine(self._best(chunk[self.columns()]))
+        return self
+
+    def merge(self, other):
+        if other.rows is not None:
+            self._combine(other.rows)
+        return self
+
+    def _combine(self, rows):
+        self.rows = rows if self.rows is None else self._best(pd.concat([self.rows, rows], ignore_index=True))
+
+    def result(self):
+        return collect([] if self.rows is None else [self.rows[self.output]])
+
+
+class ColumnStats:
+    # Linhas e valores não nulos por coluna (o que o df.info() mostra)
+    def __init__(self, columns=None):
+        self.output = list(columns) if columns is not None else list(DTYPES)
+        self.rows = 0
+        self.non_null = pd.Series(0, index=self.output, dtype='int64')
+
+    def columns(self):
+        return self.output
+
+    def add(self, chunk):
+        self.rows += len(chunk)
+        self.non_null = self.non_null + chunk[self.output].notna().sum()
+        return self
+
+    def merge(self, other):
+        self.rows += other.rows
+        self.non_null = self.non_null + other.non_null
+        return self
+
+    def result(self):
+        return pd.DataFrame({
+            'Coluna': self.output,
+            'Tipo de Dado': [str(pd.Series(dtype=DTYPES[col]).dtype) for col in self.output],
+            'Valores Não Nulos': self.non_null.to_numpy(),
+        })
+
+
+def run(partial, path=CSV_PATH, predicate=None, filter_columns=(), chunk_rows=None):
+    # Pipeline completo: lê só as colunas usadas, filtra e acumula bloco a bloco
+    columns = list(dict.fromkeys(list(partial.columns()) + list(filter_columns)))
+    chunks = iter_chunks(path, columns, chunk_rows)
+    if predicate is not None:
+        chunks = where(chunks, predicate)
+    return consume(chunks, partial).result()
@@ -0,0 +1,128 @@
+import argparse
+import os
+
+import numpy as np
+
+from loader import CSV_PATH, DTYPES, SALES_COLUMNS, read_csv
+
+# Gerador determinístico de dados no formato do vgsales.csv, para testes de escala:
+# python synthetic.py 10000000 vendas_10M.csv [--seed 42]
+# Cada linha sintética copia os atributos de uma linha real de vendas parecidas, então
+# a cardinalidade de Platform/Publisher, os anos/editoras faltando e a cauda longa
+# de vendas seguem as do arquivo original
+CHUNK_ROWS = 500_000
+SEED = 42
+# Janela (em linhas do ranking real) de onde sai a linha copiada: mistura vizinhos de venda
+WINDOW = 50
+# Editoras com até RARE_MAX jogos viram editoras novas conforme o catálogo cresce
+RARE_MAX = 2
+REGION_COLUMNS = [col for col in SALES_COLUMNS if col != 'Global_Sales']
+
+
+def _profile(source):
+    # Linhas reais ordenadas por vendas globais (maior primeiro) e o que é derivado delas
+    base = read_csv(source).sort_values('Global_Sales', ascending=False, kind='stable').reset_index(drop=True)
+    global_sales = base['Global_Sales'].to_numpy(dtype=np.float64)
+    regions = base[REGION_COLUMNS].to_numpy(dtype=np.float64)
+    totals = regions.sum(axis=1, keepdims=True)
+    shares = np.divide(regions, totals, out=np.full_like(regions, 1 / len(REGION_COLUMNS)), where=totals > 0)
+    publisher_counts = base['Publisher'].value_counts()
+    rare = base['Publisher'].isin(publisher_counts[publisher_counts <= RARE_MAX].index).to_numpy()
+    return {
+        'base': base,
+        # quantis das vendas reais: a linha i de N recebe o quantil (i + 0.5) / N
+        'quantiles': (np.arange(len(base)) + 0.5) / len(base),
+        'global_sales': global_sales,
+        'shares': shares,
+        'rare': rare,
+    }
+
+
+def _chunk(profile, start, size, rows, seed):
+    base = profile['base']
+    n = len(base)
+    # Um gerador por bloco: o resultado não depende de quantos blocos já foram gerados
+    rng = np.random.default_rng([seed, start // CHUNK_ROWS])
+    positions = np.arange(start, start + size)
+    q = (positions + 0.5) / rows
+    source = np.clip((q * n).astype(np.int64) + rng.integers(-WINDOW, WINDOW + 1, size), 0, n - 1)
+
+    # Vendas globais decrescentes ao longo do arquivo (o Rank continua sendo a ordem de vendas)
+    global_sales = np.maximum(np.interp(q, profile['quantiles'], profile['global_sales']).round(2), 0.01)
+    chunk = base.iloc[source][['Name', 'Platform', 'Year', 'Genre', 'Publisher']].reset_index(drop=True)
+    chunk.insert(0, 'Rank', positions + 1)
+
+    # Acima do tamanho original, linhas vizinhas (que copiam os mesmos jogos) ganham
+    # números diferentes no nome ("Tetris 3")
+    copy = positions % -(-rows // n)
+    names = chunk['Name'].astype(object)
+    chunk['Name'] = names.where(copy == 0, names + ' ' + (copy + 1).astype(str))
+
+    # Editoras raras se multiplicam com a escala, as grandes continuam as mesmas
+    publishers = chunk['Publisher'].astype(object)
+    new_publisher = profile['rare'][source] & (rows > n)
+    variant = rng.integers(0, max(1, rows // n), size)
+    chunk['Publisher'] = publishers.where(~new_publisher | (variant == 0), publishers + ' ' + variant.astype(str))
+
+    regional = (profile['shares'][source] * global_sales[:, None]).round(2)
+    for i, col in enumerate(REGION_COLUMNS):
+        chunk[col] = regional[:, i]
+    chunk['Global_Sales'] = global_sales
+    return chunk[list(DTYPES)]
+
+
+def iter_chunks(rows, seed=SEED, source=CSV_PATH):
+    profile = _profile(source)
+    for start in range(0, rows, CHUNK_ROWS):
+        yield _chunk(profile, start, min(CHUNK_ROWS, rows - start), rows, seed)
+
+
+PARQUET_TYPES = {'Rank': 'int32', 'Year': 'Int16', **{col: 'float32' for col in SALES_COLUMNS}}
+
+
+def _parquet_schema():
+    import pyarrow as pa
+    return pa.schema([
+        ('Rank', pa.int32()),
+        ('Name', pa.string()),
+        ('Platform', pa.string()),
+        ('Year', pa.int16()),
+        ('Genre', pa.string()),
+        ('Publisher', pa.string()),
+        *[(col, pa.float32()) for col in SALES_COLUMNS],
+    ])
+
+
+def generate(rows, target, seed=SEED, source=CSV_PATH, fmt=None):
+    # Grava bloco a bloco (CSV ou Parquet, pela extensão), nunca com o arquivo inteiro em memória
+    fmt = fmt or ('parquet' if target.endswith('.parquet') else 'csv')
+    tmp = target + '.tmp'
+    writer = None
+    if fmt == 'parquet':
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        schema = _parquet_schema()
+        writer = pq.ParquetWriter(tmp, schema)
+    try:
+        for i, chunk in enumerate(iter_chunks(rows, seed, source)):
+            if writer is not None:
+                table = pa.Table.from_pandas(chunk.astype(PARQUET_TYPES), schema=schema, preserve_index=False)
+                writer.write_table(table)
+            else:
+                chunk.to_csv(tmp, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp, target)
+    return target
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Gera dados sintéticos no formato do vgsales.csv')
+    parser.add_argument('rows', type=int)
+    parser.add_argument('target')
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--source', default=CSV_PATH, help='CSV real usado como referência')
+    parser.add_argument('--format', choices=['csv', 'parquet'])
+    args = parser.parse_args()
+    print(generate(args.rows, args.target, args.seed, args.source, args.format))
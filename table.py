@@ -0,0 +1,75 @@
+import math
+
+import streamlit as st
+
+from profiling import hook
+
+# Tabela paginada no servidor: só a página visível é enviada ao navegador, e o estilo
+# roxo do dashboard (Styler) é aplicado só às células dessa página
+PAGE_SIZE = 50
+CELL_STYLE = {
+    'background-color': '#4F1C51',
+    'color': 'white',
+    'border-color': '#d3d3d3',
+    'border-style': 'solid',
+    'border-width': '1px',
+}
+
+
+def expire_buttons():
+    # Chamar no início de cada rerun, antes das páginas: os botões exibidos no rerun
+    # anterior são os únicos que podem continuar ativos
+    st.session_state['table_buttons_shown'] = st.session_state.get('table_buttons', {})
+    st.session_state['table_buttons'] = {}
+
+
+def button(label, key, params=()):
+    # Botão da barra lateral que continua "pressionado" nos reruns seguintes (ex.: ao
+    # trocar a página da tabela) enquanto seguir na tela com os filtros do clique. Um
+    # rerun com outros filtros ou em outra página do menu o desliga: voltar aos mesmos
+    # filtros depois não refaz a consulta sem um novo clique
+    shown = st.session_state.get('table_buttons_shown', {})
+    active = st.sidebar.button(label, key=key) or (key in shown and shown[key] == params)
+    if active:
+        st.session_state.setdefault('table_buttons', {})[key] = params
+    return active
+
+
+def current_view():
+    # Última tabela exibida neste rerun (chave, DataFrame completo), usada na exportação
+    return st.session_state.get('current_view')
+
+
+def clear_current_view():
+    st.session_state['current_view'] = None
+
+
+def styled(frame, formats=None):
+    # formats: {coluna: formato printf}, ex. {'Global_Sales': '%.2f'}
+    styler = frame.style.set_properties(**CELL_STYLE)
+    for col, fmt in (formats or {}).items():
+        styler = styler.format(lambda value, fmt=fmt: fmt % value, subset=[col], na_rep='')
+    return styler
+
+
+@hook('render-table')
+def render_table(frame, key, page_size=PAGE_SIZE, formats=None, **kwargs):
+    # Retorna (linhas visíveis, evento do st.dataframe) para quem usa seleção de linhas
+    st.session_state['current_view'] = (key, frame)
+    total = len(frame)
+    pages = max(1, math.ceil(total / page_size))
+    page = 1
+    if pages > 1:
+        page = st.number_input(f'Página (1 a {pages}):', min_value=1, max_value=pages, step=1, key=f'{key}_page')
+    start = (page - 1) * page_size
+    visible = frame.iloc[start:start + page_size]
+    if pages > 1:
+        st.caption(f'Linhas {start + 1:,} a {start + len(visible):,} de {total:,}')
+    event = st.dataframe(
+        styled(visible, formats),
+        use_container_width=True,
+        # a chave inclui a página para que uma seleção não "pule" para outra página
+        key=f'{key}_{page}',
+        **kwargs
+    )
+    return visible, event
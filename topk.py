@@ -0,0 +1,71 @@
+import numpy as np
+
+import bitmap
+from loader import CSV_PATH, SALES_COLUMNS, derived, load_dataset
+
+# Top-N por coluna de vendas sem ordenar o dataset a cada consulta: a ordem decrescente
+# de cada coluna é calculada uma vez por versão do dataset e os filtros (bitmaps) só a percorrem
+# Com filtros que sobram poucas linhas, a seleção parcial (argpartition) fica com os candidatos
+SELECTIVE_FRACTION = 0.02
+FIRST_BLOCK = 1024
+
+
+def build_index(df):
+    rank = df['Rank'].to_numpy()
+    sales = {col: df[col].to_numpy(dtype=np.float64) for col in SALES_COLUMNS}
+    return {
+        # maior venda primeiro; empates pelo Rank, como no sort estável do pandas
+        'order': {col: np.lexsort((rank, -values)).astype(np.int32) for col, values in sales.items()},
+        'sales': sales,
+        'rank': rank,
+    }
+
+
+def get_index(path=CSV_PATH):
+    return derived('topk', build_index, path)
+
+
+def _select(index, column, rows, n):
+    # Seleção parcial entre poucas linhas: só os n maiores são ordenados
+    sales = index['sales'][column][rows]
+    if len(rows) > n:
+        threshold = np.partition(sales, len(sales) - n)[len(sales) - n]
+        keep = sales >= threshold  # inclui os empates no limite antes de desempatar pelo Rank
+        rows, sales = rows[keep], sales[keep]
+    order = np.lexsort((index['rank'][rows], -sales))
+    return rows[order[:n]]
+
+
+def _walk(order, bits, n):
+    # Percorre a ordem pré-calculada em blocos crescentes até achar n linhas que passam no
+    # filtro; o filtro só é avaliado nas linhas percorridas
+    found = []
+    total = 0
+    start, block = 0, max(FIRST_BLOCK, n * 16)
+    while total < n and start < len(order):
+        rows = order[start:start + block]
+        rows = rows[bitmap.contains(bits, rows)]
+        found.append(rows)
+        total += len(rows)
+        start += block
+        block *= 2
+    return np.concatenate(found)[:n] if found else order[:0]
+
+
+def top_rows(column, n, platforms=None, genres=None, publishers=None, path=CSV_PATH):
+    # Posições (iloc) das n linhas com maiores vendas na coluna, respeitando os filtros
+    index = get_index(path)
+    order = index['order'][column]
+    bits = bitmap.select({'Platform': platforms, 'Genre': genres, 'Publisher': publishers}, path)
+    if bits is None:
+        return order[:n]
+    if bitmap.count(bits) <= len(order) * SELECTIVE_FRACTION:
+        return _select(index, column, bitmap.rows(bits, len(order)), n)
+    return _walk(order, bits, n)
+
+
+def top_games(column, n, columns=None, platforms=None, genres=None, publishers=None, path=CSV_PATH):
+    df = load_dataset(path)
+    rows = top_rows(column, n, platforms, genres, publishers, path)
+    result = df.iloc[rows]
+    return (result[list(columns)] if columns is not None else result).reset_index(drop=True)
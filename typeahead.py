@@ -0,0 +1,43 @@
+from bisect import bisect_left
+
+from loader import CSV_PATH, derived
+from search import normalize
+
+# Listas ordenadas de valores únicos por coluna, calculadas uma vez por versão do dataset
+COLUMNS = ['Name', 'Publisher', 'Platform', 'Genre']
+TOP_K = 25
+
+
+def build_choices(df):
+    choices = {}
+    for col in COLUMNS:
+        values = sorted(df[col].dropna().unique())
+        # chaves normalizadas e ordenadas para a busca por prefixo com bisect
+        keyed = sorted((normalize(value), value) for value in values)
+        choices[col] = {
+            'values': values,
+            'keys': [key for key, _ in keyed],
+            'by_key': [value for _, value in keyed],
+        }
+    return choices
+
+
+def get_choices(path=CSV_PATH):
+    return derived('typeahead', build_choices, path)
+
+
+def unique_values(col, path=CSV_PATH):
+    # Mesmo resultado de sorted(df[col].dropna().unique()), sem refazer a ordenação a cada rerun
+    return get_choices(path)[col]['values']
+
+
+def suggest(col, prefix, k=TOP_K, path=CSV_PATH):
+    # Até k valores cujo nome começa com o prefixo digitado (sem diferenciar acentos/maiúsculas)
+    choice = get_choices(path)[col]
+    prefix = normalize(prefix).strip()
+    keys = choice['keys']
+    start = bisect_left(keys, prefix)
+    end = start
+    while end < len(keys) and end - start < k and keys[end].startswith(prefix):
+        end += 1
+    return choice['by_key'][start:end]
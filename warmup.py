@@ -0,0 +1,111 @@
+import logging
+import os
+import threading
+from functools import partial
+
+import loader
+import parallel
+import queries
+import service
+from loader import CSV_PATH
+
+# Pré-cálculo das páginas de 'Métricas Avançadas': quando uma versão do dataset é
+# carregada, os resumos das opções iniciais de cada página são calculados em paralelo
+# num pool de processos e guardados no cache de derivados do loader (por versão), então
+# o primeiro usuário a abrir a página já encontra o resultado pronto
+DEFAULT_YEARS = (1980, 2020)
+# (função de queries, argumentos) com os valores iniciais dos widgets de cada página
+SUMMARIES = [
+    ('general_metrics', DEFAULT_YEARS),  # Métricas Gerais
+    ('counts', ('Genre',)),  # Popularidade de Gêneros
+    ('genre_sales', ()),
+    ('year_counts', DEFAULT_YEARS),  # Tendências Temporais
+    ('year_sales', DEFAULT_YEARS),
+    ('region_totals', (('Global_Sales',),)),  # Distribuição de Vendas por Região
+]
+
+logger = logging.getLogger(__name__)
+
+# Última versão agendada por arquivo: o app chama schedule a cada rerun
+_scheduled = {}
+_lock = threading.Lock()
+
+
+def _freeze(args):
+    # listas (ex.: multiselect) viram tuplas para fazer parte do nome no cache
+    return tuple(tuple(arg) if isinstance(arg, list) else arg for arg in args)
+
+
+def _key(name, args):
+    return f'summary:{name}{args!r}'
+
+
+def summary(name, *args, path=CSV_PATH):
+    # Resultado de queries.<name>(*args) na versão atual: vem do warmup quando já
+    # foi pré-calculado, senão é calculado aqui e fica no cache para as outras sessões.
+    # O objeto é compartilhado: quem usa não deve modificá-lo
+    args = _freeze(args)
+    key = _key(name, args)
+    cached = loader.derived_items(path).get(key)
+    if cached is not None:
+        return cached
+    # sessões pedindo o mesmo resumo ao mesmo tempo esperam um único cálculo (service.py);
+    # fora do lock do loader, que o cálculo (cubo, bitmaps) também precisa
+    signature = loader.current_signature(path)
+    value = service.query(name, *args, path=path)
+    loader.store_derived(key, value, path, signature)
+    return value
+
+
+def _compute(path, name, args):
+    # Roda no processo do pool: o dataset vem do snapshot mapeado em memória e os
+    # derivados (cubo, bitmaps) ficam no cache do próprio processo para as próximas tarefas
+    value = getattr(queries, name)(*args, path=path)
+    return loader.current_signature(path), value
+
+
+def _store(path, name, args, future):
+    try:
+        signature, value = future.result()
+    except Exception:
+        logger.exception('Falha no pré-cálculo de %s%r', name, args)
+        return
+    # só entra se o processo calculou sobre a versão que o app está servindo
+    loader.store_derived(_key(name, args), value, path, signature)
+
+
+def _serial(path):
+    # Sem pool de processos (ex.: ambiente sem suporte a multiprocessing): mesma
+    # tarefa, em uma thread, ainda fora das requisições
+    for name, args in SUMMARIES:
+        try:
+            summary(name, *args, path=path)
+        except Exception:
+            logger.exception('Falha no pré-cálculo de %s%r', name, args)
+
+
+def schedule(path=CSV_PATH):
+    # Agenda o pré-cálculo da versão publicada do dataset (uma vez por versão), no pool
+    # de processos compartilhado do parallel.py
+    path = os.path.abspath(path)
+    signature = loader.current_signature(path)
+    with _lock:
+        if signature is None or _scheduled.get(path) == signature:
+            return []
+        _scheduled[path] = signature
+        try:
+            pool = parallel.get_pool()
+            futures = [pool.submit(_compute, path, name, args) for name, args in SUMMARIES]
+        except (OSError, RuntimeError, NotImplementedError) as error:
+            # BrokenProcessPool é um RuntimeError: descarta o pool para tentar de novo na próxima versão
+            logger.warning('Pool de processos indisponível (%s); pré-cálculo em uma thread', error)
+            parallel.discard_pool()
+            threading.Thread(target=_serial, args=(path,), name='warmup', daemon=True).start()
+            return []
+    for future, (name, args) in zip(futures, SUMMARIES):
+        future.add_done_callback(partial(_store, path, name, args))
+    return futures
+
+
+def shutdown():
+    parallel.shutdown()
@@ -0,0 +1,99 @@
+import logging
+import os
+import threading
+
+import bitmap
+import cube
+import database
+import loader
+import search
+import topk
+import typeahead
+import warmup
+from loader import CSV_PATH
+
+# Recarga do dataset em segundo plano: uma thread observa a assinatura do CSV e, quando
+# ele muda, monta a nova versão (DataFrame tipado, estruturas derivadas e banco SQLite)
+# fora das requisições e só então troca a versão publicada no loader
+POLL_SECONDS = 2.0
+# Estruturas montadas antes da troca, com os mesmos nomes usados em loader.derived
+WARM = {
+    'cube': cube.build_cube,
+    'bitmap': bitmap.build_index,
+    'topk': topk.build_index,
+    'typeahead': typeahead.build_choices,
+    'search_index': search.build_index,
+}
+
+logger = logging.getLogger(__name__)
+
+_watchers = {}
+_lock = threading.Lock()
+
+
+class DatasetWatcher(threading.Thread):
+    def __init__(self, path, interval=POLL_SECONDS):
+        super().__init__(name=f'watcher:{os.path.basename(path)}', daemon=True)
+        self.path = os.path.abspath(path)
+        self.interval = interval
+        self.stopped = threading.Event()
+        # assinatura vista na última verificação: só recarrega depois que o arquivo
+        # parou de mudar por um intervalo (evita ler um CSV ainda sendo gravado)
+        self._last_seen = None
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.check()
+            except Exception:
+                # mantém a versão atual; tenta de novo na próxima verificação
+                logger.exception('Falha ao recarregar %s', self.path)
+
+    def check(self):
+        try:
+            signature = loader.file_signature(self.path)
+        except FileNotFoundError:
+            return False
+        previous, self._last_seen = self._last_seen, signature
+        if signature == loader.current_signature(self.path) or signature != previous:
+            return False
+        self.reload(signature)
+        return True
+
+    def reload(self, signature):
+        df = loader.read_dataset(self.path)
+        derived = {name: builder(df) for name, builder in WARM.items()}
+        database.connect(self.path, signature, wait=True)  # refaz o banco SQLite agora, não numa consulta
+        if loader.file_signature(self.path) != signature:
+            return  # o arquivo mudou durante a montagem: a próxima verificação refaz
+        loader.replace_dataset(self.path, df, derived, signature)
+        warmup.schedule(self.path)
+        logger.info('Dataset %s recarregado (versão %s)', self.path, loader.dataset_version(self.path))
+
+    def stop(self):
+        self.stopped.set()
+
+
+def start(path=CSV_PATH, interval=POLL_SECONDS):
+    # Idempotente: o app chama a cada rerun, mas só existe um watcher por arquivo no processo
+    path = os.path.abspath(path)
+    with _lock:
+        watcher = _watchers.get(path)
+        if watcher is None or not watcher.is_alive():
+            loader.load_dataset(path)  # a primeira versão é carregada normalmente
+            watcher = DatasetWatcher(path, interval)
+            _watchers[path] = watcher
+            loader.watch(path)
+            watcher.start()
+            warmup.schedule(path)
+    return watcher
+
+
+def stop(path=CSV_PATH):
+    path = os.path.abspath(path)
+    with _lock:
+        watcher = _watchers.pop(path, None)
+    loader.watch(path, enabled=False)
+    if watcher is not None:
+        watcher.stop()
+        watcher.join()